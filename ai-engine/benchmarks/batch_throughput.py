@@ -0,0 +1,76 @@
+"""Texts per second through the batch endpoints vs. one request per text.
+
+    python -m benchmarks.batch_throughput --texts 2000 --batch-size 200
+
+Also checks that every batch result equals the single-text endpoint's answer
+for the same text and exits non-zero on the first mismatch.
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.synthetic import generate_postings
+
+ENDPOINTS = ('/extract-skills', '/analyze-sentiment')
+
+
+def _normalized(result):
+    if 'technical_skills' in result:
+        return {**result,
+                'technical_skills': sorted(result['technical_skills']),
+                'soft_skills': sorted(result['soft_skills'])}
+    return result
+
+
+def run_single(client, endpoint, texts):
+    results = []
+    for text in texts:
+        response = client.post(endpoint, json={'text': text})
+        if response.status_code != 200:
+            raise RuntimeError(f"{endpoint} returned {response.status_code}: {response.get_data(as_text=True)}")
+        results.append(response.get_json())
+    return results
+
+
+def run_batched(client, endpoint, texts, batch_size):
+    results = []
+    for start in range(0, len(texts), batch_size):
+        response = client.post(f"{endpoint}/batch", json={'texts': texts[start:start + batch_size]})
+        if response.status_code != 200:
+            raise RuntimeError(f"{endpoint}/batch returned {response.status_code}: {response.get_data(as_text=True)}")
+        results.extend(response.get_json()['results'])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import server
+    client = server.app.test_client()
+    texts = generate_postings(args.texts, seed=args.seed)
+
+    for endpoint in ENDPOINTS:
+        start = time.perf_counter()
+        single = run_single(client, endpoint, texts)
+        single_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = run_batched(client, endpoint, texts, args.batch_size)
+        batch_seconds = time.perf_counter() - start
+
+        for i, (expected, actual) in enumerate(zip(single, batched)):
+            if _normalized(expected) != _normalized(actual):
+                print(f"❌ {endpoint}: result {i} differs\n  single: {expected}\n  batch:  {actual}")
+                sys.exit(1)
+
+        print(f"{endpoint}: single {len(texts) / single_seconds:,.0f} texts/s, "
+              f"batch {len(texts) / batch_seconds:,.0f} texts/s "
+              f"({single_seconds / batch_seconds:.1f}x), results identical")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Time-to-first-token of /chat, streamed versus buffered, against the fake model.
+
+    python -m benchmarks.chat_stream_bench --requests 20 --latency 0.3 --token-latency 0.05
+
+The fake Gemini server (benchmarks/fake_gemini.py) sends its first chunk after
+`--latency` seconds and one word every `--token-latency` seconds after that.
+Each request carries a long synthetic history, so the rolling window is
+exercised too. The script checks that the streamed deltas join up to the
+buffered reply and reports time to first byte and to the full reply for
+plain JSON, server-sent events and NDJSON.
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.fake_gemini import start_fake_gemini
+from benchmarks.timing import format_summary, summarize
+
+
+def synthetic_history(turns):
+    return [{"role": "user" if i % 2 == 0 else "bot", "content": f"Message {i}: " + "career advice " * 40}
+            for i in range(turns)]
+
+
+def stream_deltas(response, stream_format):
+    """Yield the delta texts of a streamed /chat response as its bytes arrive."""
+    buffered = ''
+    for data in response.response:
+        buffered += data.decode() if isinstance(data, bytes) else data
+        separator = '\n\n' if stream_format == 'sse' else '\n'
+        while separator in buffered:
+            frame, buffered = buffered.split(separator, 1)
+            if stream_format == 'sse':
+                if frame.startswith('event:'):
+                    continue
+                payload = json.loads(frame[len('data: '):])
+            else:
+                payload = json.loads(frame)
+                if payload['event'] != 'delta':
+                    continue
+            yield payload['delta']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--token-latency', type=float, default=0.05)
+    parser.add_argument('--history', type=int, default=40, help="Turns of synthetic history per request.")
+    args = parser.parse_args(argv)
+
+    fake, _ = start_fake_gemini(latency=args.latency, token_latency=args.token_latency)
+    os.environ.update({'GEMINI_BASE_URL': f"http://127.0.0.1:{fake.server_port}", 'GEMINI_API_KEY': 'fake'})
+    import server
+
+    history = synthetic_history(args.history)
+    window = server.chat_history_window(history)
+    print(f"history: {len(history)} turns sent, {len(window)} kept "
+          f"({sum(len(line) for line in window)} chars; limits {server.CHAT_HISTORY_TURNS} turns, "
+          f"{server.CHAT_HISTORY_CHARS} chars)")
+
+    client = server.app.test_client()
+    modes = {'json': None, 'sse': 'sse', 'ndjson': 'ndjson'}
+    first, total, replies = {mode: [] for mode in modes}, {mode: [] for mode in modes}, {}
+    for i in range(args.requests):
+        body = {"message": f"How do I grow my career? ({i})", "history": history}
+        for mode, stream_format in modes.items():
+            start = time.perf_counter()
+            if stream_format is None:
+                reply = client.post('/chat', json=body).get_json()['response']
+                first[mode].append(time.perf_counter() - start)
+            else:
+                response = client.post('/chat', json=body, query_string={'stream': stream_format}, buffered=False)
+                parts = []
+                for delta in stream_deltas(response, stream_format):
+                    if not parts:
+                        first[mode].append(time.perf_counter() - start)
+                    parts.append(delta)
+                reply = ''.join(parts)
+            total[mode].append(time.perf_counter() - start)
+            replies.setdefault(i, set()).add(reply)
+
+    mismatched = [i for i, texts in replies.items() if len(texts) != 1]
+    for mode in modes:
+        print(format_summary(f'{mode} first byte', summarize(first[mode])))
+        print(format_summary(f'{mode} full reply', summarize(total[mode])))
+    if mismatched:
+        print(f"❌ streamed and buffered replies differ for requests {mismatched}")
+        raise SystemExit(1)
+    print(f"✅ streamed replies match the buffered reply for all {args.requests} requests")
+    print(f"gateway: {server.gateway_stats(server.get_llm())}")
+    fake.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Build time, quality and /semantic-skills latency of the skill co-occurrence index.
+
+    python -m benchmarks.cooccurrence_bench --postings 100000
+
+Synthetic postings mention three or four skills from one technology stack
+plus one random skill, so the true neighbours of a skill are the rest of its
+stack. Postings go through the batch extractor and collect_skill_sets() as in
+main.py. The report gives the index build time, the share of each skill's
+top 5 neighbours that come from its own stack, and /semantic-skills
+latency from the index (Gemini disabled).
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.synthetic import FILLER
+from benchmarks.timing import format_summary, summarize
+
+STACKS = [
+    ['react', 'javascript', 'typescript', 'html', 'css', 'node.js'],
+    ['docker', 'kubernetes', 'terraform', 'aws', 'linux'],
+    ['sql', 'tableau', 'excel', 'power bi', 'sas'],
+    ['tensorflow', 'pytorch', 'scikit-learn', 'python'],
+    ['java', 'scala', 'spark', 'hadoop'],
+]
+ALL_SKILLS = [skill for stack in STACKS for skill in stack]
+
+
+def generate_stack_postings(n, seed=0):
+    rng = random.Random(seed)
+    postings = []
+    for _ in range(n):
+        skills = rng.sample(rng.choice(STACKS), rng.randint(3, 4)) + [rng.choice(ALL_SKILLS)]
+        words = rng.choices(FILLER, k=rng.randint(60, 200))
+        for skill in skills:
+            words.insert(rng.randrange(len(words) + 1), skill)
+        postings.append(' '.join(words))
+    return postings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postings', type=int, default=100_000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    import main as pipeline
+    from skill_cooccurrence import (build_cooccurrence_index, collect_skill_sets, create_cooccurrence,
+                                    save_cooccurrence_index)
+
+    texts = generate_stack_postings(args.postings)
+    cooccurrence = create_cooccurrence()
+    extractor = pipeline.build_extractor('vocab')
+    start = time.perf_counter()
+    for _ in collect_skill_sets(pipeline.iter_skill_records(((text, 0) for text in texts), extractor), cooccurrence):
+        pass
+    extract_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    index = build_cooccurrence_index(cooccurrence)
+    build_seconds = time.perf_counter() - start
+    print(f"{args.postings} postings: extraction {extract_seconds:.2f}s, index build {build_seconds:.3f}s, "
+          f"{len(index)} skills, {index.nbytes / 1024:.0f} KiB")
+
+    path = os.path.join(tempfile.mkdtemp(prefix='cooccurrence-bench-'), 'cooccurrence_index.npy')
+    save_cooccurrence_index(index, path)
+    os.environ.update({'COOCCURRENCE_INDEX_PATH': path, 'GEMINI_API_KEY': ''})
+    import server
+
+    stack_of = {skill: i for i, stack in enumerate(STACKS) for skill in stack}
+    hits, total = 0, 0
+    for skill in ALL_SKILLS:
+        related = server.related_skills(server.cooccurrence_index, server.canonical_skill(skill), 5) or []
+        own = [key for key, _, _ in related if stack_of.get(key) == stack_of[skill]]
+        hits, total = hits + len(own), total + min(5, len(STACKS[stack_of[skill]]) - 1)
+    print(f"same-stack neighbours in top 5: {hits}/{total} ({hits / total:.0%})")
+    print(f"e.g. docker -> {server.indexed_related_skills('docker')['related_skills']}")
+
+    client = server.app.test_client()
+    rng = random.Random(1)
+    latencies = []
+    for skill in rng.choices(ALL_SKILLS, k=args.requests):
+        start = time.perf_counter()
+        response = client.post('/semantic-skills', json={'skill': skill})
+        latencies.append(time.perf_counter() - start)
+        assert response.get_json().get('source') == 'cooccurrence', response.get_json()
+    lookups = []
+    for skill in rng.choices(ALL_SKILLS, k=args.requests):
+        start = time.perf_counter()
+        server.indexed_related_skills(skill)
+        lookups.append(time.perf_counter() - start)
+    print(format_summary('index lookup', summarize(lookups)))
+    print(format_summary('/semantic-skills', summarize(latencies, sum(latencies))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Duplicate rate, accuracy and cost of the dedup stage, and the extraction time it saves.
+
+    python -m benchmarks.dedup_bench --postings 50000 --exact 0.15 --near 0.15
+
+Synthetic postings are re-listed: a share of them are exact copies of an
+earlier posting and another share are near copies (a few words replaced or
+appended, as when a board adds a location or a date). The report gives how
+many of each drop_duplicates() catches, how many distinct postings it wrongly
+drops, its time per posting, and the extraction time saved by not running
+the duplicates through the extractor.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import FILLER, generate_postings
+
+
+def relist(rng, text, edits):
+    """A near copy of `text`: `edits` words replaced, plus a suffix like the ones boards append."""
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(FILLER)
+    return ' '.join(words) + rng.choice(['', ' apply now', ' location remote', ' posted today'])
+
+
+def generate_relisted(n, exact_rate, near_rate, edits, seed=0):
+    """[(text, origin)] where origin is None for distinct postings, else the index of the copied one."""
+    rng = random.Random(seed)
+    distinct = iter(generate_postings(n, seed=seed))
+    postings = []
+    for _ in range(n):
+        roll = rng.random()
+        if postings and roll < exact_rate + near_rate:
+            origin = rng.randrange(len(postings))
+            origin = postings[origin][1] if postings[origin][1] is not None else origin
+            text = postings[origin][0]
+            postings.append((text if roll < exact_rate else relist(rng, text, edits), origin))
+        else:
+            postings.append((next(distinct), None))
+    return postings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postings', type=int, default=50_000)
+    parser.add_argument('--exact', type=float, default=0.15, help="Share of postings that are exact copies.")
+    parser.add_argument('--near', type=float, default=0.15, help="Share of postings that are near copies.")
+    parser.add_argument('--edits', type=int, default=3, help="Words changed in each near copy.")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    import main as pipeline
+    from dedup import create_dedup, drop_duplicates
+
+    postings = generate_relisted(args.postings, args.exact, args.near, args.edits)
+    texts = pipeline.clean_descriptions(pd.Series([text for text, _ in postings])).tolist()
+    records = list(zip(texts, range(len(texts))))
+    extractor = pipeline.build_extractor('vocab')
+
+    start = time.perf_counter()
+    for _ in pipeline.iter_skill_records(records, extractor):
+        pass
+    extract_seconds = time.perf_counter() - start
+    per_posting = extract_seconds / len(records)
+    print(f"{len(records)} postings, extraction {per_posting * 1e6:.0f}µs/posting\n")
+
+    copies = sum(origin is not None for _, origin in postings)
+    for mode in ('exact', 'minhash'):
+        stats = {}
+        start = time.perf_counter()
+        kept = {i for _, i in drop_duplicates(records, create_dedup(mode), mode, stats)}
+        seconds = time.perf_counter() - start
+        dropped = [i for i in range(len(records)) if i not in kept]
+        caught = sum(postings[i][1] is not None for i in dropped)
+        wrong = len(dropped) - caught
+        saved = len(dropped) * per_posting
+        print(f"{mode:<8} caught {caught}/{copies} copies ({caught / copies:.1%}), "
+              f"{wrong} distinct postings dropped, {seconds / len(records) * 1e6:.0f}µs/posting; "
+              f"dedup {seconds:.2f}s vs extraction saved {saved:.2f}s\n")
+
+
+if __name__ == '__main__':
+    main()
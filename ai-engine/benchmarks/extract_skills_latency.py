@@ -0,0 +1,52 @@
+"""Request latency of POST /extract-skills through the Flask app, p50/p99.
+
+    python -m benchmarks.extract_skills_latency --requests 2000 --threads 4
+
+The first request is timed separately: the extraction pipeline is built and
+warmed at import, so it should look like any other request.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import generate_postings
+from benchmarks.timing import format_summary, summarize
+
+
+def timed_post(client, text):
+    start = time.perf_counter()
+    response = client.post('/extract-skills', json={'text': text})
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        raise RuntimeError(f"/extract-skills returned {response.status_code}: {response.get_data(as_text=True)}")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    import_start = time.perf_counter()
+    import server
+    print(f"import server: {time.perf_counter() - import_start:.3f}s")
+
+    texts = generate_postings(args.requests + 1, seed=args.seed)
+    first = timed_post(server.app.test_client(), texts[0])
+    print(f"first request: {first * 1000:.3f}ms")
+
+    def worker(batch):
+        client = server.app.test_client()
+        return [timed_post(client, text) for text in batch]
+
+    batches = [texts[1 + i::args.threads] for i in range(args.threads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        latencies = [latency for batch in pool.map(worker, batches) for latency in batch]
+    print(format_summary('/extract-skills', summarize(latencies, time.perf_counter() - start)))
+
+
+if __name__ == '__main__':
+    main()
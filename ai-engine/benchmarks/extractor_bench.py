@@ -0,0 +1,51 @@
+"""Parity check and throughput benchmark: vocabulary-index extractor vs spaCy PhraseMatcher.
+
+    python -m benchmarks.extractor_bench --postings 20000
+
+Exits non-zero if any posting's skill set differs between the two backends.
+"""
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from main import EXCLUDED_CATEGORIES, build_extractor, clean_descriptions
+from taxonomy import current_taxonomy, surface_terms
+from benchmarks.synthetic import generate_postings
+
+
+def run_backend(backend, texts):
+    extractor = build_extractor(backend, n_process=1)
+    start = time.perf_counter()
+    results = [skills for _, skills in extractor((text, None) for text in texts)]
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postings', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    texts = clean_descriptions(pd.Series(generate_postings(args.postings, seed=args.seed))).tolist()
+    words = sum(len(text.split()) for text in texts)
+    terms = surface_terms(current_taxonomy(), exclude_categories=EXCLUDED_CATEGORIES)
+    print(f"{len(texts)} postings, {words} words, {len(terms)} skill terms")
+
+    reference, spacy_seconds = run_backend('spacy', texts)
+    candidate, vocab_seconds = run_backend('vocab', texts)
+
+    for name, seconds in (('spacy', spacy_seconds), ('vocab', vocab_seconds)):
+        print(f"{name:>6}: {seconds:8.3f}s  {len(texts) / seconds:12,.0f} postings/s")
+    print(f"speedup: {spacy_seconds / vocab_seconds:.1f}x per core")
+
+    mismatches = [(i, ref, got) for i, (ref, got) in enumerate(zip(reference, candidate)) if ref != got]
+    for i, ref, got in mismatches[:10]:
+        print(f"posting {i}: spacy-only={sorted(ref - got)} vocab-only={sorted(got - ref)}")
+    print(f"parity: {len(texts) - len(mismatches)}/{len(texts)} postings identical")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
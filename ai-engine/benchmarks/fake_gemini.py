@@ -0,0 +1,123 @@
+"""Local stand-in for the Gemini REST API, for exercising the LLM gateway offline.
+
+    python -m benchmarks.fake_gemini --port 8089 --latency 0.5 --token-latency 0.05
+    GEMINI_BASE_URL=http://127.0.0.1:8089 GEMINI_API_KEY=fake python server.py
+
+Replies are generated at one word every `token_latency` seconds after an
+initial `latency`: streamGenerateContent sends each word as a server-sent event
+as it is "generated", generateContent answers once the whole reply is done. The reply is chosen from the prompt so every endpoint
+gets something it can parse: a JSON array for related-skill prompts, a trend
+object for trend prompts, a resume analysis for resume prompts, and plain text
+otherwise. With --fail-rate the server answers that share of requests with 503.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def reply_for(prompt):
+    if "highly related technical skills" in prompt:
+        return json.dumps(["Docker", "Kubernetes", "Terraform", "Linux", "Git"])
+    if "skill trend analysis" in prompt:
+        return json.dumps({"trend": "Growing", "score": 77, "reason": "Fake model reply."})
+    if "Resume Text:" in prompt:
+        return "```json\n" + json.dumps({"technical_skills": ["Python"], "soft_skills": ["Leadership"],
+                                         "role": "Engineer", "seniority": "Mid"}) + "\n```"
+    return ("Fake mentor reply. Start by picking one skill that shows up in the roles you want, build a small "
+            "project with it, and write down what you learned. Then share it, ask for feedback, and repeat with "
+            "the next skill on your list. Consistent small steps beat occasional big pushes. Keep learning!")
+
+
+def _response(text):
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+        "usageMetadata": {"promptTokenCount": 1, "candidatesTokenCount": 1, "totalTokenCount": 2},
+    }
+
+
+def make_handler(settings):
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            with settings['lock']:
+                settings['requests'] += 1
+                settings['paths'].append(self.path)
+            prompt = ''.join(part.get('text', '')
+                             for content in body.get('contents', []) for part in content.get('parts', []))
+            time.sleep(settings['latency'])
+
+            if settings['rng'].random() < settings['fail_rate']:
+                payload = json.dumps({"error": {"code": 503, "message": "Fake overload", "status": "UNAVAILABLE"}}).encode()
+                self.send_response(503)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            text = reply_for(prompt)
+            if ':streamGenerateContent' in self.path:
+                self._stream(text)
+                return
+            time.sleep(settings['token_latency'] * (len(text.split(' ')) - 1))
+            payload = json.dumps(_response(text)).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _stream(self, text):
+            # No Content-Length: the body is written word by word and ends when the connection closes.
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            words = text.split(' ')
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(settings['token_latency'])
+                chunk = word + (' ' if i < len(words) - 1 else '')
+                self.wfile.write(f"data: {json.dumps(_response(chunk))}\r\n\r\n".encode())
+                self.wfile.flush()
+
+    return FakeGeminiHandler
+
+
+def start_fake_gemini(port=0, latency=0.0, fail_rate=0.0, seed=0, token_latency=0.0):
+    """Serve on a background thread; returns (server, settings). settings can be changed live."""
+    settings = {'latency': latency, 'token_latency': token_latency, 'fail_rate': fail_rate, 'rng': random.Random(seed),
+                'lock': threading.Lock(), 'requests': 0, 'paths': []}
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(settings))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, settings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--token-latency', type=float, default=0.05)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    server, _ = start_fake_gemini(args.port, args.latency, args.fail_rate, token_latency=args.token_latency)
+    print(f"Fake Gemini listening on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
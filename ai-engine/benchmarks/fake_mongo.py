@@ -0,0 +1,69 @@
+"""In-memory stand-in for the MongoDB database main.py writes to, for benchmarking its save stage offline.
+
+    db = create_fake_db()
+    main.connect_db = lambda: db
+
+Covers what save_to_db_bulk() and save_per_skill() call: update_one with
+$set and $push/$each, unordered bulk_write of UpdateOne, create_index, drop
+and rename. Every write is BSON-encoded as the driver would before sending
+it, so the stage still pays for serialization (and fails on values MongoDB
+cannot store, like NumPy scalars); only the network round trip is missing.
+"""
+import bson
+
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db, self.name, self.documents = db, name, {}
+
+    def drop(self):
+        self.documents.clear()
+
+    def create_index(self, key, unique=False):
+        return f"{key}_1"
+
+    def update_one(self, filter, update, upsert=False):
+        self.db.stats['bytes'] += len(bson.encode({'q': filter, 'u': update}))
+        self.db.stats['writes'] += 1
+        key = tuple(sorted(filter.items()))
+        document = self.documents.get(key)
+        if document is None:
+            if not upsert:
+                return
+            document = self.documents[key] = dict(filter)
+        document.update(update.get('$set', {}))
+        for field, value in update.get('$push', {}).items():
+            document.setdefault(field, []).extend(value['$each'] if isinstance(value, dict) else [value])
+
+    def bulk_write(self, requests, ordered=True):
+        self.db.stats['batches'] += 1
+        for op in requests:
+            self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+    def rename(self, new_name, dropTarget=False):
+        self.db.collections.pop(self.name, None)
+        self.name = new_name
+        self.db.collections[new_name] = self
+
+    def count_documents(self, filter=None):
+        return len(self.documents)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections = {}
+        self.stats = {'writes': 0, 'batches': 0, 'bytes': 0}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(self, name)
+        return self.collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+
+def create_fake_db():
+    return FakeDatabase()
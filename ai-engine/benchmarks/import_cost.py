@@ -0,0 +1,93 @@
+"""Cold-start cost of server.py: import time, per-dependency import cost, warm-up time.
+
+    python -m benchmarks.import_cost --budget-ms 1000
+
+Every measurement runs in a fresh interpreter. `import server` is broken down
+with `python -X importtime` into the cumulative cost of each module it
+imports directly. Each heavy dependency is also imported on its own, to
+show what its first use costs. With --budget-ms the script exits non-zero when
+`import server` takes longer, so a module-level import that sneaks back in is
+caught.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_DEPENDENCIES = ['spacy', 'google.genai', 'pdfplumber', 'serpapi', 'statsmodels.tsa.holtwinters',
+                      'textblob', 'pandas', 'numpy']
+
+
+def run_python(code, *flags):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *flags, '-c', code], cwd=ENGINE_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"python -c {code!r} failed:\n{result.stderr}")
+    return elapsed, result.stderr
+
+
+def import_breakdown(module):
+    """[(name, cumulative microseconds)] for each module imported directly by `import module`."""
+    _, stderr = run_python(f"import {module}", '-X', 'importtime')
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or line.count('|') != 2:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        # importtime prints children (one level deeper) before their parent.
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        if depth == 0:
+            if name.strip() == module:
+                return children
+            children = []
+        elif depth == 1:
+            children.append((name.strip(), int(cumulative)))
+    return children
+
+
+def timed_seconds(setup, statement):
+    """Seconds `statement` takes in a fresh interpreter after `setup`."""
+    _, stderr = run_python(f"{setup}; import sys, time; t = time.perf_counter(); {statement}; "
+                           f"sys.stderr.write('\\n%r' % (time.perf_counter() - t))")
+    return float(stderr.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help="Best of N fresh interpreters.")
+    parser.add_argument('--top', type=int, default=12)
+    parser.add_argument('--budget-ms', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    server_seconds = min(timed_seconds('pass', 'import server') for _ in range(args.repeat))
+    print(f"import server: {server_seconds * 1000:.0f}ms (best of {args.repeat})")
+
+    breakdown = sorted(import_breakdown('server'), key=lambda item: -item[1])
+    print("\nmodules imported by server.py (cumulative):")
+    for name, micros in breakdown[:args.top]:
+        print(f"  {name:<24} {micros / 1000:8.1f}ms")
+
+    print("\nfirst-use cost of lazily imported dependencies:")
+    for module in HEAVY_DEPENDENCIES:
+        try:
+            seconds = min(timed_seconds('pass', f'import {module}') for _ in range(args.repeat))
+        except RuntimeError:
+            print(f"  {module:<28} not installed")
+            continue
+        print(f"  {module:<28} {seconds * 1000:8.1f}ms")
+
+    warm_seconds = timed_seconds('import server', 'server.warmup(load_models=True)')
+    print(f"\nwarmup(): {warm_seconds * 1000:.0f}ms")
+
+    if args.budget_ms is not None and server_seconds * 1000 > args.budget_ms:
+        print(f"❌ import server took {server_seconds * 1000:.0f}ms, budget is {args.budget_ms:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
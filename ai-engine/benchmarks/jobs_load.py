@@ -0,0 +1,77 @@
+"""Offline load test of GET /jobs with the fixture provider.
+
+    python -m benchmarks.jobs_load --requests 2000 --threads 16 --latency 0.2
+
+Queries follow a skewed popularity distribution over skills and locations, as
+dashboard traffic does. The fixture provider sleeps `--latency` seconds per
+upstream call, standing in for SerpApi. The report gives latency percentiles
+plus how many requests reached the provider, were coalesced onto an
+in-flight call, or were rate limited.
+"""
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import SKILLS
+from benchmarks.timing import format_summary, summarize
+
+LOCATIONS = ['Remote', 'New York', 'London', 'Berlin', 'Bangalore', 'Toronto', 'Sydney']
+
+
+def skewed_queries(n, seed=0):
+    rng = random.Random(seed)
+    skill_weights = [1 / (rank + 1) for rank in range(len(SKILLS))]
+    location_weights = [1 / (rank + 1) for rank in range(len(LOCATIONS))]
+    return list(zip(rng.choices(SKILLS, skill_weights, k=n), rng.choices(LOCATIONS, location_weights, k=n)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--rate-per-minute', type=float, default=600)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.environ.update({
+        'JOBS_PROVIDER': 'fixture',
+        'JOBS_FIXTURE_LATENCY': str(args.latency),
+        'JOBS_RATE_PER_MINUTE': str(args.rate_per_minute),
+    })
+    import server
+    queries = skewed_queries(args.requests, args.seed)
+    print(f"{args.requests} requests, {len(set(queries))} distinct (skill, location) queries, "
+          f"{args.threads} threads, {args.latency * 1000:.0f}ms provider latency")
+
+    def worker(batch):
+        client = server.app.test_client()
+        latencies, statuses = [], Counter()
+        for skill, location in batch:
+            start = time.perf_counter()
+            response = client.get('/jobs', query_string={'skill': skill, 'location': location})
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+        return latencies, statuses
+
+    batches = [queries[i::args.threads] for i in range(args.threads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(worker, batches))
+    wall = time.perf_counter() - start
+
+    latencies = [latency for batch, _ in results for latency in batch]
+    statuses = sum((counts for _, counts in results), Counter())
+    print(format_summary('/jobs', summarize(latencies, wall)))
+    print(f"status codes: {dict(statuses)}")
+    stats = server.job_search_stats(server.job_search)
+    print(f"provider calls {stats['upstream_calls']}, coalesced {stats['coalesced']}, "
+          f"rate limited {stats['rate_limited']}, stale served {stats['stale_served']}, "
+          f"cache hit rate {stats['cache']['hit_rate']:.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Exercise the LLM gateway through the Flask app against the local fake Gemini server.
+
+    python -m benchmarks.llm_gateway_bench --requests 32 --latency 0.3
+
+Three phases: distinct concurrent prompts (bounded concurrency), identical
+concurrent prompts (single-flight, expect one upstream call), and a failing
+upstream (the circuit opens and the remaining requests get the offline
+fallback without waiting on the network).
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_gemini import start_fake_gemini
+
+
+def fire(client, paths_and_bodies, threads):
+    def post(item):
+        path, body = item
+        start = time.perf_counter()
+        response = client.post(path, json=body)
+        return time.perf_counter() - start, response.get_json()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(post, paths_and_bodies))
+    return time.perf_counter() - start, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--latency', type=float, default=0.3)
+    args = parser.parse_args(argv)
+
+    fake, settings = start_fake_gemini(latency=args.latency)
+    os.environ['GEMINI_BASE_URL'] = f"http://127.0.0.1:{fake.server_port}"
+    os.environ['GEMINI_API_KEY'] = 'fake-key'
+    import server
+    client = server.app.test_client()
+    concurrency = server.llm['max_concurrency']
+
+    wall, results = fire(client, [('/chat', {'message': f"question {i}"}) for i in range(args.requests)],
+                         args.requests)
+    print(f"distinct prompts:  {args.requests} requests in {wall:.2f}s, upstream calls {settings['requests']} "
+          f"(concurrency limit {concurrency}, ideal {-(-args.requests // concurrency) * args.latency:.2f}s)")
+    if any(r.get('source') != 'Gemini' for _, r in results):
+        print("❌ some /chat requests did not reach the fake model")
+        sys.exit(1)
+
+    before = settings['requests']
+    wall, results = fire(client, [('/semantic-skills', {'skill': 'python'})] * args.requests, args.requests)
+    print(f"identical prompts: {args.requests} requests in {wall:.2f}s, upstream calls {settings['requests'] - before}")
+
+    settings['fail_rate'] = 1.0
+    before = settings['requests']
+    wall, results = fire(client, [('/predict-trend', {'skill': f"skill {i}"}) for i in range(args.requests)], 1)
+    fallbacks = sum('warning' in r for _, r in results)
+    slowest_after_open = max((latency for latency, _ in results[server.llm['breaker_failures']:]), default=0.0)
+    print(f"failing upstream:  {fallbacks}/{args.requests} fallbacks, upstream calls {settings['requests'] - before}, "
+          f"slowest request after the circuit opened {slowest_after_open * 1000:.1f}ms")
+    print(f"gateway: {server.gateway_stats(server.llm)}")
+
+
+if __name__ == '__main__':
+    main()
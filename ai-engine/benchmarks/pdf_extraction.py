@@ -0,0 +1,60 @@
+"""Resume PDF text extraction: sequential full read vs. budgeted parallel read.
+
+    python -m benchmarks.pdf_extraction --documents 20 --pages 40 --workers 4
+
+The sequential baseline reads every page in one process with no budgets, as
+the service did before. With budgets disabled the parallel extractor must
+return exactly the same text; the script exits non-zero if it does not.
+"""
+import argparse
+import sys
+import time
+
+import pdf_text
+from benchmarks.synthetic import generate_resume_pdfs
+from benchmarks.timing import format_summary, summarize
+
+UNLIMITED = 10 ** 9
+
+
+def timed(documents, **kwargs):
+    latencies, texts = [], []
+    start = time.perf_counter()
+    for data in documents:
+        begin = time.perf_counter()
+        texts.append(pdf_text.extract_text(data, **kwargs))
+        latencies.append(time.perf_counter() - begin)
+    return texts, summarize(latencies, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--documents', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=pdf_text.WORKERS)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    documents = generate_resume_pdfs(args.documents, pages=args.pages, seed=args.seed)
+    print(f"{len(documents)} PDFs x {args.pages} pages, "
+          f"{sum(map(len, documents)) / len(documents) / 1024:.0f} KiB average, {args.workers} workers")
+
+    # Start the pool before timing so worker start-up is not billed to the first document.
+    pdf_text.extract_text(documents[0], max_pages=UNLIMITED, text_budget=UNLIMITED, workers=args.workers)
+
+    baseline, stats = timed(documents, max_pages=UNLIMITED, text_budget=UNLIMITED, workers=1)
+    print(format_summary('sequential, all pages', stats))
+    parallel, stats = timed(documents, max_pages=UNLIMITED, text_budget=UNLIMITED, workers=args.workers)
+    print(format_summary('parallel, all pages', stats))
+    if parallel != baseline:
+        print("❌ Parallel extraction returned different text than the sequential baseline")
+        sys.exit(1)
+
+    budgeted, stats = timed(documents, workers=args.workers)
+    print(format_summary(f"parallel, budgets (pages={pdf_text.MAX_PAGES}, text={pdf_text.TEXT_BUDGET})", stats))
+    kept = sum(map(len, budgeted)) / sum(map(len, baseline))
+    print(f"budgeted extraction kept {kept:.0%} of the text")
+
+
+if __name__ == '__main__':
+    main()
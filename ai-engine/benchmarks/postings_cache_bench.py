@@ -0,0 +1,107 @@
+"""Batch load time from raw CSVs versus the cleaned-postings Parquet cache.
+
+    python -m benchmarks.postings_cache_bench --postings 100000 --files 4
+
+Writes synthetic historical CSVs (HTML-wrapped descriptions, one file per
+year) to a temporary directory, then times the batch pipeline's skill counts:
+
+* raw: stream, clean and extract every CSV (what main.py did before);
+* first run: the same, also writing the postings cache;
+* cached: counts read back from the cache's `skills` column;
+* re-extract: cached descriptions run through a "new" extractor version.
+
+It also times loading the cleaned descriptions for ad-hoc work, raw CSV
+versus load_postings(), and checks every path yields identical counts.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+import main as pipeline
+from benchmarks.synthetic import generate_postings
+from postings_cache import load_postings
+
+
+def write_csvs(directory, postings, files, seed=0):
+    per_file = postings // files
+    for i in range(files):
+        year = 2019 + i
+        texts = generate_postings(per_file, seed=seed + i)
+        pd.DataFrame({'Job Description': texts, 'company': 'Acme'}).to_csv(
+            os.path.join(directory, f"jobs_{year}.csv"), index=False)
+
+
+def timed(label, run):
+    start = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - start
+    print(f"{label:<34} {seconds:8.2f}s")
+    return result, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--postings', type=int, default=100_000)
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--chunk-size', type=int, default=pipeline.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='postings-bench-')
+    csv_dir, cache_dir = os.path.join(workdir, 'historical'), os.path.join(workdir, 'postings')
+    os.makedirs(csv_dir)
+    try:
+        write_csvs(csv_dir, args.postings, args.files)
+        csv_mb = sum(os.path.getsize(os.path.join(csv_dir, f)) for f in os.listdir(csv_dir)) / 1e6
+        print(f"{args.postings} postings in {args.files} CSVs ({csv_mb:.0f} MB)\n")
+
+        extractor = pipeline.build_extractor('vocab')
+        version = pipeline.extractor_version('vocab')
+
+        def raw():
+            chunks = pipeline.iter_historical_chunks(csv_dir, chunk_size=args.chunk_size)
+            return pipeline.count_skills_by_year(
+                pipeline.iter_skill_records(pipeline.iter_cleaned_records(chunks), extractor))
+
+        def cached(version):
+            return lambda: pipeline.count_skills_by_year(pipeline.iter_cached_skill_records(
+                csv_dir, extractor, cache_dir, chunk_size=args.chunk_size, version=version))
+
+        runs = [
+            ('skill counts, raw CSV', raw),
+            ('skill counts, first run (writes cache)', cached(version)),
+            ('skill counts, from cache', cached(version)),
+            ('skill counts, re-extract from cache', cached(version + '-next')),
+        ]
+        results = [timed(label, run) for label, run in runs]
+
+        def raw_descriptions():
+            chunks = pipeline.iter_historical_chunks(csv_dir, chunk_size=args.chunk_size)
+            return [text for text, _ in pipeline.iter_cleaned_records(chunks)]
+
+        print()
+        raw_texts, raw_seconds = timed('cleaned descriptions, raw CSV', raw_descriptions)
+        cached_frame, cached_seconds = timed('cleaned descriptions, load_postings',
+                                             lambda: load_postings(cache_dir, columns=['year', 'Job Description']))
+        cache_mb = sum(os.path.getsize(os.path.join(root, f))
+                       for root, _, files in os.walk(cache_dir) for f in files) / 1e6
+        print(f"\ncache size {cache_mb:.0f} MB; skill counts {results[0][1] / results[2][1]:.1f}x faster, "
+              f"description load {raw_seconds / cached_seconds:.1f}x faster from cache")
+
+        baseline = results[0][0]
+        mismatched = [label for (label, _), (counts, _) in zip(runs, results) if not counts.equals(baseline)]
+        if sorted(raw_texts) != sorted(cached_frame['Job Description'].tolist()):
+            mismatched.append('cleaned descriptions')
+        if mismatched:
+            print(f"❌ results differ from the raw CSV path: {mismatched}")
+            raise SystemExit(1)
+        print("✅ every path produced identical results")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,367 @@
+"""Reproducible benchmark suite for the main.py batch pipeline and every Flask endpoint.
+
+    python -m benchmarks.suite --size small --output before.json
+    python -m benchmarks.suite --size small --output after.json --baseline before.json
+    python -m benchmarks.suite --compare before.json after.json
+
+All input is synthetic and seeded, generated in a temporary directory:
+historical postings CSVs (one per year, with re-listed duplicates) and
+multi-page resume PDFs, sized by --size or the individual flags.
+
+* batch: main.main() runs twice over the CSVs, cold and then with the
+  postings cache warm, writing to an in-memory MongoDB stand-in
+  (benchmarks/fake_mongo.py) unless --mongo-uri points at a scratch local
+  server. Per-stage seconds, rows/s and peak RSS come from its run report.
+* endpoints: server.py is imported with the indexes the batch run wrote,
+  Gemini replaced by benchmarks/fake_gemini.py and SerpApi by the fixture
+  jobs provider, each with a fixed latency. Every endpoint gets --requests
+  requests from --threads concurrent clients; the report gives throughput,
+  p50/p95/p99 latency and status codes. The service's disk caches live in
+  the temporary directory, so every run starts cold, and the /parse-resume
+  result cache is off so that scenario measures parsing. The hit rate of
+  each cache is reported.
+
+Results are saved as JSON (default data/benchmarks/suite-<size>-<time>.json)
+with the config, the environment and a flat "metrics" map. Against a
+--baseline, every metric that got worse by more than --tolerance is listed,
+and --fail-on-regression exits 1 if there is any.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.chat_stream_bench import synthetic_history
+from benchmarks.dedup_bench import generate_relisted
+from benchmarks.jobs_load import skewed_queries
+from benchmarks.synthetic import SKILLS, generate_postings, generate_resume_pdfs
+from benchmarks.timing import format_summary, summarize
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ENGINE_DIR, 'data', 'benchmarks')
+SUITE_VERSION = 2
+
+SIZES = {
+    'small': {'postings': 20_000, 'years': 4, 'resumes': 10, 'requests': 100},
+    'medium': {'postings': 100_000, 'years': 5, 'resumes': 30, 'requests': 500},
+    'large': {'postings': 500_000, 'years': 6, 'resumes': 100, 'requests': 2000},
+}
+BATCH_TEXTS = 20
+# Below these a change is noise, whatever the relative difference.
+NOISE_FLOORS = (('seconds', 0.05), ('_ms', 1.0), ('rss_mb', 16.0))
+
+
+# --- Synthetic input ---
+def write_historical_csvs(directory, postings, years, seed=0):
+    import pandas as pd
+
+    os.makedirs(directory, exist_ok=True)
+    for i in range(years):
+        texts = [text for text, _ in generate_relisted(postings // years, 0.1, 0.1, 3, seed=seed + i)]
+        pd.DataFrame({'Job Description': texts, 'company': 'Acme'}).to_csv(
+            os.path.join(directory, f"jobs_{2024 - years + 1 + i}.csv"), index=False)
+
+
+# --- Batch pipeline ---
+def run_batch(workdir, label, db, args):
+    """One main.main() run in `workdir`; returns its run report."""
+    import main as pipeline
+
+    if db is not None:
+        pipeline.connect_db = lambda: db
+    report_path = os.path.join(workdir, 'reports', f"batch-{label}.json")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        pipeline.main(chunk_size=args.chunk_size, storage=args.storage,
+                      trend_index_path=os.path.join(workdir, 'trend_index.npy'),
+                      cooccurrence_index_path=os.path.join(workdir, 'cooccurrence_index.npy'),
+                      postings_cache_dir=os.path.join(workdir, 'data', 'postings'),
+                      report_path=report_path)
+    finally:
+        os.chdir(cwd)
+    with open(report_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# --- Endpoints ---
+def endpoint_scenarios(skills, texts, pdfs, seed=0):
+    """{name: request(i) -> (method, path, kwargs for the test client)} for every endpoint."""
+    rng = random.Random(seed)
+    queries = skewed_queries(1000, seed)
+    history = synthetic_history(12)
+    series = [[round(rng.uniform(10, 500), 1) for _ in range(6)] for _ in range(100)]
+
+    def text(i):
+        return texts[i % len(texts)]
+
+    def batch(i):
+        start = (i * BATCH_TEXTS) % len(texts)
+        return (texts + texts)[start:start + BATCH_TEXTS]
+
+    def skill(i):
+        # Every other request asks for a skill the indexes do not cover, which goes to the LLM.
+        return skills[i % len(skills)] if i % 2 else f"framework-{i % 50}"
+
+    def forecast_body(i):
+        return {'skill': skills[i % len(skills)], 'history': series[i % len(series)], 'years': 3}
+
+    return {
+        'GET /health': lambda i: ('GET', '/health', {}),
+        'GET /health/ready': lambda i: ('GET', '/health/ready', {}),
+        'POST /extract-skills': lambda i: ('POST', '/extract-skills', {'json': {'text': text(i)}}),
+        'POST /extract-skills/batch': lambda i: ('POST', '/extract-skills/batch', {'json': {'texts': batch(i)}}),
+        'POST /analyze-sentiment': lambda i: ('POST', '/analyze-sentiment', {'json': {'text': text(i)}}),
+        'POST /analyze-sentiment/batch': lambda i: ('POST', '/analyze-sentiment/batch',
+                                                   {'json': {'texts': batch(i)}}),
+        'POST /predict-trend': lambda i: ('POST', '/predict-trend', {'json': {'skill': skill(i)}}),
+        'POST /semantic-skills': lambda i: ('POST', '/semantic-skills', {'json': {'skill': skill(i)}}),
+        'POST /forecast': lambda i: ('POST', '/forecast', {'json': forecast_body(i)}),
+        'POST /forecast/batch': lambda i: ('POST', '/forecast/batch', {'json': {
+            'series': [forecast_body(i * BATCH_TEXTS + j) for j in range(BATCH_TEXTS)]}}),
+        'POST /parse-resume': lambda i: ('POST', '/parse-resume', {
+            'data': {'file': (io.BytesIO(pdfs[i % len(pdfs)]), 'resume.pdf')},
+            'content_type': 'multipart/form-data'}),
+        'GET /jobs': lambda i: ('GET', '/jobs', {'query_string': dict(zip(('skill', 'location'),
+                                                                           queries[i % len(queries)]))}),
+        'POST /chat': lambda i: ('POST', '/chat', {'json': {'message': f"How do I grow my career? ({i % 20})",
+                                                            'history': history}}),
+    }
+
+
+def load_endpoint(app, request, requests, threads, warmup=1):
+    """Latency summary and status codes of `requests` calls spread over `threads` clients."""
+    client = app.test_client()
+    for i in range(warmup):
+        method, path, kwargs = request(-1 - i)
+        client.open(path, method=method, **kwargs)
+
+    def worker(indices):
+        client = app.test_client()
+        latencies, statuses = [], Counter()
+        for i in indices:
+            method, path, kwargs = request(i)
+            start = time.perf_counter()
+            response = client.open(path, method=method, **kwargs)
+            response.get_data()
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+        return latencies, statuses
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(worker, [range(i, requests, threads) for i in range(threads)]))
+    wall = time.perf_counter() - start
+
+    latencies = [latency for batch, _ in results for latency in batch]
+    statuses = sum((counts for _, counts in results), Counter())
+    summary = summarize(latencies, wall)
+    summary['statuses'] = {str(code): n for code, n in sorted(statuses.items())}
+    summary['error_rate'] = round(sum(n for code, n in statuses.items() if code >= 400) / len(latencies), 4)
+    return summary
+
+
+# --- Results ---
+def flatten_metrics(batch, startup, endpoints):
+    metrics = {f"server.{key}": value for key, value in startup.items()}
+    for label, report in batch.items():
+        metrics[f"batch.{label}.wall_seconds"] = report['wall_seconds']
+        metrics[f"batch.{label}.peak_rss_mb"] = report['peak_rss_mb']
+        for entry in report['stages']:
+            metrics[f"batch.{label}.{entry['stage']}.seconds"] = entry['seconds']
+            if entry['rows_per_sec'] and entry['seconds'] > _noise_floor('seconds'):
+                metrics[f"batch.{label}.{entry['stage']}.rows_per_sec"] = entry['rows_per_sec']
+    for name, summary in endpoints.items():
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'per_second', 'error_rate'):
+            metrics[f"endpoint.{name}.{key}"] = summary[key]
+    return {name: value for name, value in metrics.items() if value is not None}
+
+
+def _higher_is_better(name):
+    return name.endswith(('per_second', 'per_sec'))
+
+
+def _noise_floor(name):
+    return next((floor for suffix, floor in NOISE_FLOORS if name.endswith(suffix)), 0.0)
+
+
+def compare_results(baseline, current, tolerance=0.2):
+    """[(metric, baseline, current, relative change)] for every metric worse than baseline by over `tolerance`."""
+    regressions = []
+    for name, old in baseline['metrics'].items():
+        new = current['metrics'].get(name)
+        if new is None or max(old, new) <= _noise_floor(name):
+            continue
+        if old == 0:
+            change = float('inf') if new > 0 else 0.0
+        else:
+            change = (new - old) / old
+        worse = -change if _higher_is_better(name) else change
+        if worse > tolerance:
+            regressions.append((name, old, new, change))
+    return regressions
+
+
+def print_comparison(baseline, current, tolerance):
+    if baseline.get('config') != current.get('config'):
+        print("⚠️ Baseline was run with a different config; differences may not be regressions.")
+    regressions = compare_results(baseline, current, tolerance)
+    if not regressions:
+        print(f"✅ No metric worse than the baseline by more than {tolerance:.0%}.")
+    else:
+        print(f"❌ {len(regressions)} metric(s) worse than the baseline by more than {tolerance:.0%}:")
+        for name, old, new, change in regressions:
+            print(f"   {name:<58} {old:>12,.3f} -> {new:>12,.3f} ({change:+.0%})")
+    return regressions
+
+
+def _environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ENGINE_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'cpu_count': os.cpu_count(), 'commit': commit}
+
+
+def _load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', choices=SIZES, default='small')
+    parser.add_argument('--postings', type=int, help="Historical postings in total (overrides --size).")
+    parser.add_argument('--years', type=int, help="Historical CSVs, one per year (overrides --size).")
+    parser.add_argument('--resumes', type=int, help="Distinct resume PDFs (overrides --size).")
+    parser.add_argument('--requests', type=int, help="Requests per endpoint (overrides --size).")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--storage', choices=['per-skill', 'document'], default='per-skill')
+    parser.add_argument('--mongo-uri', help="Write to this MongoDB instead of the in-memory stand-in. "
+                                            "Use a scratch server: the skill_evolution database is overwritten.")
+    parser.add_argument('--llm-latency', type=float, default=0.2, help="Seconds per fake Gemini reply.")
+    parser.add_argument('--serpapi-latency', type=float, default=0.2, help="Seconds per fixture jobs call.")
+    parser.add_argument('--skip-batch', action='store_true')
+    parser.add_argument('--skip-endpoints', action='store_true')
+    parser.add_argument('--output', help="Where to save the results (default data/benchmarks/...).")
+    parser.add_argument('--baseline', help="Earlier results to compare against.")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Only compare two saved results.")
+    args = parser.parse_args(argv)
+    for key, value in SIZES[args.size].items():
+        if getattr(args, key) is None:
+            setattr(args, key, value)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        regressions = print_comparison(_load(args.compare[0]), _load(args.compare[1]), args.tolerance)
+        sys.exit(1 if regressions and args.fail_on_regression else 0)
+
+    config = {key: getattr(args, key) for key in ('size', 'postings', 'years', 'resumes', 'requests', 'threads',
+                                                  'seed', 'chunk_size', 'storage', 'llm_latency', 'serpapi_latency')}
+    config['mongo'] = 'local' if args.mongo_uri else 'in-memory'
+    workdir = tempfile.mkdtemp(prefix='suite-')
+    batch, startup, endpoints, caches = {}, {}, {}, {}
+    try:
+        print(f"--- Generating {args.postings} postings in {args.years} CSVs and {args.resumes} resume PDFs ---")
+        write_historical_csvs(os.path.join(workdir, 'data', 'historical'), args.postings, args.years, args.seed)
+        pdfs = generate_resume_pdfs(args.resumes, seed=args.seed)
+
+        if not args.skip_batch:
+            db = None
+            if args.mongo_uri:
+                os.environ['MONGO_URI'] = args.mongo_uri
+            else:
+                from benchmarks.fake_mongo import create_fake_db
+                db = create_fake_db()
+            for label in ('cold', 'cached'):
+                print(f"\n--- Batch pipeline ({label}) ---")
+                batch[label] = run_batch(workdir, label, db, args)
+
+        if not args.skip_endpoints:
+            from benchmarks.fake_gemini import start_fake_gemini
+
+            fake, _ = start_fake_gemini(latency=args.llm_latency, seed=args.seed)
+            os.environ.update({
+                'GEMINI_API_KEY': 'fake',
+                'GEMINI_BASE_URL': f"http://127.0.0.1:{fake.server_port}",
+                'JOBS_PROVIDER': 'fixture',
+                'JOBS_FIXTURE_LATENCY': str(args.serpapi_latency),
+                'JOBS_RATE_PER_MINUTE': '1000000',
+                'JOBS_RATE_BURST': '1000000',
+                'TREND_INDEX_PATH': os.path.join(workdir, 'trend_index.npy'),
+                'COOCCURRENCE_INDEX_PATH': os.path.join(workdir, 'cooccurrence_index.npy'),
+                # Every run starts cold, and fake answers never reach the service's real caches.
+                'SKILL_ANSWER_CACHE_DIR': os.path.join(workdir, 'cache', 'skill_answers'),
+                'JOBS_CACHE_DIR': os.path.join(workdir, 'cache', 'jobs'),
+                'FORECAST_CACHE_DIR': os.path.join(workdir, 'cache', 'forecast'),
+                # Only --resumes distinct PDFs are uploaded, so a result cache would answer nearly
+                # every /parse-resume request; measure the parse itself instead.
+                'RESUME_CACHE_DIR': '',
+                'RESUME_CACHE_SIZE': '0',
+            })
+            start = time.perf_counter()
+            import server
+            startup['import_seconds'] = round(time.perf_counter() - start, 4)
+            start = time.perf_counter()
+            server.warmup()
+            startup['warmup_seconds'] = round(time.perf_counter() - start, 4)
+            print(f"\nserver import {startup['import_seconds']:.2f}s, warmup {startup['warmup_seconds']:.2f}s")
+
+            skills = list(server.trend_index['lookup']) if server.trend_index else [s.lower() for s in SKILLS]
+            texts = generate_postings(200, seed=args.seed)
+            print(f"\n--- Endpoints: {args.requests} requests each, {args.threads} threads ---")
+            for name, request in endpoint_scenarios(skills, texts, pdfs, args.seed).items():
+                endpoints[name] = load_endpoint(server.app, request, args.requests, args.threads)
+                print(f"{format_summary(name, endpoints[name])}  {endpoints[name]['statuses']}")
+            health = server.app.test_client().get('/health').get_json()
+            caches = {name: health[name] for name in ('resume_cache', 'forecast_cache', 'skill_answer_cache')}
+            caches['jobs_cache'] = health['jobs'].get('cache')
+            print("\ncache hit rates: " + ", ".join(f"{name} {stats['hit_rate']:.0%}"
+                                                  for name, stats in caches.items() if stats))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        'suite_version': SUITE_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'config': config,
+        'environment': _environment(),
+        'metrics': flatten_metrics(batch, startup, endpoints),
+        'batch': batch,
+        'server_startup': startup,
+        'endpoints': endpoints,
+        'caches': caches,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime(f"suite-{args.size}-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📊 Results written to {output}")
+
+    if args.baseline:
+        regressions = print_comparison(_load(args.baseline), results, args.tolerance)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Synthetic job-posting text for benchmarks.
+
+Postings mix filler prose with skill mentions in the spellings real
+listings use (punctuation attached, hyphenated, dotted, HTML-wrapped) so
+extractors are exercised on their tokenization edge cases.
+"""
+import random
+
+FILLER = (
+    "we are looking for a motivated engineer to join our growing team you will design build and "
+    "maintain scalable services collaborate with product and data teams own features end to end "
+    "mentor junior developers and improve our delivery process experience with modern tooling is "
+    "a plus strong communication skills required competitive salary remote friendly benefits "
+    "include health insurance equity and learning budget years of experience in a fast paced "
+    "environment bachelor degree in computer science or related field"
+).split()
+
+SKILLS = [
+    'python', 'r', 'sql', 'java', 'scala', 'javascript', 'html', 'css', 'tableau', 'power bi',
+    'sas', 'excel', 'hadoop', 'spark', 'aws', 'azure', 'gcp', 'tensorflow', 'pytorch',
+    'scikit-learn', 'docker', 'kubernetes', 'react', 'mongodb', 'vue', 'angular', 'typescript',
+    'node.js', 'c++', 'c#', 'go', 'rust', 'ci/cd', 'terraform', 'linux', 'git', 'flask', 'django',
+]
+
+DECORATIONS = [
+    '{}', '{}', '{}', '{},', '({})', '{}.', '{}/sql', '"{}"', '{}-based', '<b>{}</b>', '{}3',
+    '{}.js', '{}\'s', '#{}', '{};', 'with {} and', 'Senior {} Developer', '{}!',
+]
+
+
+def generate_posting(rng, min_words=120, max_words=400, skill_rate=0.04):
+    words = []
+    for _ in range(rng.randint(min_words, max_words)):
+        if rng.random() < skill_rate:
+            skill = rng.choice(SKILLS)
+            if rng.random() < 0.3:
+                skill = skill.upper() if rng.random() < 0.5 else skill.title()
+            words.append(rng.choice(DECORATIONS).format(skill))
+        else:
+            words.append(rng.choice(FILLER))
+    return '<p>' + ' '.join(words) + '</p>'
+
+
+def generate_postings(n, seed=0, **kwargs):
+    rng = random.Random(seed)
+    return [generate_posting(rng, **kwargs) for _ in range(n)]
+
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(pages, line_width=95, lines_per_page=55):
+    """A minimal PDF (Helvetica, one text stream per page) holding the given page texts."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines, line = [], ''
+        for word in text.split():
+            if line and len(line) + len(word) >= line_width:
+                lines.append(line)
+                line = ''
+            line = f"{line} {word}" if line else word
+        lines.append(line)
+        body = ' '.join(f"({_pdf_escape(line)}) Tj T*" for line in lines[:lines_per_page])
+        stream = f"BT /F1 9 Tf 12 TL 40 760 Td {body} ET"
+        kids.append(f"{len(objects) + 1} 0 R")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode('latin-1')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b''.join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def generate_resume_pdfs(n, pages=10, seed=0):
+    """n PDFs of `pages` pages, each page filled with a synthetic posting's text."""
+    rng = random.Random(seed)
+    return [build_pdf([generate_posting(rng, min_words=450, max_words=500)[3:-4] for _ in range(pages)])
+            for _ in range(n)]
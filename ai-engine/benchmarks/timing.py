@@ -0,0 +1,31 @@
+"""Latency summaries shared by the benchmarks."""
+import statistics
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(0, min(len(sorted_samples) - 1, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(latencies, wall_seconds=None):
+    """p50/p95/p99/mean in milliseconds, plus throughput when the wall time is known."""
+    ordered = sorted(latencies)
+    summary = {
+        'count': len(ordered),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+    }
+    if wall_seconds:
+        summary['per_second'] = round(len(ordered) / wall_seconds, 1)
+    return summary
+
+
+def format_summary(name, summary):
+    line = (f"{name:<24} n={summary['count']:<6} p50={summary['p50_ms']:>9.3f}ms "
+            f"p95={summary['p95_ms']:>9.3f}ms p99={summary['p99_ms']:>9.3f}ms")
+    if 'per_second' in summary:
+        line += f" {summary['per_second']:>10,.1f}/s"
+    return line
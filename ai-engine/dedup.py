@@ -0,0 +1,175 @@
+"""Duplicate job posting removal between cleaning and skill extraction.
+
+Job boards re-list the same posting many times, which inflates demand counts
+and wastes extraction time. drop_duplicates() streams cleaned (text, context)
+records and drops a record when
+
+* its text is identical to an earlier one (64-bit hash of the text), or
+* in 'minhash' mode, its word-shingle Jaccard similarity to an earlier one is
+  estimated at DEDUP_THRESHOLD or more. Each text gets a one-permutation
+  MinHash signature over its word 3-grams: every shingle is hashed once into
+  one of DEDUP_NUM_PERM bins and each bin keeps its minimum. Signatures are
+  split into DEDUP_BANDS bands for locality-sensitive hashing, and records
+  that share a band with an earlier one are compared on their full
+  signatures. Signatures are computed with NumPy for blocks of records at a
+  time.
+
+Memory stays within DEDUP_MEMORY_MB: hashes, band tables and signatures are
+kept in two generations, and when the current one is full the older one is
+dropped, so duplicates are caught within a sliding window of the most recent
+postings (about DEDUP_MEMORY_MB * 1000 of them). Each call starts empty, so
+files are deduplicated independently.
+"""
+import os
+import zlib
+
+import numpy as np
+
+MODES = ('minhash', 'exact', 'off')
+MODE = os.getenv("DEDUP_MODE", "minhash")
+THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+BANDS = int(os.getenv("DEDUP_BANDS", "8"))
+MEMORY_MB = float(os.getenv("DEDUP_MEMORY_MB", "256"))
+BLOCK_SIZE = 1024
+# Rough footprint of one remembered posting: exact hash, band table entries and signature.
+BYTES_PER_POSTING = 1000
+
+EMPTY = np.uint32(0xFFFFFFFF)
+_SHINGLE_MULTIPLIERS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F))
+_MIX = np.uint64(0xFF51AFD7ED558CCD)
+
+
+def create_dedup(mode=MODE, threshold=THRESHOLD, num_perm=NUM_PERM, bands=BANDS, memory_mb=MEMORY_MB):
+    """Duplicate filter settings; None when mode is 'off'."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown dedup mode '{mode}'; expected one of {MODES}")
+    if mode == 'off':
+        return None
+    if num_perm % bands:
+        raise ValueError("DEDUP_NUM_PERM must be a multiple of DEDUP_BANDS")
+    return {
+        'mode': mode,
+        'threshold': threshold,
+        'num_perm': num_perm,
+        'bands': bands,
+        'generation_size': max(1, int(memory_mb * 1024 * 1024 / BYTES_PER_POSTING / 2)),
+    }
+
+
+def dedup_settings(dedup):
+    """Settings that change which postings are kept, for cache and checkpoint keys."""
+    if dedup is None:
+        return "off"
+    if dedup['mode'] == 'exact':
+        return "exact"
+    return f"minhash:t={dedup['threshold']},p={dedup['num_perm']},b={dedup['bands']}"
+
+
+def minhash_block(texts, num_perm=NUM_PERM):
+    """One-permutation MinHash signatures (len(texts) x num_perm, uint32) of the texts' word 3-grams.
+
+    Bins no shingle falls into hold EMPTY; texts under three words get no shingles at all.
+    """
+    signatures = np.full((len(texts), num_perm), EMPTY, dtype=np.uint32)
+    words, counts = [], []
+    for text in texts:
+        split = text.encode().split()
+        counts.append(len(split))
+        words.extend(map(zlib.crc32, split))
+    if len(words) < 3:
+        return signatures
+    words = np.array(words, dtype=np.uint64)
+    doc = np.repeat(np.arange(len(texts)), counts)
+
+    within = doc[:-2] == doc[2:]
+    first, second = _SHINGLE_MULTIPLIERS
+    shingles = (words[:-2] * first + words[1:-1] * second + words[2:])[within]
+    shingles ^= shingles >> np.uint64(33)
+    shingles *= _MIX
+    shingles ^= shingles >> np.uint64(33)
+
+    bins = ((shingles >> np.uint64(32)) % np.uint64(num_perm)).astype(np.intp)
+    values = (shingles & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    np.minimum.at(signatures.ravel(), doc[:-2][within] * num_perm + bins, values)
+    return signatures
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures, over the bins either of them filled."""
+    filled = (a != EMPTY) | (b != EMPTY)
+    total = np.count_nonzero(filled)
+    return np.count_nonzero((a == b) & filled) / total if total else 0.0
+
+
+def _new_generation(bands):
+    return {'exact': set(), 'bands': [{} for _ in range(bands)], 'signatures': []}
+
+
+def drop_duplicates(records, dedup, label='', stats=None):
+    """Yield the (text, context) records that are not duplicates of an earlier record.
+
+    Counts go into `stats` (postings, exact, near) and are printed once the
+    records are exhausted.
+    """
+    stats = {} if stats is None else stats
+    stats.update(postings=0, exact=0, near=0)
+    if dedup is None:
+        for record in records:
+            stats['postings'] += 1
+            yield record
+        return
+
+    near = dedup['mode'] == 'minhash'
+    bands, rows = dedup['bands'], dedup['num_perm'] // dedup['bands']
+    current, previous = _new_generation(bands), _new_generation(bands)
+    for block in _blocks(records, BLOCK_SIZE):
+        signatures = minhash_block([text for text, _ in block], dedup['num_perm']) if near else None
+        for i, (text, context) in enumerate(block):
+            stats['postings'] += 1
+            digest = hash(text)
+            if digest in current['exact'] or digest in previous['exact']:
+                stats['exact'] += 1
+                continue
+
+            if near:
+                signature = signatures[i]
+                keys = [hash(signature[band * rows:(band + 1) * rows].tobytes()) for band in range(bands)]
+                if _has_near_duplicate(signature, keys, (current, previous), dedup['threshold']):
+                    stats['near'] += 1
+                    continue
+
+            if len(current['exact']) >= dedup['generation_size']:
+                current, previous = _new_generation(bands), current
+            current['exact'].add(digest)
+            if near:
+                position = len(current['signatures'])
+                current['signatures'].append(signature)
+                for table, key in zip(current['bands'], keys):
+                    table.setdefault(key, position)
+            yield text, context
+
+    dropped = stats['exact'] + stats['near']
+    rate = dropped / stats['postings'] if stats['postings'] else 0.0
+    print(f"🧹 {label}: {dropped} of {stats['postings']} postings dropped as duplicates "
+          f"({stats['exact']} exact, {stats['near']} near, {rate:.1%})")
+
+
+def _blocks(records, size):
+    block = []
+    for record in records:
+        block.append(record)
+        if len(block) >= size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def _has_near_duplicate(signature, keys, generations, threshold):
+    for generation in generations:
+        candidates = {table[key] for table, key in zip(generation['bands'], keys) if key in table}
+        for position in candidates:
+            if similarity(generation['signatures'][position], signature) >= threshold:
+                return True
+    return False
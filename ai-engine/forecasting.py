@@ -0,0 +1,77 @@
+"""Damped-trend demand forecasts for the /forecast endpoints.
+
+Series are fitted with statsmodels' Holt-Winters ExponentialSmoothing
+(additive damped trend, no seasonality). Its optimizer cannot pin down its
+parameters on very short series, so series of at most
+FORECAST_FAST_PATH_MAX_POINTS points (default 2) are forecast in closed form
+instead. Through two points Holt-Winters ends at the last value with the
+step between them as its trend, and only its damping is arbitrary (0.96 to
+0.995 depending on the data); the fast path uses FORECAST_DAMPING. From three
+points on, its fit can differ from any fixed-damping line by a quarter or more,
+so raising the threshold trades accuracy for speed. Short series of the same
+length are solved together in one NumPy pass.
+
+Results are memoized on the normalized (values, horizon) pair.
+"""
+import json
+import os
+
+import numpy as np
+
+from result_cache import cache_from_env, cache_get, cache_key, cache_put
+
+FAST_PATH_MAX_POINTS = int(os.getenv("FORECAST_FAST_PATH_MAX_POINTS", "2"))
+DAMPING = float(os.getenv("FORECAST_DAMPING", "0.98"))
+
+forecast_cache = cache_from_env("forecast", "FORECAST", max_entries=4096, ttl=float('inf'))
+
+
+def _memo_key(values, years):
+    return cache_key(json.dumps([values, years]))
+
+
+def _damped_trend(matrix, years):
+    """Closed-form damped-trend forecasts for each row of a (series x points) matrix.
+
+    The OLS line's value at the last point is the level and its slope the trend;
+    for two points that is the last value and the step between them.
+    """
+    points = matrix.shape[1]
+    t = np.arange(points, dtype=float) - (points - 1) / 2.0
+    slope = matrix @ t / (t @ t)
+    level = matrix.mean(axis=1) + slope * t[-1]
+    damped_steps = np.cumsum(DAMPING ** np.arange(1, years + 1))
+    return level[:, None] + slope[:, None] * damped_steps[None, :]
+
+
+def _holt_winters(values, years):
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    model = ExponentialSmoothing(np.asarray(values), trend='add', seasonal=None, damped_trend=True)
+    return model.fit().forecast(years)
+
+
+def forecast_many(requests):
+    """Forecast a list of (values, years) pairs; returns one list of floats per pair, in order.
+
+    `values` must be a list of floats with at least two points.
+    """
+    results = [None] * len(requests)
+    keys = [_memo_key(values, years) for values, years in requests]
+    short = {}
+    for i, (values, years) in enumerate(requests):
+        cached = cache_get(forecast_cache, keys[i])
+        if cached is not None:
+            results[i] = cached
+        elif len(values) <= FAST_PATH_MAX_POINTS:
+            short.setdefault((len(values), years), []).append(i)
+        else:
+            results[i] = [float(v) for v in _holt_winters(values, years)]
+            cache_put(forecast_cache, keys[i], results[i])
+
+    for (_, years), indices in short.items():
+        predictions = _damped_trend(np.array([requests[i][0] for i in indices]), years)
+        for i, row in zip(indices, predictions.tolist()):
+            results[i] = row
+            cache_put(forecast_cache, keys[i], row)
+    return results
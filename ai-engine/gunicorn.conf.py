@@ -0,0 +1,71 @@
+"""Production serving config for the AI engine.
+
+    gunicorn -c gunicorn.conf.py server:app
+
+The app is imported once in the master (preload_app) and warmed there, so the
+spaCy pipeline, the taxonomy, the trend index, statsmodels and the TextBlob
+lexicon are loaded before the workers are forked and shared copy-on-write.
+Workers are threaded because most request time is spent waiting on Gemini,
+SerpApi or the PDF pool.
+
+Environment:
+    PORT                      listen port (5001)
+    WEB_CONCURRENCY           worker processes (CPU count)
+    GUNICORN_THREADS          threads per worker (4)
+    GUNICORN_TIMEOUT          seconds before a silent worker is killed (120)
+    GUNICORN_GRACEFUL_TIMEOUT seconds a stopping worker may drain (30)
+    GUNICORN_MAX_REQUESTS     recycle workers after this many requests (0 = never)
+"""
+import gc
+import os
+import signal
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5001')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+
+
+def when_ready(arbiter):
+    import server as ai_server
+
+    ai_server.warmup()
+    # Keep the warmed objects out of the collector's reach so its bookkeeping
+    # writes do not un-share their pages in every worker.
+    gc.freeze()
+    arbiter.log.info("AI engine warmed up, forking workers")
+
+
+def post_fork(arbiter, worker):
+    import server as ai_server
+
+    ai_server.reset_after_fork()
+
+
+def post_worker_init(worker):
+    import server as ai_server
+
+    if not ai_server.is_ready():
+        ai_server.warmup()
+
+    # Fail readiness as soon as the worker is told to stop, while it drains.
+    handle_exit = worker.handle_exit
+
+    def drain_then_exit(sig, frame):
+        ai_server.begin_shutdown()
+        handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, drain_then_exit)
+
+
+def worker_exit(arbiter, worker):
+    import server as ai_server
+
+    ai_server.shutdown()
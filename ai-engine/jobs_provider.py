@@ -0,0 +1,221 @@
+"""Job search behind /jobs: pluggable provider, TTL cache, request coalescing, rate limit.
+
+JOBS_PROVIDER picks where listings come from:
+
+* ``serpapi`` (default) - Google Jobs through SerpApi;
+* ``fixture`` - offline listings, from the SerpApi-shaped JSON file at
+  JOBS_FIXTURE_PATH if set, otherwise generated deterministically from the
+  query, after JOBS_FIXTURE_LATENCY seconds. Used for load tests.
+
+Results are cached per provider and normalized (skill, location) for
+JOBS_CACHE_TTL seconds (one hour). Concurrent identical searches share one
+upstream call, and upstream calls draw from a token bucket refilled at
+JOBS_RATE_PER_MINUTE with bursts of JOBS_RATE_BURST. When the bucket is
+empty, or the upstream fails, an expired listing (up to JOBS_CACHE_MAX_STALE
+seconds old) is served instead. With nothing to serve, a search waits up to
+JOBS_RATE_MAX_WAIT seconds for a token before RateLimitedError is raised;
+upstream errors are re-raised. Error payloads such as SerpApi's
+{"error": "Invalid API key."} count as upstream failures, not as empty
+listings. Upstream requests time out after JOBS_TIMEOUT seconds, and so does
+a search waiting on another request's call.
+"""
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from result_cache import cache_from_env, cache_key, cache_lookup, cache_put, cache_stats
+
+PROVIDER = os.getenv("JOBS_PROVIDER", "serpapi")
+RATE_PER_MINUTE = float(os.getenv("JOBS_RATE_PER_MINUTE", "30"))
+RATE_BURST = float(os.getenv("JOBS_RATE_BURST", "10"))
+RATE_MAX_WAIT = float(os.getenv("JOBS_RATE_MAX_WAIT", "2"))
+TIMEOUT = float(os.getenv("JOBS_TIMEOUT", "10"))
+# SerpApi reports an empty result set as an error payload too.
+NO_RESULTS_ERRORS = ("Google hasn't returned any results for this query.",)
+
+
+class RateLimitedError(Exception):
+    """The provider's request budget is spent; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Job search rate limit reached, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class JobSearchError(Exception):
+    """The provider answered with an error payload (bad key, quota spent, ...) instead of listings."""
+
+
+# --- Providers: (skill, location) -> SerpApi-shaped {"jobs_results": [...]} ---
+def serpapi_search(skill, location):
+    from serpapi import GoogleSearch
+
+    # Use provided key or env var
+    api_key = os.getenv("SERPAPI_KEY") or "bda925bb735d94acc0c642067a987a39955cbcc2eeb2864f50e33b86be70b251"
+    params = {
+        "engine": "google_jobs",
+        "q": f"{skill} jobs in {location}",
+        "api_key": api_key,
+        "num": 10
+    }
+    search = GoogleSearch(params)
+    search.timeout = TIMEOUT  # seconds, passed to requests; the client's default is 60000
+    return search.get_dict()
+
+
+FIXTURE_COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech"]
+FIXTURE_TITLES = ["{} Developer", "Senior {} Engineer", "{} Consultant", "Lead {} Engineer", "Junior {} Developer"]
+
+
+def fixture_search(skill, location):
+    time.sleep(float(os.getenv("JOBS_FIXTURE_LATENCY", "0")))
+    path = os.getenv("JOBS_FIXTURE_PATH")
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    rng = random.Random(f"{skill}|{location}")
+    return {"jobs_results": [
+        {
+            "title": rng.choice(FIXTURE_TITLES).format(skill),
+            "company_name": rng.choice(FIXTURE_COMPANIES),
+            "location": location,
+            "description": f"We are hiring for {skill} work in {location}. Fixture listing {i + 1}.",
+            "detected_extensions": {"posted_at": f"{rng.randint(1, 30)} days ago", "schedule_type": "Full-time"},
+            "thumbnail": None,
+        }
+        for i in range(10)
+    ]}
+
+
+PROVIDERS = {'serpapi': serpapi_search, 'fixture': fixture_search}
+
+
+def simplify_jobs(results):
+    simplified_jobs = []
+    for job in results.get("jobs_results", []):
+        simplified_jobs.append({
+            "title": job.get("title"),
+            "company_name": job.get("company_name"),
+            "location": job.get("location"),
+            "description": job.get("description"),
+            "detected_extensions": job.get("detected_extensions", {}),
+            "thumbnail": job.get("thumbnail")
+        })
+    return simplified_jobs
+
+
+# --- Search service ---
+def create_job_search(provider=PROVIDER, rate_per_minute=RATE_PER_MINUTE, burst=RATE_BURST, max_wait=RATE_MAX_WAIT,
+                      timeout=TIMEOUT):
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown jobs provider '{provider}'; expected one of {sorted(PROVIDERS)}")
+    return {
+        'provider': provider,
+        'search': PROVIDERS[provider],
+        'cache': cache_from_env("jobs", "JOBS", max_entries=1024, ttl=3600, max_stale=24 * 3600),
+        'rate': rate_per_minute / 60.0,
+        'burst': burst,
+        'max_wait': max_wait,
+        'timeout': timeout,
+        'tokens': burst,
+        'refilled_at': time.monotonic(),
+        'lock': threading.Lock(),
+        'inflight': {},
+        'stats': {'upstream_calls': 0, 'coalesced': 0, 'rate_limited': 0, 'stale_served': 0, 'errors': 0,
+                  'timeouts': 0},
+    }
+
+
+def _take_token(service):
+    """Spend one token, or return the seconds until one is available. Caller holds the lock."""
+    now = time.monotonic()
+    service['tokens'] = min(service['burst'], service['tokens'] + (now - service['refilled_at']) * service['rate'])
+    service['refilled_at'] = now
+    if service['tokens'] >= 1:
+        service['tokens'] -= 1
+        return 0.0
+    return (1 - service['tokens']) / service['rate'] if service['rate'] > 0 else float('inf')
+
+
+def _fetch(service, key, skill, location, future):
+    try:
+        results = service['search'](skill, location)
+        error = results.get("error")
+        if error and error not in NO_RESULTS_ERRORS:
+            raise JobSearchError(f"Job search failed: {error}")
+        jobs = simplify_jobs(results)
+        cache_put(service['cache'], key, jobs)
+        future.set_result(jobs)
+    except Exception as e:
+        with service['lock']:
+            service['stats']['errors'] += 1
+        future.set_exception(e)
+    finally:
+        with service['lock']:
+            service['inflight'].pop(key, None)
+
+
+def search_jobs(service, skill, location):
+    """Return (jobs, stale) for the query; see the module docstring for the fallbacks."""
+    skill_key = ' '.join(skill.lower().split())
+    location_key = ' '.join(location.lower().split())
+    key = cache_key(service['provider'], skill_key, location_key)
+    cached, fresh = cache_lookup(service['cache'], key)
+    if fresh:
+        return cached, False
+
+    deadline = time.monotonic() + service['max_wait']
+    while True:
+        with service['lock']:
+            future = service['inflight'].get(key)
+            owner = future is None
+            if not owner:
+                service['stats']['coalesced'] += 1
+                break
+            wait = _take_token(service)
+            if not wait:
+                future = Future()
+                service['inflight'][key] = future
+                service['stats']['upstream_calls'] += 1
+                break
+            if cached is not None or time.monotonic() + wait > deadline:
+                service['stats']['rate_limited'] += 1
+                if cached is not None:
+                    service['stats']['stale_served'] += 1
+                    return cached, True
+                raise RateLimitedError(wait)
+        # Queue briefly for a token; another request may complete the same search meanwhile.
+        time.sleep(wait)
+        cached, fresh = cache_lookup(service['cache'], key)
+        if fresh:
+            return cached, False
+
+    if owner:
+        _fetch(service, key, skill, location, future)
+    try:
+        try:
+            return future.result(service['timeout']), False
+        except FutureTimeoutError:
+            with service['lock']:
+                service['stats']['timeouts'] += 1
+            raise TimeoutError("Job search exceeded its deadline") from None
+    except Exception:
+        if cached is None:
+            raise
+        with service['lock']:
+            service['stats']['stale_served'] += 1
+        return cached, True
+
+
+def job_search_stats(service):
+    with service['lock']:
+        stats = dict(service['stats'])
+        stats['tokens'] = round(service['tokens'], 2)
+    stats['provider'] = service['provider']
+    stats['cache'] = cache_stats(service['cache'])
+    return stats
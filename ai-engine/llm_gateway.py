@@ -0,0 +1,255 @@
+"""Single gateway for every Gemini call made by the service.
+
+Flask handlers call generate() and block only on their own deadline. The
+requests themselves run on one background asyncio loop per process through
+the client's async API:
+
+* at most LLM_MAX_CONCURRENCY calls are in flight, over a pooled HTTP client
+  holding at most LLM_MAX_CONNECTIONS connections (see http_options());
+* every call has a deadline of LLM_TIMEOUT seconds;
+* identical prompts that are already in flight share one upstream call;
+* a call whose callers have all given up (timed out) is cancelled, so it does
+  not keep a concurrency slot or reach the upstream late for nobody;
+* after LLM_BREAKER_FAILURES consecutive upstream failures the circuit opens
+  and generate() raises CircuitOpenError immediately, so handlers go straight
+  to their offline fallbacks. After LLM_BREAKER_COOLDOWN seconds a single
+  trial call is let through; its outcome closes or re-opens the circuit (a
+  trial stream that stalls or whose client goes away re-opens it).
+
+generate_stream() yields the reply chunk by chunk as the model produces it,
+under the same concurrency limit and breaker. Its deadline applies to the wait
+for each chunk. Streams are never shared between callers.
+
+GEMINI_BASE_URL points the client at another endpoint, e.g. the fake model
+server in benchmarks/fake_gemini.py.
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "16"))
+TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+_END_OF_STREAM = object()
+
+
+class CircuitOpenError(Exception):
+    """The upstream model is failing; use the offline fallback."""
+
+
+def http_options(base_url=None, timeout=TIMEOUT, max_connections=MAX_CONNECTIONS):
+    """HttpOptions for genai.Client: pooled async HTTP client, request timeout, optional base URL."""
+    import httpx
+    from google.genai import types
+
+    return types.HttpOptions(
+        base_url=base_url or os.getenv("GEMINI_BASE_URL") or None,
+        timeout=int(timeout * 1000),
+        httpx_async_client=httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+        ),
+    )
+
+
+def create_gateway(client, model, max_concurrency=MAX_CONCURRENCY, timeout=TIMEOUT,
+                   breaker_failures=BREAKER_FAILURES, breaker_cooldown=BREAKER_COOLDOWN):
+    return {
+        'client': client,
+        'model': model,
+        'max_concurrency': max_concurrency,
+        'timeout': timeout,
+        'breaker_failures': breaker_failures,
+        'breaker_cooldown': breaker_cooldown,
+        'lock': threading.Lock(),
+        'loop': None,
+        'pid': None,
+        'semaphore': None,
+        'inflight': {},
+        'waiters': {},
+        'breaker': {'state': 'closed', 'failures': 0, 'opened_at': 0.0},
+        'stats': {'calls': 0, 'streams': 0, 'deduplicated': 0, 'failures': 0, 'timeouts': 0, 'rejected': 0,
+                  'abandoned': 0},
+    }
+
+
+def _ensure_loop(gateway):
+    """Start the background loop, again after a fork (threads do not survive it)."""
+    if gateway['loop'] is not None and gateway['pid'] == os.getpid():
+        return gateway['loop']
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True).start()
+    gateway.update(loop=loop, pid=os.getpid(), semaphore=None, inflight={}, waiters={})
+    return loop
+
+
+def _semaphore(gateway):
+    if gateway['semaphore'] is None:
+        gateway['semaphore'] = asyncio.Semaphore(gateway['max_concurrency'])
+    return gateway['semaphore']
+
+
+async def _call(gateway, prompt):
+    async with _semaphore(gateway):
+        response = await asyncio.wait_for(
+            gateway['client'].aio.models.generate_content(model=gateway['model'], contents=prompt),
+            gateway['timeout'],
+        )
+    return response.text
+
+
+async def _stream(gateway, prompt, chunks):
+    """Put the text of each streamed response chunk on the `chunks` queue."""
+    async with _semaphore(gateway):
+        stream = await asyncio.wait_for(
+            gateway['client'].aio.models.generate_content_stream(model=gateway['model'], contents=prompt),
+            gateway['timeout'],
+        )
+        responses = stream.__aiter__()
+        while True:
+            try:
+                response = await asyncio.wait_for(responses.__anext__(), gateway['timeout'])
+            except StopAsyncIteration:
+                break
+            if response.text:
+                chunks.put(response.text)
+
+
+def _admit(gateway):
+    """Raise CircuitOpenError unless the breaker lets a call through. Caller holds the lock."""
+    breaker = gateway['breaker']
+    if breaker['state'] == 'closed':
+        return
+    if breaker['state'] == 'open' and time.monotonic() - breaker['opened_at'] >= gateway['breaker_cooldown']:
+        breaker['state'] = 'half-open'
+        return
+    gateway['stats']['rejected'] += 1
+    raise CircuitOpenError("LLM circuit open")
+
+
+def _finish(gateway, key, future):
+    """Record the outcome of one upstream call.
+
+    Calls cancelled by the caller count for nothing, except a half-open trial:
+    it proved nothing either way, so the circuit re-opens for another cooldown.
+    """
+    with gateway['lock']:
+        if gateway['inflight'].get(key) is future:
+            del gateway['inflight'][key]
+        breaker = gateway['breaker']
+        if future.cancelled():
+            if breaker['state'] == 'half-open':
+                breaker.update(state='open', opened_at=time.monotonic())
+            return
+        if future.exception() is None:
+            breaker.update(state='closed', failures=0)
+            return
+        gateway['stats']['failures'] += 1
+        breaker['failures'] += 1
+        if breaker['state'] == 'half-open' or breaker['failures'] >= gateway['breaker_failures']:
+            if breaker['state'] != 'open':
+                print(f"⚠️ LLM circuit open after {breaker['failures']} failures")
+            breaker.update(state='open', opened_at=time.monotonic())
+
+
+def generate(gateway, prompt, timeout=None):
+    """Return the model's text for `prompt`, waiting at most `timeout` seconds.
+
+    Raises CircuitOpenError while the upstream is failing, TimeoutError past
+    the deadline, or whatever the upstream call raised. When the last caller
+    waiting on a call times out, the call is cancelled, whether it is still
+    queued for a concurrency slot or already upstream.
+    """
+    key = (gateway['model'], prompt)
+    with gateway['lock']:
+        loop = _ensure_loop(gateway)
+        future = gateway['inflight'].get(key)
+        started = future is None
+        if started:
+            _admit(gateway)
+            future = asyncio.run_coroutine_threadsafe(_call(gateway, prompt), loop)
+            gateway['inflight'][key] = future
+            gateway['stats']['calls'] += 1
+        else:
+            gateway['stats']['deduplicated'] += 1
+        gateway['waiters'][future] = gateway['waiters'].get(future, 0) + 1
+    # Outside the lock: a call that already finished runs the callback right here, and _finish takes the lock.
+    if started:
+        future.add_done_callback(lambda done: _finish(gateway, key, done))
+
+    timed_out = False
+    try:
+        return future.result(gateway['timeout'] if timeout is None else timeout)
+    except (FutureTimeoutError, asyncio.TimeoutError):
+        timed_out = True
+        with gateway['lock']:
+            gateway['stats']['timeouts'] += 1
+        raise TimeoutError("LLM call exceeded its deadline") from None
+    finally:
+        with gateway['lock']:
+            waiters = gateway['waiters']
+            waiters[future] -= 1
+            last = not waiters[future]
+            if last:
+                del waiters[future]
+            abandoned = last and timed_out and not future.done()
+            if abandoned:
+                gateway['stats']['abandoned'] += 1
+        # Outside the lock: cancelling runs _finish right here.
+        if abandoned:
+            future.cancel()
+
+
+def generate_stream(gateway, prompt, timeout=None):
+    """Yield the model's text for `prompt` in chunks as they arrive.
+
+    Raises, on iteration, CircuitOpenError while the upstream is failing,
+    TimeoutError when no chunk arrives within `timeout` seconds, or whatever
+    the upstream call raised. Closing the generator early cancels the call.
+    """
+    chunks = queue.Queue()
+    with gateway['lock']:
+        loop = _ensure_loop(gateway)
+        _admit(gateway)
+        future = asyncio.run_coroutine_threadsafe(_stream(gateway, prompt, chunks), loop)
+        gateway['stats']['streams'] += 1
+
+    def done(finished):
+        _finish(gateway, None, finished)
+        chunks.put(_END_OF_STREAM)
+
+    future.add_done_callback(done)
+    try:
+        while True:
+            try:
+                chunk = chunks.get(timeout=gateway['timeout'] if timeout is None else timeout)
+            except queue.Empty:
+                with gateway['lock']:
+                    gateway['stats']['timeouts'] += 1
+                raise TimeoutError("LLM stream stalled past its deadline") from None
+            if chunk is _END_OF_STREAM:
+                break
+            yield chunk
+        try:
+            future.result()
+        except asyncio.TimeoutError:
+            with gateway['lock']:
+                gateway['stats']['timeouts'] += 1
+            raise TimeoutError("LLM stream stalled past its deadline") from None
+    finally:
+        future.cancel()
+
+
+def gateway_stats(gateway):
+    """Counters and breaker state for /health."""
+    with gateway['lock']:
+        stats = dict(gateway['stats'])
+        stats['inflight'] = len(gateway['inflight'])
+        stats['circuit'] = gateway['breaker']['state']
+    return stats
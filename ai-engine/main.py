@@ -1,15 +1,28 @@
+import argparse
+import hashlib
+import json
 import os
 import re
+from collections import Counter, deque
 import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from tqdm.auto import tqdm
-from sklearn.linear_model import LinearRegression
 
 import spacy
 from spacy.matcher import PhraseMatcher
 
+from dedup import MODE as DEDUP_MODE, MODES as DEDUP_MODES, THRESHOLD as DEDUP_THRESHOLD
+from dedup import create_dedup, dedup_settings, drop_duplicates
+from run_report import PROFILERS, default_report_path, instrumented_run, stage, track
+from postings_cache import HAS_ARROW, POSTINGS_CACHE_DIR, load_manifest, read_source, write_source
+from skill_cooccurrence import (COOCCURRENCE_INDEX_PATH, add_posting, build_cooccurrence_index,
+                                collect_skill_sets, create_cooccurrence, save_cooccurrence_index)
+from skill_extractor import build_skill_index, iter_matches
+from taxonomy import current_taxonomy, extractor_phrases, surface_terms
+from trend_index import TREND_INDEX_PATH, build_trend_index, save_trend_index
+
 # -------------------------------
 # 1) CONFIG & DB
 # -------------------------------
@@ -27,15 +40,21 @@ def connect_db():
 # -------------------------------
 # 2) HELPERS
 # -------------------------------
-def extract_skills_batch(texts, nlp_model, matcher_tool, batch_size=512, n_process=1):
-    """Batch skill extraction using spaCy nlp.pipe() with progress bar."""
-    skills_list = []
-    for doc in tqdm(nlp_model.pipe(texts, batch_size=batch_size, n_process=n_process),
-                    total=len(texts), desc="Extracting skills"):
-        matches = matcher_tool(doc)
-        skills = {doc[start:end].text.lower() for _, start, end in matches}
-        skills_list.append(list(skills))
-    return skills_list
+def iter_skill_records(records, extractor):
+    """Stream (year, skills) pairs from (text, year) records through an extractor backend."""
+    yield from tqdm(track('extract', extractor(records)), desc="Extracting skills", unit=" postings")
+
+def count_skills_by_year(skill_records):
+    """Fold (year, skills) pairs into the same frame as explode().groupby(['skills', 'year'])."""
+    with stage('aggregate') as s:
+        counts = Counter()
+        for year, skills in skill_records:
+            s['rows'] += 1
+            for skill in skills:
+                counts[(skill, year)] += 1
+        rows = [(skill, year, n) for (skill, year), n in counts.items()]
+        yearly_skill_counts = pd.DataFrame(rows, columns=['skills', 'year', 'demand_score'])
+        return yearly_skill_counts.sort_values(['skills', 'year'], ignore_index=True)
 
 def save_to_db_bulk(collection, doc_id, data_key, data, chunk_size=1000):
     """Save large arrays to MongoDB with progress bar safely."""
@@ -58,49 +77,132 @@ def save_to_db_bulk(collection, doc_id, data_key, data, chunk_size=1000):
     except Exception as e:
         print(f"❌ Could not save {data_key} to MongoDB. Error: {e}")
 
-def load_historical_frames(historical_data_path):
-    print("\n--- Loading historical datasets ---")
-    all_dataframes = []
+def save_per_skill(db, collection_name, data_key, data, batch_size=5000):
+    """Save one document per skill, swapping the new set in atomically.
+
+    Documents are upserted into a fresh staging collection with unordered
+    bulk_write batches (the unique `skill` index is built first so upserts
+    stay index lookups), then renamed over the live collection in one step so
+    readers never observe a partially written set. An empty run keeps the
+    live collection as it is and only clears out the staging collection.
+    """
+    print(f"\n--- Saving {data_key} to {collection_name} (one document per skill) ---")
+    staging = db[f"{collection_name}_staging"]
+    try:
+        staging.drop()
+        if not data:
+            print(f"⚠️ No {data_key} to save; keeping the current {collection_name} collection.")
+            return
+        staging.create_index('skill', unique=True)
+        now = pd.Timestamp.now()
+        for i in tqdm(range(0, len(data), batch_size), desc=f"Saving {data_key}"):
+            ops = [
+                UpdateOne({'skill': item['skill']},
+                          {'$set': {data_key: item[data_key], 'last_updated': now}},
+                          upsert=True)
+                for item in data[i:i + batch_size]
+            ]
+            staging.bulk_write(ops, ordered=False)
+        staging.rename(collection_name, dropTarget=True)
+        print(f"✅ {len(data)} {data_key} saved successfully to MongoDB!")
+    except Exception as e:
+        print(f"❌ Could not save {data_key} to MongoDB. Error: {e}")
+
+STACK_COLS = ['LanguageWorkedWith', 'LanguageDesireNextYear', 'DatabaseWorkedWith', 'DatabaseDesireNextYear']
+DESC_COLS = ['description', 'Job Description', 'Job_Description']
+DEFAULT_CHUNK_SIZE = 50_000
+
+def _year_from_filename(filename):
+    year_match = re.search(r'_(\d{4})\.csv', filename)
+    return int(year_match.group(1)) if year_match else None
+
+def _resolve_layout(columns):
+    """Work out which columns a CSV needs and how to turn them into 'Job Description'."""
+    present_stack = [col for col in STACK_COLS if col in columns]
+    if present_stack:
+        return 'stack', present_stack
+    desc_col = next((col for col in DESC_COLS if col in columns), None)
+    if desc_col:
+        return 'description', [desc_col]
+    if 'job_skills' in columns:
+        if 'job_type_skills' in columns:
+            return 'skills', ['job_skills', 'job_type_skills']
+        return 'skills', ['job_skills']
+    return None, []
+
+def _normalize_frame(df, layout, usecols, year):
+    """Reduce a raw chunk to the ['year', 'Job Description'] frame the pipeline expects."""
+    if layout == 'stack':
+        parts = [df[col].fillna('') for col in usecols]
+        description = parts[0].str.cat(parts[1:], sep=' ') if len(parts) > 1 else parts[0]
+        year = year or 2023
+    elif len(usecols) > 1:
+        description = df[usecols[0]].fillna('') + ' ' + df[usecols[1]].fillna('')
+        year = year or 0
+    else:
+        description = df[usecols[0]]
+        year = year or 0
+    return pd.DataFrame({'year': year, 'Job Description': description})
+
+def _historical_files(historical_data_path):
     if not os.path.isdir(historical_data_path):
         print(f"❌ Error: Directory not found at {historical_data_path}")
         raise SystemExit(1)
+    return sorted(f for f in os.listdir(historical_data_path) if f.endswith('.csv'))
 
-    for filename in tqdm(os.listdir(historical_data_path), desc="Loading files"):
-        if not filename.endswith('.csv'):
-            continue
+def iter_file_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream one historical CSV as bounded ['year', 'Job Description'] chunks.
+
+    Only the header is sniffed up front; rows are then read with the C parser,
+    restricted to the columns the layout needs, `chunk_size` rows at a time.
+    Yields nothing if the file has no usable column.
+    """
+    filename = os.path.basename(file_path)
+    year = _year_from_filename(filename)
+
+    header = pd.read_csv(file_path, nrows=0).columns
+    layout, usecols = _resolve_layout(header)
+    if not layout:
+        print(f"⚠️ Skipping {filename}: No valid description/skills column found.")
+        return
 
-        year_match = re.search(r'_(\d{4})\.csv', filename)
-        year = int(year_match.group(1)) if year_match else None
+    print(f"-> Streaming {filename} for year {year}...")
+    reader = pd.read_csv(file_path, usecols=usecols, dtype=str, chunksize=chunk_size,
+                         engine='c', on_bad_lines='skip')
+    yield from track('load', (_normalize_frame(chunk, layout, usecols, year) for chunk in reader), rows=len)
+
+def iter_historical_chunks(historical_data_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream every historical CSV in the directory, see iter_file_chunks()."""
+    print("\n--- Streaming historical datasets ---")
+    found = False
+    for filename in _historical_files(historical_data_path):
         file_path = os.path.join(historical_data_path, filename)
-        print(f"-> Processing {filename} for year {year}...")
+        for chunk in iter_file_chunks(file_path, chunk_size=chunk_size):
+            found = True
+            yield chunk
 
-        df = pd.read_csv(file_path, engine='python', on_bad_lines='skip')
+    if not found:
+        print("❌ No valid CSV files found. Exiting.")
+        raise SystemExit(1)
 
-        # StackOverflow dataset handling
-        stack_cols = ['LanguageWorkedWith', 'LanguageDesireNextYear', 'DatabaseWorkedWith', 'DatabaseDesireNextYear']
-        if any(col in df.columns for col in stack_cols):
-            df['Job Description'] = df[stack_cols].fillna('').agg(' '.join, axis=1)
-            df['year'] = year or 2023
-            all_dataframes.append(df[['year', 'Job Description']])
-            continue
+def load_historical_frames(historical_data_path):
+    print("\n--- Loading historical datasets ---")
+    all_dataframes = []
 
-        # Traditional job datasets
-        desc_col = next((col for col in ['description', 'Job Description', 'Job_Description']
-                         if col in df.columns), None)
-        if not desc_col and 'job_skills' in df.columns:
-            if 'job_type_skills' in df.columns:
-                df['merged_skills'] = df['job_skills'].fillna('') + ' ' + df['job_type_skills'].fillna('')
-                desc_col = 'merged_skills'
-            else:
-                desc_col = 'job_skills'
+    for filename in tqdm(_historical_files(historical_data_path), desc="Loading files"):
+        year = _year_from_filename(filename)
+        file_path = os.path.join(historical_data_path, filename)
+        print(f"-> Processing {filename} for year {year}...")
 
-        if not desc_col:
+        df = pd.read_csv(file_path, engine='python', on_bad_lines='skip')
+        layout, usecols = _resolve_layout(df.columns)
+        if not layout:
             print(f"⚠️ Skipping {filename}: No valid description/skills column found.")
             continue
 
-        df.rename(columns={desc_col: 'Job Description'}, inplace=True)
-        df['year'] = year or 0
-        all_dataframes.append(df[['year', 'Job Description']])
+        frame = _normalize_frame(df, layout, usecols, year)
+        frame['source'] = filename
+        all_dataframes.append(frame)
 
     if not all_dataframes:
         print("❌ No valid CSV files found. Exiting.")
@@ -110,86 +212,549 @@ def load_historical_frames(historical_data_path):
     print(f"✅ Loaded and combined {len(combined_df)} total job postings.")
     return combined_df
 
-def build_matcher():
+# Bump when clean_descriptions() changes; cached postings cleaned by another version are rebuilt.
+CLEANING_VERSION = 1
+
+def clean_descriptions(descriptions):
+    """Strip HTML, collapse whitespace and lowercase a Series of job descriptions."""
+    return (
+        descriptions
+        .astype(str)
+        .str.replace(r"<[^>]*>", " ", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.lower()
+        .str.strip()
+    )
+
+def iter_cleaned_records(chunks):
+    """Yield (description, year) pairs from a stream of raw chunks."""
+    for chunk in chunks:
+        with stage('clean') as s:
+            chunk = chunk.dropna(subset=['Job Description'])
+            cleaned = clean_descriptions(chunk['Job Description'])
+            s['rows'] += len(cleaned)
+        yield from zip(cleaned.tolist(), chunk['year'].tolist())
+
+def cleaning_version(dedup=None):
+    """CLEANING_VERSION plus the duplicate filter, which also decides which cleaned postings are kept."""
+    return CLEANING_VERSION if dedup is None else f"{CLEANING_VERSION}+dedup:{dedup_settings(dedup)}"
+
+# Only free-text postings are deduplicated. Survey and skill-list rows are synthesized from a
+# few short columns, so distinct respondents or postings routinely share the same text.
+DEDUP_LAYOUTS = ('description',)
+
+def file_dedup(file_path, dedup):
+    """`dedup` if the CSV's layout is deduplicated, else None."""
+    if dedup is None:
+        return None
+    layout, _ = _resolve_layout(pd.read_csv(file_path, nrows=0).columns)
+    return dedup if layout in DEDUP_LAYOUTS else None
+
+def iter_file_records(file_path, chunk_size=DEFAULT_CHUNK_SIZE, dedup=None):
+    """Cleaned (description, year) records of one CSV, duplicate postings dropped before extraction."""
+    dedup = file_dedup(file_path, dedup)
+    records = iter_cleaned_records(iter_file_chunks(file_path, chunk_size=chunk_size))
+    return track('dedup', drop_duplicates(records, dedup, os.path.basename(file_path))) if dedup else records
+
+def drop_duplicate_rows(df, historical_data_path, dedup):
+    """The rows of a cleaned load_historical_frames() frame that iter_file_records() would keep.
+
+    Files are deduplicated one by one, as in streaming and incremental mode,
+    so every mode counts the same postings.
+    """
+    kept = []
+    for source, group in df.groupby('source', sort=False):
+        file_filter = file_dedup(os.path.join(historical_data_path, source), dedup)
+        if file_filter is None:
+            kept.extend(group.index)
+            continue
+        records = zip(group['Job Description'].tolist(), group.index)
+        kept.extend(i for _, i in drop_duplicates(records, file_filter, source))
+    return df.loc[sorted(kept)]
+
+def iter_historical_records(historical_data_path, chunk_size=DEFAULT_CHUNK_SIZE, dedup=None):
+    """iter_file_records() for every historical CSV; duplicates are dropped within each file."""
+    print("\n--- Streaming historical datasets ---")
+    found = False
+    for filename in _historical_files(historical_data_path):
+        for record in iter_file_records(os.path.join(historical_data_path, filename), chunk_size, dedup):
+            found = True
+            yield record
+
+    if not found:
+        print("❌ No valid CSV files found. Exiting.")
+        raise SystemExit(1)
+
+# Batch demand trends cover technical skills only.
+EXCLUDED_CATEGORIES = ('soft',)
+
+def build_matcher(taxonomy=None):
+    """Blank English pipeline plus a PhraseMatcher keyed by canonical skill."""
+    taxonomy = taxonomy or current_taxonomy()
     nlp = spacy.blank("en")
     matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
-    SKILL_LIST = [
-        'python', 'r', 'sql', 'java', 'scala', 'javascript', 'html', 'css',
-        'tableau', 'power bi', 'sas', 'excel', 'hadoop', 'spark', 'aws', 'azure', 'gcp',
-        'tensorflow', 'pytorch', 'scikit-learn', 'docker', 'kubernetes',
-        'react', 'mongodb', 'vue', 'angular', 'typescript'
-    ]
-    patterns = [nlp.make_doc(skill) for skill in SKILL_LIST]
-    matcher.add("SKILL_MATCHER", patterns)
+    patterns = {}
+    for surface, skill in surface_terms(taxonomy, exclude_categories=EXCLUDED_CATEGORIES):
+        patterns.setdefault(skill, []).append(nlp.make_doc(surface))
+    for skill, docs in patterns.items():
+        matcher.add(skill, docs)
     return nlp, matcher
 
+EXTRACTOR_BACKENDS = ('vocab', 'spacy')
+
+def build_extractor(backend='vocab', batch_size=512, n_process=1, taxonomy=None):
+    """Return a function mapping (text, context) records to (context, skills) pairs.
+
+    'vocab' scans text against the taxonomy's compiled token-hash index;
+    'spacy' runs the blank English pipeline and PhraseMatcher from build_matcher().
+    Both yield the same sets of canonical (lowercase) skill names.
+    """
+    taxonomy = taxonomy or current_taxonomy()
+    if backend == 'spacy':
+        nlp, matcher = build_matcher(taxonomy)
+
+        def extract(records):
+            docs = nlp.pipe(records, as_tuples=True, batch_size=batch_size, n_process=n_process)
+            for doc, context in docs:
+                yield context, {nlp.vocab.strings[match_id] for match_id, _, _ in matcher(doc)}
+        return extract
+
+    index = build_skill_index(extractor_phrases(taxonomy, exclude_categories=EXCLUDED_CATEGORIES))
+
+    def extract(records):
+        return iter_matches(records, index, n_process=n_process)
+    return extract
+
+def extractor_version(backend='vocab', taxonomy=None, dedup=None):
+    """Fingerprint of the extractor, taxonomy and duplicate filter; checkpoints from another one are stale."""
+    taxonomy = taxonomy or current_taxonomy()
+    version = f"{backend}-{taxonomy['version']}"
+    if backend == 'vocab':
+        version = f"{version}.{taxonomy['format']}"
+    return version if dedup is None else f"{version}+dedup:{dedup_settings(dedup)}"
+
+# -------------------------------
+# 2b) INCREMENTAL CHECKPOINTS
+# -------------------------------
+CHECKPOINT_DIR = os.path.join('data', 'checkpoints')
+
+def file_fingerprint(file_path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _checkpoint_path(checkpoint_dir, filename):
+    return os.path.join(checkpoint_dir, f"{filename}.json")
+
+def load_checkpoint(checkpoint_dir, filename):
+    path = _checkpoint_path(checkpoint_dir, filename)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+def save_checkpoint(checkpoint_dir, filename, checkpoint):
+    """Write a checkpoint atomically so an interrupted run never leaves half a file."""
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = _checkpoint_path(checkpoint_dir, filename)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def checkpoint_is_current(checkpoint, file_path, version):
+    """Return (is_current, fingerprint). Size+mtime match skips re-hashing unchanged files."""
+    if not checkpoint or checkpoint.get('extractor') != version:
+        return False, None
+    stat = os.stat(file_path)
+    if checkpoint.get('size') == stat.st_size and checkpoint.get('mtime') == stat.st_mtime_ns:
+        return True, checkpoint['fingerprint']
+    fingerprint = file_fingerprint(file_path)
+    return fingerprint == checkpoint.get('fingerprint'), fingerprint
+
+def incremental_skill_counts(historical_data_path, extractor, checkpoint_dir=CHECKPOINT_DIR,
+                             chunk_size=DEFAULT_CHUNK_SIZE, version=None, postings_cache_dir=None, dedup=None):
+    """Per-(skill, year) counts for every CSV, extracting only new or changed files.
+
+    Each file's counts are checkpointed with its content fingerprint; files whose
+    checkpoint is current are merged straight from disk. The others are read
+    through the cleaned-postings cache when `postings_cache_dir` is set. `version`
+    should come from extractor_version() with the same `dedup`.
+    """
+    print("\n--- Incremental skill extraction ---")
+    version = version or extractor_version()
+    per_file_counts = []
+    reused = 0
+
+    for filename in _historical_files(historical_data_path):
+        file_path = os.path.join(historical_data_path, filename)
+        checkpoint = load_checkpoint(checkpoint_dir, filename)
+        is_current, fingerprint = checkpoint_is_current(checkpoint, file_path, version)
+
+        if is_current:
+            reused += 1
+            counts = pd.DataFrame(checkpoint['counts'], columns=['skills', 'year', 'demand_score'])
+        else:
+            fingerprint = fingerprint or file_fingerprint(file_path)
+            stat = os.stat(file_path)
+            if postings_cache_dir:
+                skill_records = cached_skill_records(file_path, extractor, postings_cache_dir,
+                                                     chunk_size=chunk_size, version=version, dedup=dedup)
+            else:
+                skill_records = iter_skill_records(iter_file_records(file_path, chunk_size, dedup), extractor)
+            counts = count_skills_by_year(skill_records)
+            save_checkpoint(checkpoint_dir, filename, {
+                'file': filename,
+                'fingerprint': fingerprint,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'extractor': version,
+                'counts': counts.values.tolist(),
+            })
+        per_file_counts.append(counts)
+
+    print(f"✅ Reused {reused} checkpoint(s), extracted {len(per_file_counts) - reused} file(s).")
+    if not per_file_counts:
+        print("❌ No valid CSV files found. Exiting.")
+        raise SystemExit(1)
+
+    merged = pd.concat(per_file_counts, ignore_index=True)
+    return (merged.groupby(['skills', 'year'], as_index=False)['demand_score'].sum()
+            .astype({'year': int, 'demand_score': int}))
+
+# -------------------------------
+# 2c) CLEANED POSTINGS CACHE
+# -------------------------------
+POSTING_COLUMNS = ['year', 'Job Description', 'skills']
+
+def _extracted_frames(records, extractor, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Run (text, year) records through the extractor and regroup them as POSTING_COLUMNS frames."""
+    texts = deque()
+
+    def remember(records):
+        for text, year in records:
+            texts.append(text)
+            yield text, year
+
+    rows = []
+    for year, skills in iter_skill_records(remember(records), extractor):
+        rows.append((year, texts.popleft(), sorted(skills)))
+        if len(rows) >= chunk_size:
+            yield pd.DataFrame(rows, columns=POSTING_COLUMNS)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows, columns=POSTING_COLUMNS)
+
+def _cached_text_records(cache_dir, source):
+    for frame in track('cache_read', read_source(cache_dir, source, ['Job Description']), rows=len):
+        yield from zip(frame['Job Description'].tolist(), frame['year'].tolist())
+
+def cached_skill_records(file_path, extractor, cache_dir=POSTINGS_CACHE_DIR, chunk_size=DEFAULT_CHUNK_SIZE,
+                         version=None, dedup=None):
+    """Yield (year, skills) for one CSV through the cleaned-postings cache.
+
+    A current cache entry is read back without touching the CSV. If only the
+    extractor changed, skills are re-extracted from the cached descriptions;
+    otherwise the CSV is streamed, cleaned and deduplicated. Either way the
+    cache entry is rewritten as the records go by.
+    """
+    filename = os.path.basename(file_path)
+    source = os.path.splitext(filename)[0]
+    version = version or extractor_version()
+    dedup = file_dedup(file_path, dedup)
+    manifest = load_manifest(cache_dir, source)
+    text_current, fingerprint = False, None
+    if manifest and manifest.get('cleaning') == cleaning_version(dedup):
+        text_current, fingerprint = checkpoint_is_current(manifest, file_path, manifest.get('extractor'))
+
+    if text_current and manifest['extractor'] == version:
+        print(f"-> Reading {filename} from the postings cache...")
+        for frame in track('cache_read', read_source(cache_dir, source, ['skills']), rows=len):
+            yield from zip(frame['year'].tolist(), frame['skills'].tolist())
+        return
+
+    stat = os.stat(file_path)
+    if text_current:
+        print(f"-> Re-extracting {filename} from cached descriptions ({manifest['extractor']} -> {version})...")
+        records = _cached_text_records(cache_dir, source)
+    else:
+        records = iter_file_records(file_path, chunk_size, dedup)
+    manifest = {
+        'file': filename,
+        'fingerprint': fingerprint or file_fingerprint(file_path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'cleaning': cleaning_version(dedup),
+        'extractor': version,
+    }
+    frames = write_source(cache_dir, source, _extracted_frames(records, extractor, chunk_size), manifest)
+    for frame in track('cache_write', frames, rows=len):
+        yield from zip(frame['year'].tolist(), frame['skills'].tolist())
+
+def iter_cached_skill_records(historical_data_path, extractor, cache_dir=POSTINGS_CACHE_DIR,
+                              chunk_size=DEFAULT_CHUNK_SIZE, version=None, dedup=None):
+    """cached_skill_records() for every historical CSV in the directory."""
+    print(f"\n--- Reading historical datasets through the postings cache ({cache_dir}) ---")
+    filenames = _historical_files(historical_data_path)
+    if not filenames:
+        print("❌ No valid CSV files found. Exiting.")
+        raise SystemExit(1)
+    for filename in filenames:
+        yield from cached_skill_records(os.path.join(historical_data_path, filename), extractor, cache_dir,
+                                        chunk_size=chunk_size, version=version, dedup=dedup)
+
 # -------------------------------
 # 3) MAIN PIPELINE
 # -------------------------------
-def main():
-    print("--- Initializing AI Engine ---")
-    db = connect_db()
-    trends_collection = db.trends
-    forecasts_collection = db.forecasts
+FORECAST_HORIZON = 3
 
-    historical_data_path = os.path.join('data', 'historical')
-    combined_df = load_historical_frames(historical_data_path)
+def fit_trend_lines(yearly_skill_counts):
+    """Fit every skill's linear demand trend in one vectorized pass.
 
-    df_processed = combined_df.copy()
-    df_processed.dropna(subset=['Job Description'], inplace=True)
+    Counts are pivoted into a dense skill x year matrix (missing years are masked
+    out) and ordinary least squares is solved in closed form for all rows at once,
+    giving the same result as fitting one LinearRegression per skill. Returns
+    None when there are no counts.
+    """
+    counts = yearly_skill_counts.sort_values(['skills', 'year'], ignore_index=True)
+    if counts.empty:
+        return None
 
-    df_processed['Job Description'] = (
-        df_processed['Job Description']
-        .astype(str)
-        .str.replace(r"<[^>]*>", " ", regex=True)
-        .str.replace(r"\s+", " ", regex=True)
-        .str.lower()
-        .str.strip()
-    )
+    skill_col = counts['skills'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, skill_col[1:] != skill_col[:-1]])
+    ends = np.r_[starts[1:], len(skill_col)]
+    skill_names = skill_col[starts]
+
+    matrix = counts.pivot(index='skills', columns='year', values='demand_score').reindex(skill_names)
+    years = matrix.columns.to_numpy(dtype=float)
+    y = matrix.to_numpy(dtype=float)
+    mask = ~np.isnan(y)
+
+    # Centre the years so the normal equations stay well conditioned.
+    offset = years.mean()
+    x = np.where(mask, years - offset, 0.0)
+    y = np.where(mask, y, 0.0)
+    n = mask.sum(axis=1)
+    sx, sy = x.sum(axis=1), y.sum(axis=1)
+    sxx, sxy = (x * x).sum(axis=1), (x * y).sum(axis=1)
 
-    nlp, matcher = build_matcher()
-    is_windows = (os.name == 'nt')
-    cpu_count = os.cpu_count() or 2
-    n_process = 1 if is_windows else max(1, cpu_count - 1)
-    batch_size = 512
+    fitted = n > 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(fitted, (n * sxy - sx * sy) / (n * sxx - sx ** 2), 0.0)
+        intercept = np.where(fitted, (sy - slope * sx) / n, 0.0)
 
-    texts = df_processed['Job Description'].tolist()
-    df_processed['skills'] = extract_skills_batch(texts, nlp, matcher,
-                                                  batch_size=batch_size,
-                                                  n_process=n_process)
-    print("✅ Skill extraction complete.")
+    latest_columns = np.where(mask, np.arange(len(years)), -1).max(axis=1)
+    return {
+        'counts': counts, 'skills': skill_names, 'starts': starts, 'ends': ends,
+        'offset': offset, 'fitted': fitted, 'slope': slope, 'intercept': intercept,
+        'mean_demand': sy / n,
+        'first_years': np.where(mask, years, np.inf).min(axis=1),
+        'latest_years': years[latest_columns],
+        'latest_demand': y[np.arange(len(y)), latest_columns],
+    }
 
-    print("\n--- Calculating and Forecasting Skill Trends ---")
-    skills_by_year = df_processed.explode('skills').dropna(subset=['skills'])
-    yearly_skill_counts = skills_by_year.groupby(['skills', 'year']).size().reset_index(name='demand_score')
+def forecast_trends(yearly_skill_counts, horizon=FORECAST_HORIZON):
+    """Build every skill's history and linear-trend forecast from fit_trend_lines()."""
+    fit = fit_trend_lines(yearly_skill_counts)
+    if fit is None:
+        return [], []
 
+    future_years = fit['latest_years'][:, None] + np.arange(1, horizon + 1)
+    predicted = fit['intercept'][:, None] + fit['slope'][:, None] * (future_years - fit['offset'])
+    # Snap float noise first so exact .5 ties round half-to-even like round() would.
+    scores = np.rint(np.round(np.maximum(predicted, 0), 6))
+
+    records = fit['counts'].to_dict('records')
     historical_trends = []
     forecasted_skills = []
-
-    for skill_name, group in tqdm(yearly_skill_counts.groupby('skills'), desc="Forecasting trends"):
-        group = group.sort_values('year')
-        history = group.to_dict('records')
-
-        if len(history) > 1:
-            X = np.array([h['year'] for h in history]).reshape(-1, 1)
-            y = np.array([h['demand_score'] for h in history])
-            model = LinearRegression().fit(X, y)
-            latest_year = history[-1]['year']
-            future_years = np.array([latest_year + i for i in range(1, 4)]).reshape(-1, 1)
-            predicted_scores = model.predict(future_years)
+    for row, (skill_name, start, end) in enumerate(zip(fit['skills'], fit['starts'], fit['ends'])):
+        if fit['fitted'][row]:
             forecast = [
-                {'year': int(year[0]), 'demand_score': round(max(0, score))}
-                for year, score in zip(future_years, predicted_scores)
+                {'year': int(year), 'demand_score': int(score)}
+                for year, score in zip(future_years[row], scores[row])
             ]
             forecasted_skills.append({'skill': skill_name, 'forecast': forecast})
+        historical_trends.append({'skill': skill_name, 'history': records[start:end]})
 
-        historical_trends.append({'skill': skill_name, 'history': history})
+    return historical_trends, forecasted_skills
 
-    save_to_db_bulk(trends_collection, 'skill_historical_trends', 'trends', historical_trends)
-    save_to_db_bulk(forecasts_collection, 'skill_forecasts', 'forecasts', forecasted_skills)
+def export_trend_index(yearly_skill_counts, path=TREND_INDEX_PATH):
+    """Write the per-skill growth/score/trend index that server.py serves /predict-trend from."""
+    fit = fit_trend_lines(yearly_skill_counts)
+    if fit is None:
+        print("⚠️ No skill counts, trend index not written.")
+        return
+    fitted = fit['fitted']
+    index = build_trend_index(
+        fit['skills'][fitted], fit['slope'][fitted], fit['intercept'][fitted], fit['mean_demand'][fitted],
+        fit['first_years'][fitted], fit['latest_years'][fitted], fit['latest_demand'][fitted], fit['offset'],
+    )
+    save_trend_index(index, path)
+    print(f"✅ Trend index with {len(index)} skills written to {path}")
+
+def export_cooccurrence_index(cooccurrence, path=COOCCURRENCE_INDEX_PATH):
+    """Write the top related skills per skill that server.py serves /semantic-skills from."""
+    if cooccurrence is None:
+        print("⚠️ Per-posting skill sets unavailable (incremental mode needs the postings cache), "
+              "co-occurrence index not written.")
+        return
+    index = build_cooccurrence_index(cooccurrence)
+    save_cooccurrence_index(index, path)
+    print(f"✅ Co-occurrence index with {len(index)} skills written to {path}")
+
+def main(streaming=True, chunk_size=DEFAULT_CHUNK_SIZE, incremental=False, checkpoint_dir=CHECKPOINT_DIR,
+         storage='per-skill', extractor_backend='vocab', trend_index_path=TREND_INDEX_PATH,
+         postings_cache_dir=POSTINGS_CACHE_DIR, cooccurrence_index_path=COOCCURRENCE_INDEX_PATH,
+         dedup_mode=DEDUP_MODE, dedup_threshold=DEDUP_THRESHOLD, report_path=None, profile=None):
+    """Run the batch job, writing a per-stage run report to `report_path` (default data/reports/run-*.json)."""
+    dedup = create_dedup(dedup_mode, threshold=dedup_threshold)
+    settings = {
+        'mode': 'incremental' if incremental else 'streaming' if streaming else 'in-memory',
+        'chunk_size': chunk_size,
+        'storage': storage,
+        'extractor': extractor_backend,
+        'postings_cache': bool(postings_cache_dir),
+        'dedup': dedup_settings(dedup),
+    }
+    with instrumented_run(report_path or default_report_path(), profile, settings):
+        print("--- Initializing AI Engine ---")
+        with stage('connect_db'):
+            db = connect_db()
+
+        historical_data_path = os.path.join('data', 'historical')
+
+        is_windows = (os.name == 'nt')
+        cpu_count = os.cpu_count() or 2
+        n_process = 1 if is_windows else max(1, cpu_count - 1)
+        batch_size = 512
+        with stage('build_extractor'):
+            extractor = build_extractor(extractor_backend, batch_size=batch_size, n_process=n_process)
+        if postings_cache_dir and not HAS_ARROW:
+            print("⚠️ pyarrow not installed, postings cache disabled.")
+            postings_cache_dir = None
+        cooccurrence = create_cooccurrence()
+        version = extractor_version(extractor_backend, dedup=dedup)
+
+        if incremental:
+            yearly_skill_counts = incremental_skill_counts(historical_data_path, extractor,
+                                                           checkpoint_dir=checkpoint_dir,
+                                                           chunk_size=chunk_size, version=version,
+                                                           postings_cache_dir=postings_cache_dir, dedup=dedup)
+            if postings_cache_dir:
+                # Every source is current in the cache now, so this only reads the skills column back.
+                skill_records = iter_cached_skill_records(historical_data_path, extractor, postings_cache_dir,
+                                                          chunk_size=chunk_size, version=version, dedup=dedup)
+                for _ in track('cooccurrence', collect_skill_sets(skill_records, cooccurrence)):
+                    pass
+            else:
+                cooccurrence = None
+        elif streaming:
+            if postings_cache_dir:
+                skill_records = iter_cached_skill_records(historical_data_path, extractor, postings_cache_dir,
+                                                          chunk_size=chunk_size, version=version, dedup=dedup)
+            else:
+                records = iter_historical_records(historical_data_path, chunk_size=chunk_size, dedup=dedup)
+                skill_records = iter_skill_records(records, extractor)
+            skill_records = track('cooccurrence', collect_skill_sets(skill_records, cooccurrence))
+            yearly_skill_counts = count_skills_by_year(skill_records)
+            print("✅ Skill extraction complete.")
+        else:
+            with stage('load') as s:
+                df_processed = load_historical_frames(historical_data_path)
+                s['rows'] += len(df_processed)
+            with stage('clean') as s:
+                df_processed.dropna(subset=['Job Description'], inplace=True)
+                df_processed['Job Description'] = clean_descriptions(df_processed['Job Description'])
+                s['rows'] += len(df_processed)
+            if dedup:
+                with stage('dedup') as s:
+                    df_processed = drop_duplicate_rows(df_processed, historical_data_path, dedup)
+                    s['rows'] += len(df_processed)
+
+            texts = df_processed['Job Description'].tolist()
+            df_processed['skills'] = [list(skills) for _, skills in
+                                      iter_skill_records(((text, None) for text in texts), extractor)]
+            print("✅ Skill extraction complete.")
+            with stage('cooccurrence') as s:
+                for skills in df_processed['skills']:
+                    add_posting(cooccurrence, skills)
+                s['rows'] += len(df_processed)
+
+            with stage('aggregate') as s:
+                skills_by_year = df_processed.explode('skills').dropna(subset=['skills'])
+                yearly_skill_counts = skills_by_year.groupby(['skills', 'year']).size().reset_index(name='demand_score')
+                s['rows'] += len(df_processed)
+
+        print("\n--- Calculating and Forecasting Skill Trends ---")
+        with stage('forecast') as s:
+            historical_trends, forecasted_skills = forecast_trends(yearly_skill_counts)
+            s['rows'] += len(yearly_skill_counts)
+
+        with stage('save_db') as s:
+            if storage == 'per-skill':
+                save_per_skill(db, 'skill_trends', 'history', historical_trends)
+                save_per_skill(db, 'skill_forecasts', 'forecast', forecasted_skills)
+            else:
+                save_to_db_bulk(db.trends, 'skill_historical_trends', 'trends', historical_trends)
+                save_to_db_bulk(db.forecasts, 'skill_forecasts', 'forecasts', forecasted_skills)
+            s['rows'] += len(historical_trends) + len(forecasted_skills)
+
+        with stage('trend_index'):
+            export_trend_index(yearly_skill_counts, trend_index_path)
+        with stage('cooccurrence_index'):
+            export_cooccurrence_index(cooccurrence, cooccurrence_index_path)
 
 # -------------------------------
 # ENTRYPOINT
 # -------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch skill trend extraction and forecasting.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--no-stream', action='store_true',
+                      help="Load every CSV fully into memory instead of streaming chunks.")
+    mode.add_argument('--incremental', action='store_true',
+                      help="Only extract new or changed CSVs, reusing per-file checkpoints.")
+    parser.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR,
+                        help="Where incremental mode keeps per-file skill counts.")
+    parser.add_argument('--storage', choices=['per-skill', 'document'], default='per-skill',
+                        help="'per-skill' writes one document per skill to skill_trends/skill_forecasts; "
+                             "'document' keeps the legacy single-document arrays in trends/forecasts.")
+    parser.add_argument('--extractor', choices=EXTRACTOR_BACKENDS, default='vocab',
+                        help="Skill extraction backend: compiled vocabulary index or spaCy PhraseMatcher.")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows per CSV chunk in streaming mode.")
+    parser.add_argument('--trend-index', default=TREND_INDEX_PATH,
+                        help="Where to write the per-skill trend index served by /predict-trend.")
+    parser.add_argument('--cooccurrence-index', default=COOCCURRENCE_INDEX_PATH,
+                        help="Where to write the related-skills index served by /semantic-skills.")
+    parser.add_argument('--postings-cache', default=POSTINGS_CACHE_DIR,
+                        help="Parquet cache of cleaned postings and their skills, reused instead of re-parsing CSVs.")
+    parser.add_argument('--no-postings-cache', action='store_true',
+                        help="Always read the raw CSVs and do not write the postings cache.")
+    parser.add_argument('--dedup', choices=DEDUP_MODES, default=DEDUP_MODE,
+                        help="Drop duplicate postings before extraction: exact copies only, or also "
+                             "near-duplicates by MinHash similarity.")
+    parser.add_argument('--dedup-threshold', type=float, default=DEDUP_THRESHOLD,
+                        help="Estimated Jaccard similarity of word 3-grams at which a posting is a near-duplicate.")
+    parser.add_argument('--report', default=None,
+                        help="Where to write the JSON run report (default data/reports/run-<timestamp>.json).")
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=PROFILERS, default=None,
+                        help="Profile each stage: 'cprofile' (default) dumps <report>.<stage>.prof files, "
+                             "'sample' writes sampled stacks to <report>.collapsed.")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    main(streaming=not args.no_stream, chunk_size=args.chunk_size,
+         incremental=args.incremental, checkpoint_dir=args.checkpoint_dir,
+         storage=args.storage, extractor_backend=args.extractor, trend_index_path=args.trend_index,
+         postings_cache_dir=None if args.no_postings_cache else args.postings_cache,
+         cooccurrence_index_path=args.cooccurrence_index,
+         dedup_mode=args.dedup, dedup_threshold=args.dedup_threshold,
+         report_path=args.report, profile=args.profile)
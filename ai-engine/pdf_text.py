@@ -0,0 +1,150 @@
+"""Text extraction for uploaded resume PDFs.
+
+PDFs are read straight from the upload bytes, never from a temp file. Every
+document is held to a byte budget (PDF_MAX_BYTES, checked by the caller), a
+page budget (PDF_MAX_PAGES) and a text budget (PDF_TEXT_BUDGET characters):
+extraction stops at the first page boundary after enough text for skill
+extraction has been collected. Documents with at least PDF_PARALLEL_MIN_PAGES
+pages are split into page ranges and extracted across a bounded process pool
+of PDF_WORKERS processes, which is created on first use. pdfplumber itself is
+imported on first use too.
+
+A failed extraction raises IncompleteExtractionError carrying the text read
+before the failure, so callers can still use it but know not to cache it. A
+pool whose worker died is dropped, and the next parallel extraction starts a
+new one.
+"""
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+TEXT_BUDGET = int(os.getenv("PDF_TEXT_BUDGET", "60000"))
+WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class IncompleteExtractionError(Exception):
+    """Extraction failed part-way; `text` holds what was extracted before the failure."""
+
+    def __init__(self, message, text=""):
+        super().__init__(message)
+        self.text = text
+
+
+def extraction_settings():
+    """Budgets that change the extracted text, for cache keys."""
+    return f"pages={MAX_PAGES},text={TEXT_BUDGET}"
+
+
+def _page_texts(pdf, page_numbers):
+    texts = []
+    for number in page_numbers:
+        content = pdf.pages[number].extract_text()
+        if content:
+            texts.append(content + "\n")
+    return texts
+
+
+def _extract_pages(data, page_numbers):
+    """Worker task: text of the given (0-based) pages, empty pages dropped."""
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return _page_texts(pdf, page_numbers)
+
+
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def reset_pool(shutdown=True):
+    """Drop the worker pool (shutting it down unless it was inherited through a
+    fork); the next parallel extraction starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None and shutdown:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _discard_broken_pool(pool):
+    """Drop `pool` unless another caller already replaced it."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _within_budget(texts, text_budget):
+    """Keep whole pages until the text budget is reached."""
+    kept, size = [], 0
+    for text in texts:
+        if size >= text_budget:
+            break
+        kept.append(text)
+        size += len(text)
+    return kept, size >= text_budget
+
+
+def extract_text(data, max_pages=None, text_budget=None, workers=None):
+    """Extract text from PDF bytes, page by page, within the page and text budgets.
+
+    Raises IncompleteExtractionError if the PDF cannot be read or a worker fails.
+    """
+    max_pages = MAX_PAGES if max_pages is None else max_pages
+    text_budget = TEXT_BUDGET if text_budget is None else text_budget
+    workers = WORKERS if workers is None else workers
+    import pdfplumber
+
+    texts = []
+    pool = None
+    try:
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
+            page_count = min(len(pdf.pages), max_pages)
+            if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+                size = 0
+                for number in range(page_count):
+                    if size >= text_budget:
+                        break
+                    for text in _page_texts(pdf, [number]):
+                        texts.append(text)
+                        size += len(text)
+                return "".join(texts)
+
+        # Page ranges are submitted one wave per worker slot and consumed in
+        # order, so nothing past the text budget is queued.
+        ranges = [range(start, min(start + PAGES_PER_TASK, page_count))
+                  for start in range(0, page_count, PAGES_PER_TASK)]
+        pool = _get_pool(workers)
+        pending = [pool.submit(_extract_pages, data, list(pages)) for pages in ranges[:workers]]
+        next_range = len(pending)
+        while pending:
+            texts.extend(pending.pop(0).result())
+            texts, done = _within_budget(texts, text_budget)
+            if done:
+                for future in pending:
+                    future.cancel()
+                break
+            if next_range < len(ranges):
+                pending.append(pool.submit(_extract_pages, data, list(ranges[next_range])))
+                next_range += 1
+    except BrokenProcessPool as e:
+        # A worker died (e.g. killed for memory); every later task on this pool would fail too.
+        _discard_broken_pool(pool)
+        raise IncompleteExtractionError(f"PDF worker pool broke: {e}", "".join(texts)) from e
+    except Exception as e:
+        raise IncompleteExtractionError(f"PDF extraction failed: {e}", "".join(texts)) from e
+    return "".join(texts)
@@ -0,0 +1,123 @@
+"""Columnar cache of cleaned job postings, written and read by main.py.
+
+The first run over a historical CSV stores every posting's cleaned
+description and extracted skills as Parquet, partitioned by source file and
+year:
+
+    data/postings/source=<csv name>/year=<year>/part-00000.parquet
+
+Later runs read the `skills` column back with memory-mapped I/O instead of
+re-parsing and re-cleaning the CSV; after an extractor or taxonomy change
+they re-extract from the cached `Job Description` column. A manifest per
+source (data/postings/_manifests/<csv name>.json) records the CSV's
+fingerprint, the cleaning and extractor versions, and is written last, so an
+interrupted run leaves no manifest and the source is rebuilt.
+
+For ad-hoc analysis the whole cache loads as one frame:
+
+    from postings_cache import load_postings
+    df = load_postings(columns=['year', 'skills'], years=[2022, 2023])
+
+pyarrow is imported on first use; main.py skips the cache without it.
+"""
+import importlib.util
+import json
+import os
+import shutil
+
+POSTINGS_CACHE_DIR = os.path.join('data', 'postings')
+HAS_ARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([('Job Description', pa.string()), ('skills', pa.list_(pa.string()))])
+
+
+def _dataset(path):
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    return ds.dataset(path, format='parquet', partitioning='hive', filesystem=fs.LocalFileSystem(use_mmap=True))
+
+
+def _source_dir(cache_dir, source):
+    return os.path.join(cache_dir, f"source={source}")
+
+
+def _manifest_path(cache_dir, source):
+    return os.path.join(cache_dir, '_manifests', f"{source}.json")
+
+
+def load_manifest(cache_dir, source):
+    path = _manifest_path(cache_dir, source)
+    if not os.path.exists(path) or not os.path.isdir(_source_dir(cache_dir, source)):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable postings manifest {path}: {e}")
+        return None
+
+
+def read_source(cache_dir, source, columns):
+    """Yield one cached source as DataFrames of `columns` (plus 'year'), batch by batch."""
+    dataset = _dataset(_source_dir(cache_dir, source))
+    if 'year' not in dataset.schema.names:
+        return
+    for batch in dataset.to_batches(columns=['year', *columns]):
+        yield batch.to_pandas()
+
+
+def write_source(cache_dir, source, frames, manifest):
+    """Cache a source from frames of ['year', 'Job Description', 'skills'], passing each frame through.
+
+    Parts are written to a staging directory that replaces the source's
+    partition once `frames` is exhausted; the manifest goes last. If the
+    consumer stops early nothing is replaced.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    staging = os.path.join(cache_dir, '_staging', f"source={source}")
+    shutil.rmtree(staging, ignore_errors=True)
+    schema = _schema()
+    rows, parts = 0, {}
+    for frame in frames:
+        for year, group in frame.groupby('year', sort=True):
+            year_dir = os.path.join(staging, f"year={int(year)}")
+            os.makedirs(year_dir, exist_ok=True)
+            part = parts.get(year, 0)
+            parts[year] = part + 1
+            table = pa.Table.from_pandas(group[['Job Description', 'skills']], schema=schema, preserve_index=False)
+            pq.write_table(table, os.path.join(year_dir, f"part-{part:05d}.parquet"))
+        rows += len(frame)
+        yield frame
+
+    os.makedirs(staging, exist_ok=True)
+    target = _source_dir(cache_dir, source)
+    retired = os.path.join(cache_dir, '_staging', f"retired={source}")
+    shutil.rmtree(retired, ignore_errors=True)
+    if os.path.isdir(target):
+        os.replace(target, retired)
+    os.replace(staging, target)
+    shutil.rmtree(retired, ignore_errors=True)
+
+    path = _manifest_path(cache_dir, source)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump({**manifest, 'source': source, 'rows': rows}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def load_postings(cache_dir=POSTINGS_CACHE_DIR, columns=None, years=None):
+    """Every cached posting as one DataFrame with 'source' and 'year' columns, optionally filtered by year."""
+    import pyarrow.dataset as ds
+
+    table = _dataset(cache_dir).to_table(
+        columns=columns,
+        filter=ds.field('year').isin(list(years)) if years is not None else None,
+    )
+    return table.to_pandas()
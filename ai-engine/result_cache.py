@@ -0,0 +1,207 @@
+"""Two-tier result cache for expensive, deterministic service calls.
+
+Entries are keyed on a content hash (see cache_key) and hold JSON-serializable
+results. The first tier is an in-process LRU; the optional second tier is a
+directory of JSON files shared by every worker on the host, bounded by total
+size and by age. Entries are fresh for `ttl` seconds; with `max_stale` they
+stay available to cache_lookup() for that much longer, so callers can serve a
+stale answer while they refresh it. Both tiers drop entries after that.
+
+Each cache counts memory hits, disk hits, stale hits and misses for /health.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(*parts):
+    """sha256 over the given bytes/str parts, length-prefixed so parts cannot run together."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def create_cache(name, max_entries=256, ttl=7 * 24 * 3600, disk_dir=None, max_disk_bytes=100 * 1024 * 1024,
+                 max_stale=0):
+    """Create a cache; pass `disk_dir` to enable the on-disk tier."""
+    cache = {
+        'name': name,
+        'max_entries': max_entries,
+        'ttl': ttl,
+        'max_stale': max_stale,
+        'disk_dir': disk_dir,
+        'max_disk_bytes': max_disk_bytes,
+        'disk_bytes': 0,
+        'entries': OrderedDict(),
+        'lock': threading.Lock(),
+        'stats': {'memory_hits': 0, 'disk_hits': 0, 'stale_hits': 0, 'misses': 0},
+    }
+    if disk_dir:
+        os.makedirs(disk_dir, exist_ok=True)
+        cache['disk_bytes'] = sum(size for _, _, size in _disk_entries(disk_dir))
+    return cache
+
+
+def cache_from_env(name, prefix, **defaults):
+    """create_cache() configured from <PREFIX>_CACHE_SIZE, _CACHE_TTL, _CACHE_MAX_STALE, _CACHE_DIR and _CACHE_MAX_MB."""
+    disk_dir = os.getenv(f"{prefix}_CACHE_DIR", defaults.get('disk_dir'))
+    return create_cache(
+        name,
+        max_entries=int(os.getenv(f"{prefix}_CACHE_SIZE", defaults.get('max_entries', 256))),
+        ttl=float(os.getenv(f"{prefix}_CACHE_TTL", defaults.get('ttl', 7 * 24 * 3600))),
+        disk_dir=disk_dir or None,
+        max_disk_bytes=int(float(os.getenv(f"{prefix}_CACHE_MAX_MB", defaults.get('max_disk_mb', 100))) * 1024 * 1024),
+        max_stale=float(os.getenv(f"{prefix}_CACHE_MAX_STALE", defaults.get('max_stale', 0))),
+    )
+
+
+def _lifetime(cache):
+    return cache['ttl'] + cache['max_stale']
+
+
+def _disk_path(cache, key):
+    return os.path.join(cache['disk_dir'], f"{key}.json")
+
+
+def _disk_entries(disk_dir):
+    """(path, mtime, size) for every cache file in the directory."""
+    entries = []
+    for entry in os.scandir(disk_dir):
+        if entry.name.endswith('.json'):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry.path, stat.st_mtime, stat.st_size))
+    return entries
+
+
+def _remember(cache, key, stored_at, value):
+    entries = cache['entries']
+    entries[key] = (stored_at, value)
+    entries.move_to_end(key)
+    while len(entries) > cache['max_entries']:
+        entries.popitem(last=False)
+
+
+def _read_disk(cache, key, now):
+    path = _disk_path(cache, key)
+    try:
+        stored_at = os.stat(path).st_mtime
+        if now - stored_at > _lifetime(cache):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return stored_at, json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _prune_disk(cache, now):
+    """Drop expired files, then the oldest ones until the directory fits the size limit."""
+    total = 0
+    kept = []
+    for path, mtime, size in _disk_entries(cache['disk_dir']):
+        if now - mtime > _lifetime(cache):
+            _remove(path)
+        else:
+            kept.append((mtime, path, size))
+            total += size
+    kept.sort()
+    for _, path, size in kept:
+        if total <= cache['max_disk_bytes']:
+            break
+        _remove(path)
+        total -= size
+    cache['disk_bytes'] = total
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def cache_lookup(cache, key):
+    """Return (value, fresh) for `key`, or (None, False) if it is missing or past its stale window."""
+    now = time.time()
+    with cache['lock']:
+        found = cache['entries'].get(key)
+        if found and now - found[0] > _lifetime(cache):
+            del cache['entries'][key]
+            found = None
+        elif found:
+            cache['entries'].move_to_end(key)
+    tier = 'memory_hits'
+
+    # Another worker may have refreshed a stale entry on disk.
+    if cache['disk_dir'] and (found is None or now - found[0] > cache['ttl']):
+        on_disk = _read_disk(cache, key, now)
+        if on_disk and (found is None or on_disk[0] > found[0]):
+            found, tier = on_disk, 'disk_hits'
+    with cache['lock']:
+        if found is None:
+            cache['stats']['misses'] += 1
+            return None, False
+        if tier == 'disk_hits':
+            _remember(cache, key, *found)
+        fresh = now - found[0] <= cache['ttl']
+        cache['stats'][tier if fresh else 'stale_hits'] += 1
+        return found[1], fresh
+
+
+def cache_get(cache, key):
+    """Return the fresh cached value for `key`, or None."""
+    value, fresh = cache_lookup(cache, key)
+    return value if fresh else None
+
+
+def cache_put(cache, key, value):
+    """Store a JSON-serializable value in both tiers."""
+    now = time.time()
+    with cache['lock']:
+        _remember(cache, key, now, value)
+    if not cache['disk_dir']:
+        return
+
+    path = _disk_path(cache, key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+        size = os.path.getsize(tmp_path)
+        try:
+            # Overwriting a key replaces its file; only the difference is new on disk.
+            size -= os.path.getsize(path)
+        except OSError:
+            pass
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"⚠️ Cache '{cache['name']}' could not write {path}: {e}")
+        _remove(tmp_path)
+        return
+
+    with cache['lock']:
+        cache['disk_bytes'] += size
+        if cache['disk_bytes'] > cache['max_disk_bytes']:
+            _prune_disk(cache, now)
+
+
+def cache_stats(cache):
+    """Counters and sizes for /health."""
+    with cache['lock']:
+        stats = dict(cache['stats'])
+        stats['memory_entries'] = len(cache['entries'])
+    lookups = stats['memory_hits'] + stats['disk_hits'] + stats['stale_hits'] + stats['misses']
+    stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+    stats['disk_enabled'] = bool(cache['disk_dir'])
+    if cache['disk_dir']:
+        stats['disk_bytes'] = cache['disk_bytes']
+    return stats
@@ -0,0 +1,304 @@
+"""Per-stage timing, throughput and memory of a main.py run, written as a JSON run report.
+
+main.py wraps each pipeline stage (CSV load, cleaning, dedup, extraction,
+aggregation, forecasting, database writes, index exports) in stage() or,
+for the streaming stages that hand records to each other lazily, track():
+
+    with stage('forecast') as s:
+        trends = forecast_trends(counts)
+        s['rows'] += len(counts)
+
+    records = track('dedup', drop_duplicates(records, dedup))
+
+Stages nest, and each one is charged its own time only: when extraction
+pulls a record that first has to be loaded and cleaned, that time goes to
+'load' and 'clean', not 'extract'. For every stage the report gives wall
+seconds, rows produced, rows/s and the peak RSS seen while it ran, sampled
+every SAMPLE_INTERVAL by a background thread (process-wide, so spaCy worker
+processes are not included).
+
+With `profile='cprofile'` every stage gets its own cProfile.Profile, dumped
+next to the report as <report>.<stage>.prof; with `profile='sample'` the
+sampler also records the main thread's stack every PROFILE_INTERVAL and
+writes them as <report>.collapsed (one "stage;frame;frame count" line per
+stack, the input flamegraph tools take). The report lists each stage's top
+functions either way.
+
+stage() and track() are no-ops outside an instrumented_run() and in other
+threads.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+REPORT_DIR = os.path.join('data', 'reports')
+PROFILERS = ('cprofile', 'sample')
+SAMPLE_INTERVAL = 0.05
+PROFILE_INTERVAL = 0.005
+TOP_FUNCTIONS = 10
+
+_active = None
+
+
+def default_report_path(report_dir=REPORT_DIR):
+    return os.path.join(report_dir, time.strftime('run-%Y%m%d-%H%M%S.json'))
+
+
+def _rss_bytes():
+    """Current resident set size, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _peak_rss_bytes():
+    """The process's RSS high-water mark, or None on platforms without `resource`."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _mb(n_bytes):
+    return round(n_bytes / (1024 * 1024), 1) if n_bytes else None
+
+
+# --- Recording ---
+def start_run(profile=None, settings=None):
+    """Make a new run the active one and start its sampler thread."""
+    global _active
+    if profile not in (None, *PROFILERS):
+        raise ValueError(f"Unknown profiler '{profile}'; expected one of {PROFILERS}")
+    report = {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'start': time.perf_counter(),
+        'profile': profile,
+        'settings': settings or {},
+        'thread': threading.get_ident(),
+        'stages': {},
+        'stack': [],
+        'samples': Counter(),
+        'stop': threading.Event(),
+    }
+    report['sampler'] = threading.Thread(target=_sample, args=(report,), name='run-report-sampler', daemon=True)
+    report['sampler'].start()
+    _active = report
+    return report
+
+
+def _stage_stats(report, name):
+    stats = report['stages'].get(name)
+    if stats is None:
+        profiler = None
+        if report['profile'] == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+        stats = report['stages'][name] = {'name': name, 'seconds': 0.0, 'rows': 0, 'peak_rss': None,
+                                          'profiler': profiler}
+    return stats
+
+
+def _enter(report, stats):
+    stack = report['stack']
+    if stats['profiler'] is not None:
+        if stack:
+            stack[-1][0]['profiler'].disable()
+        stats['profiler'].enable()
+    stack.append([stats, time.perf_counter(), 0.0])
+
+
+def _exit(report):
+    stack = report['stack']
+    stats, start, child_seconds = stack.pop()
+    elapsed = time.perf_counter() - start
+    stats['seconds'] += elapsed - child_seconds
+    if stack:
+        stack[-1][2] += elapsed
+    if stats['profiler'] is not None:
+        stats['profiler'].disable()
+        if stack:
+            stack[-1][0]['profiler'].enable()
+
+
+def _record_rss(stats, rss=None):
+    rss = rss or _rss_bytes()
+    if rss and (stats['peak_rss'] is None or rss > stats['peak_rss']):
+        stats['peak_rss'] = rss
+
+
+def _current(report):
+    return report if report is not None and threading.get_ident() == report['thread'] else None
+
+
+@contextmanager
+def stage(name):
+    """Time the block as stage `name`; add the rows it produced to the yielded dict's 'rows'."""
+    report = _current(_active)
+    if report is None:
+        yield {'rows': 0}
+        return
+    stats = _stage_stats(report, name)
+    _record_rss(stats)
+    _enter(report, stats)
+    try:
+        yield stats
+    finally:
+        _exit(report)
+        _record_rss(stats)
+
+
+def track(name, iterable, rows=None):
+    """Pass `iterable` through, charging the time spent producing each item to stage `name`.
+
+    Each item counts as one row, or as rows(item) rows when given (e.g. len for chunks).
+    """
+    report = _current(_active)
+    if report is None:
+        return iterable
+    return _tracked(report, _stage_stats(report, name), iter(iterable), rows)
+
+
+def _tracked(report, stats, iterator, rows):
+    while True:
+        _enter(report, stats)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _exit(report)
+        stats['rows'] += rows(item) if rows else 1
+        yield item
+
+
+def _sample(report):
+    profiling = report['profile'] == 'sample'
+    interval = PROFILE_INTERVAL if profiling else SAMPLE_INTERVAL
+    last_rss = 0.0
+    while not report['stop'].wait(interval):
+        try:
+            stats = report['stack'][-1][0]
+        except IndexError:
+            stats = None
+        now = time.perf_counter()
+        if stats is not None and now - last_rss >= SAMPLE_INTERVAL:
+            _record_rss(stats)
+            last_rss = now
+        if profiling:
+            frame = sys._current_frames().get(report['thread'])
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            name = stats['name'] if stats is not None else '(no stage)'
+            report['samples'][(name, tuple(reversed(frames)))] += 1
+
+
+# --- Reporting ---
+def _cprofile_top(profiler):
+    import pstats
+
+    entries = pstats.Stats(profiler).stats.items()
+    top = sorted(entries, key=lambda entry: entry[1][2], reverse=True)[:TOP_FUNCTIONS]
+    return [{'function': f"{func} ({os.path.basename(file)}:{line})", 'calls': calls,
+             'self_seconds': round(self_seconds, 4), 'cumulative_seconds': round(cumulative, 4)}
+            for (file, line, func), (_, calls, self_seconds, cumulative, _) in top]
+
+
+def _sample_top(samples, name):
+    leaves, total = Counter(), 0
+    for (stage_name, frames), count in samples.items():
+        if stage_name == name and frames:
+            leaves[frames[-1]] += count
+            total += count
+    return [{'function': function, 'samples': count, 'share': round(count / total, 4)}
+            for function, count in leaves.most_common(TOP_FUNCTIONS)]
+
+
+def finish_run(report, path=None, status='ok', error=None):
+    """Stop recording, write the JSON report (and profiles) to `path` and print a summary."""
+    global _active
+    report['stop'].set()
+    report['sampler'].join()
+    if _active is report:
+        _active = None
+
+    wall = time.perf_counter() - report['start']
+    peak = _peak_rss_bytes()
+    base = os.path.splitext(path)[0] if path else None
+    if path:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    stages = []
+    for stats in report['stages'].values():
+        seconds = stats['seconds']
+        entry = {
+            'stage': stats['name'],
+            'seconds': round(seconds, 4),
+            'share': round(seconds / wall, 4) if wall else 0.0,
+            'rows': stats['rows'],
+            'rows_per_sec': round(stats['rows'] / seconds, 1) if seconds else None,
+            'peak_rss_mb': _mb(stats['peak_rss']),
+        }
+        if stats['profiler'] is not None:
+            entry['top_functions'] = _cprofile_top(stats['profiler'])
+            if base:
+                stats['profiler'].dump_stats(f"{base}.{stats['name']}.prof")
+        elif report['samples']:
+            entry['top_functions'] = _sample_top(report['samples'], stats['name'])
+        stages.append(entry)
+
+    summary = {
+        'started_at': report['started_at'],
+        'status': status,
+        'error': error,
+        'wall_seconds': round(wall, 4),
+        'unattributed_seconds': round(wall - sum(stats['seconds'] for stats in report['stages'].values()), 4),
+        'peak_rss_mb': _mb(peak),
+        'profile': report['profile'],
+        'settings': report['settings'],
+        'stages': stages,
+    }
+    if base and report['samples']:
+        with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+            for (name, frames), count in report['samples'].items():
+                f.write(f"{';'.join((name, *frames))} {count}\n")
+    if path:
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    print_summary(summary)
+    if path:
+        print(f"📊 Run report written to {path}")
+    return summary
+
+
+def print_summary(summary):
+    peak = f", peak RSS {summary['peak_rss_mb']:.0f} MB" if summary['peak_rss_mb'] else ""
+    print(f"\n⏱️ Stage timings (wall {summary['wall_seconds']:.2f}s{peak}):")
+    for entry in sorted(summary['stages'], key=lambda entry: entry['seconds'], reverse=True):
+        rate = f"{entry['rows_per_sec']:>12,.0f} rows/s" if entry['rows_per_sec'] else " " * 19
+        rss = f"  peak {entry['peak_rss_mb']:.0f} MB" if entry['peak_rss_mb'] else ""
+        print(f"   {entry['stage']:<20} {entry['seconds']:9.2f}s {entry['share']:6.1%} {rate}{rss}")
+
+
+@contextmanager
+def instrumented_run(path=None, profile=None, settings=None):
+    """Record the stages run inside the block and write the report when it ends, even on failure."""
+    report = start_run(profile, settings)
+    try:
+        yield report
+    except BaseException as e:
+        finish_run(report, path, status='failed', error=f"{type(e).__name__}: {e}")
+        raise
+    finish_run(report, path)
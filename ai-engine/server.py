@@ -1,18 +1,29 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import pdfplumber
 import os
-try:
-    from google import genai
-    from google.genai import types
-    HAS_GEMINI = True
-except ImportError:
+import importlib.util
+# Heavy dependencies (spaCy, google-genai, pdfplumber, serpapi, statsmodels,
+# TextBlob) are imported on first use by the endpoint that needs them, or all
+# at once by warmup(); see benchmarks/import_cost.py.
+HAS_GEMINI = importlib.util.find_spec("google.genai") is not None
+if not HAS_GEMINI:
     print("⚠️  google-genai not installed. Falling back to local NLP.")
-    HAS_GEMINI = False
 from dotenv import load_dotenv
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import json
-import spacy
+from taxonomy import current_taxonomy, surface_terms
+from trend_index import TREND_INDEX_PATH, load_trend_index, lookup_trend
+from skill_cooccurrence import COOCCURRENCE_INDEX_PATH, load_cooccurrence_index, related_skills
+from pdf_text import (MAX_BYTES as PDF_MAX_BYTES, IncompleteExtractionError, extract_text, extraction_settings,
+                      reset_pool as reset_pdf_pool)
+import llm_gateway
+from llm_gateway import CircuitOpenError, create_gateway, gateway_stats, http_options as llm_http_options
+from result_cache import cache_from_env, cache_get, cache_key, cache_lookup, cache_put, cache_stats
+from jobs_provider import RateLimitedError, create_job_search, job_search_stats, search_jobs
+from forecasting import forecast_cache, forecast_many
+
+SOFT_CATEGORIES = ('soft',)
 
 # Load environment variables
 load_dotenv()
@@ -21,36 +32,92 @@ app = Flask(__name__)
 CORS(app)
 
 # Configure Gemini
+# The client and its gateway are created on the first LLM call.
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY and HAS_GEMINI:
+GEMINI_ENABLED = bool(GEMINI_API_KEY and HAS_GEMINI)
+model_name = 'gemini-1.5-flash'
+llm = None
+_llm_lock = threading.Lock()
+if GEMINI_ENABLED:
     print(f"DEBUG: Loaded API Key starting with: {GEMINI_API_KEY[:10]}...")
+
+def get_llm():
+    """The process's LLM gateway, creating the Gemini client on first use."""
+    global llm, GEMINI_ENABLED
+    if llm is not None or not GEMINI_ENABLED:
+        return llm
+    with _llm_lock:
+        if llm is None and GEMINI_ENABLED:
+            try:
+                from google import genai
+                client = genai.Client(api_key=GEMINI_API_KEY, http_options=llm_http_options())
+                llm = create_gateway(client, model_name)
+            except Exception as e:
+                print(f"Failed to initialize Gemini: {e}")
+                GEMINI_ENABLED = False
+    return llm
+
+def generate_text(prompt):
+    """Model text for `prompt` through the shared LLM gateway."""
+    gateway = get_llm()
+    if not gateway:
+        raise CircuitOpenError("Gemini not configured")
+    return llm_gateway.generate(gateway, prompt)
+
+def stream_text(prompt):
+    """Model text for `prompt`, chunk by chunk, through the shared LLM gateway."""
+    gateway = get_llm()
+    if not gateway:
+        raise CircuitOpenError("Gemini not configured")
+    return llm_gateway.generate_stream(gateway, prompt)
+
+# --- Skill extraction pipeline ---
+# Skills and soft skills come from an EntityRuler over the shared taxonomy, so
+# only the tokenizer is needed; the statistical components are never loaded.
+PIPELINE_EXCLUDES = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+
+def build_skill_pipeline(taxonomy):
+    """Tokenizer-only pipeline with an EntityRuler for the given taxonomy, warmed up."""
+    import spacy
+
     try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
-        model_name = 'gemini-1.5-flash'
-    except Exception as e:
-        print(f"Failed to initialize Gemini: {e}")
-        client = None
-else:
-    client = None
-
-# Load NLP model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    nlp = None 
-
-# --- Helper: PDF Text Extraction ---
-def extract_text_from_pdf(file_path):
-    text = ""
+        pipeline = spacy.load("en_core_web_sm", exclude=PIPELINE_EXCLUDES)
+    except OSError:
+        print("⚠️  en_core_web_sm not installed. Using the blank English tokenizer.")
+        pipeline = spacy.blank("en")
+    ruler = pipeline.add_pipe("entity_ruler", config={"phrase_matcher_attr": "LOWER"})
+    skills = taxonomy['skills']
+    ruler.add_patterns([
+        {"label": "SOFT_SKILL" if skills[skill]['category'] in SOFT_CATEGORIES else "SKILL",
+         "id": skill, "pattern": surface}
+        for surface, skill in surface_terms(taxonomy)
+    ])
+    pipeline("Warm-up: Python, AWS and communication.")
+    return {'version': taxonomy['version'], 'nlp': pipeline, 'skills': skills}
+
+# Built on first use, or up front by warmup().
+_pipeline_lock = threading.Lock()
+skill_pipeline = None
+
+def current_skill_pipeline():
+    """The pipeline for the current taxonomy; rebuilt off to the side and swapped in on change.
+
+    Only the first build makes requests wait. While one request rebuilds for a
+    new taxonomy, the others keep using the previous pipeline.
+    """
+    global skill_pipeline
+    taxonomy = current_taxonomy()
+    pipeline = skill_pipeline
+    if pipeline is not None and pipeline['version'] == taxonomy['version']:
+        return pipeline
+    if not _pipeline_lock.acquire(blocking=pipeline is None):
+        return pipeline
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                content = page.extract_text()
-                if content:
-                    text += content + "\n"
-    except Exception as e:
-        print(f"PDF Extraction Error: {e}")
-    return text
+        if skill_pipeline is None or skill_pipeline['version'] != taxonomy['version']:
+            skill_pipeline = build_skill_pipeline(taxonomy)
+        return skill_pipeline
+    finally:
+        _pipeline_lock.release()
 
 # --- Helper: Advanced Resume Parser (Gemini) ---
 def parse_resume_with_gemini(text):
@@ -68,50 +135,28 @@ def parse_resume_with_gemini(text):
     {text}
     """
     try:
-        if not client:
+        if not GEMINI_ENABLED:
             return None
-        response = client.models.generate_content(
-            model=model_name,
-            contents=prompt
-        )
         # Clean up potential markdown formatting in response
-        result_text = response.text.replace("```json", "").replace("```", "").strip()
+        result_text = generate_text(prompt).replace("```json", "").replace("```", "").strip()
         return json.loads(result_text)
     except Exception as e:
         print(f"Gemini Parsing Error: {e}")
         return None
 
 # --- Helper: Basic Resume Parser (Spacy Fallback) ---
-def parse_resume_with_spacy(text):
-    if not nlp:
-        return {"technical_skills": [], "soft_skills": [], "role": "Unknown", "seniority": "Unknown"}
-        
-    # Setup EntityRuler if not exists
-    if "entity_ruler" not in nlp.pipe_names:
-        ruler = nlp.add_pipe("entity_ruler", before="ner")
-        skills = [
-            # Initally populated with common tech skills
-            "Python", "Java", "C++", "C#", "JavaScript", "TypeScript", "React", "Angular", "Vue", "Node.js",
-            "SQL", "NoSQL", "MongoDB", "PostgreSQL", "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Git",
-            "Machine Learning", "Deep Learning", "TensorFlow", "PyTorch", "Data Science", "Flask", "Django",
-            "FastAPI", "HTML", "CSS", "Tailwind", "Bootstrap", "Linux", "Windows", "MacOS", "Agile", "Scrum",
-            "Rust", "Go", "Kotlin", "Swift", "Flutter", "React Native", "Jenkins", "CI/CD", "Terraform"
-        ]
-        patterns = [{"label": "SKILL", "pattern": [{"LOWER": skill.lower()}]} for skill in skills]
-        ruler.add_patterns(patterns)
-
-    doc = nlp(text)
+EMPTY_ANALYSIS = {"technical_skills": [], "soft_skills": [], "role": "Unknown", "seniority": "Unknown"}
+
+def _analysis_from_doc(doc, skills):
     found_skills = set()
+    soft_skills = set()
     for ent in doc.ents:
+        if ent.ent_id_ not in skills:
+            continue
         if ent.label_ == "SKILL":
-            found_skills.add(ent.text.capitalize())
-            
-    # Also check for simple string matches if NER misses
-    known_skills_set = {"communication", "leadership", "teamwork", "problem solving", "time management"}
-    soft_skills = set()
-    for token in doc:
-        if token.text.lower() in known_skills_set:
-            soft_skills.add(token.text.capitalize())
+            found_skills.add(skills[ent.ent_id_]['name'])
+        elif ent.label_ == "SOFT_SKILL":
+            soft_skills.add(skills[ent.ent_id_]['name'])
 
     return {
         "technical_skills": list(found_skills),
@@ -120,6 +165,69 @@ def parse_resume_with_spacy(text):
         "seniority": "Junior-Mid"
     }
 
+def _pipeline_or_none():
+    try:
+        return current_skill_pipeline()
+    except Exception as e:
+        print(f"Skill pipeline error: {e}")
+        return None
+
+def parse_resume_with_spacy(text):
+    pipeline = _pipeline_or_none()
+    if not pipeline:
+        return dict(EMPTY_ANALYSIS)
+    return _analysis_from_doc(pipeline['nlp'](text), pipeline['skills'])
+
+def parse_resumes_with_spacy(texts, batch_size=64):
+    """Yield one analysis per text, in order, running the texts through nlp.pipe()."""
+    pipeline = _pipeline_or_none()
+    if not pipeline:
+        for _ in texts:
+            yield dict(EMPTY_ANALYSIS)
+        return
+    for doc in pipeline['nlp'].pipe(texts, batch_size=batch_size):
+        yield _analysis_from_doc(doc, pipeline['skills'])
+
+# --- Helper: Batch Requests ---
+MAX_BATCH_TEXTS = int(os.getenv("MAX_BATCH_TEXTS", "1000"))
+
+def _batch_texts():
+    """Validate a {"texts": [...]} body. Returns (texts, error_response)."""
+    texts = (request.get_json(silent=True) or {}).get('texts')
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return None, (jsonify({"error": "Expected a JSON body with a 'texts' array of strings"}), 400)
+    if len(texts) > MAX_BATCH_TEXTS:
+        return None, (jsonify({"error": f"At most {MAX_BATCH_TEXTS} texts per batch"}), 413)
+    return texts, None
+
+def _wants_stream():
+    return (request.args.get('stream') in ('1', 'true')
+            or request.accept_mimetypes.best == 'application/x-ndjson')
+
+def _batch_response(texts, analyze_many):
+    """Run `analyze_many` over the non-empty texts and answer in input order.
+
+    Empty texts get the single-text endpoint's error object in their slot.
+    With ?stream=1 (or Accept: application/x-ndjson) each result is written as
+    one NDJSON line, tagged with its index, as soon as it is ready.
+    """
+    def results():
+        present = [i for i, text in enumerate(texts) if text]
+        analyzed = analyze_many([texts[i] for i in present])
+        next_present = iter(present)
+        pending = next(next_present, None)
+        for i in range(len(texts)):
+            if i == pending:
+                yield i, next(analyzed)
+                pending = next(next_present, None)
+            else:
+                yield i, {"error": "No text provided"}
+
+    if _wants_stream():
+        lines = (json.dumps({"index": i, **result}) + "\n" for i, result in results())
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+    return jsonify({"count": len(texts), "results": [result for _, result in results()]})
+
 @app.route('/extract-skills', methods=['POST'])
 def extract_skills_endpoint():
     text = request.json.get('text', '')
@@ -129,29 +237,163 @@ def extract_skills_endpoint():
     analysis = parse_resume_with_spacy(text)
     return jsonify(analysis)
 
+@app.route('/extract-skills/batch', methods=['POST'])
+def extract_skills_batch_endpoint():
+    texts, error = _batch_texts()
+    if error:
+        return error
+    return _batch_response(texts, parse_resumes_with_spacy)
+
+# --- Lifecycle ---
+# Liveness only says the process answers; readiness says models are loaded and
+# warm and the worker is not draining, so load balancers can route to it.
+_lifecycle = {'ready': False, 'draining': False}
+
+WARMUP = os.getenv("AI_ENGINE_WARMUP", "1") != "0"
+LAZY_MODULES = ('spacy', 'google.genai', 'pdfplumber', 'serpapi', 'statsmodels', 'textblob')
+
+def loaded_modules():
+    import sys
+    return [name for name in LAZY_MODULES if name in sys.modules]
+
+def warmup(load_models=WARMUP):
+    """Mark the process ready, first loading and exercising every heavy dependency
+    unless AI_ENGINE_WARMUP=0. Under gunicorn this runs in the parent before
+    forking, so workers share the loaded pages copy-on-write."""
+    if load_models:
+        current_skill_pipeline()
+        # Imported only so that forked workers inherit them already loaded.
+        importlib.import_module('pdfplumber')
+        importlib.import_module('serpapi')
+        from textblob.en import sentiment as pattern_sentiment
+        pattern_sentiment("Warm-up: a great team.")
+        forecast_many([([1.0, 2.0, 3.0, 4.0, 5.0, 6.0], 1)])
+        if GEMINI_ENABLED:
+            importlib.import_module('google.genai')
+    _lifecycle['ready'] = True
+
+def reset_after_fork():
+    """Drop pools whose threads or processes belong to the parent."""
+    global _refresh_pool
+    reset_pdf_pool(shutdown=False)
+    _refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="skill-answer-refresh")
+
+def begin_shutdown():
+    """Fail readiness while in-flight requests drain."""
+    _lifecycle['draining'] = True
+
+def shutdown():
+    _refresh_pool.shutdown(wait=False)
+    reset_pdf_pool()
+
+def is_ready():
+    return _lifecycle['ready'] and not _lifecycle['draining']
+
+@app.route('/health/live', methods=['GET'])
+def health_live():
+    return jsonify({"status": "alive"}), 200
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    if is_ready():
+        return jsonify({"status": "ready"}), 200
+    return jsonify({"status": "draining" if _lifecycle['draining'] else "starting"}), 503
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({
         "status": "AI Service is running",
-        "nlp_model_loaded": nlp is not None,
-        "gemini_active": client is not None,
-        "api_key_configured": GEMINI_API_KEY is not None
+        "ready": is_ready(),
+        "nlp_model_loaded": skill_pipeline is not None,
+        "gemini_active": GEMINI_ENABLED,
+        "api_key_configured": GEMINI_API_KEY is not None,
+        "resume_cache": cache_stats(resume_cache),
+        "forecast_cache": cache_stats(forecast_cache),
+        "skill_answer_cache": cache_stats(skill_answer_cache),
+        "trend_index_skills": len(trend_index['lookup']) if trend_index else 0,
+        "cooccurrence_index_skills": len(cooccurrence_index['lookup']) if cooccurrence_index else 0,
+        "llm": gateway_stats(llm) if llm else None,
+        "jobs": job_search_stats(job_search),
+        "modules_loaded": loaded_modules()
     }), 200
 
+# --- Skill Answer Cache ---
+# Gemini answers for /predict-trend and /semantic-skills, keyed on the
+# normalized skill and the prompt version and kept on disk across restarts.
+# Fresh for SKILL_ANSWER_CACHE_TTL seconds; for SKILL_ANSWER_CACHE_MAX_STALE
+# seconds after that the stored answer is still served immediately while one
+# background refresh per key asks Gemini again.
+SKILL_PROMPT_VERSION = "1"
+skill_answer_cache = cache_from_env(
+    "skill-answers", "SKILL_ANSWER",
+    max_entries=2048, ttl=24 * 3600, max_stale=30 * 24 * 3600, max_disk_mb=50,
+    disk_dir=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'cache', 'skill_answers'),
+)
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="skill-answer-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def normalize_skill(skill):
+    return ' '.join(skill.lower().split())
+
+def _refresh_skill_answer(key, compute):
+    try:
+        cache_put(skill_answer_cache, key, compute())
+    except Exception as e:
+        print(f"Skill answer refresh failed: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+def cached_skill_answer(kind, skill, compute):
+    """Cached `compute()` result for (kind, skill); raises whatever compute() raises on a miss."""
+    key = cache_key(kind, SKILL_PROMPT_VERSION, model_name if GEMINI_ENABLED else '', skill)
+    value, fresh = cache_lookup(skill_answer_cache, key)
+    if value is None:
+        value = compute()
+        cache_put(skill_answer_cache, key, value)
+    elif not fresh:
+        with _refreshing_lock:
+            start = key not in _refreshing
+            _refreshing.add(key)
+        if start:
+            _refresh_pool.submit(_refresh_skill_answer, key, compute)
+    return value
+
+def _llm_json(prompt):
+    result_text = generate_text(prompt).replace("```json", "").replace("```", "").strip()
+    return json.loads(result_text)
+
+# --- Precomputed Trend Index ---
+# Written by main.py after each batch run; /predict-trend asks the LLM only for
+# skills the index does not cover.
+trend_index = load_trend_index(os.getenv("TREND_INDEX_PATH", TREND_INDEX_PATH))
+
+def canonical_skill(skill):
+    name = normalize_skill(skill)
+    try:
+        name = current_taxonomy()['aliases'].get(name, name)
+    except Exception as e:
+        print(f"Taxonomy error: {e}")
+    return name
+
+def indexed_trend(skill):
+    return lookup_trend(trend_index, canonical_skill(skill))
+
 @app.route('/predict-trend', methods=['POST'])
 def predict_trend():
     data = request.json
     skill = data.get('skill', 'unknown')
     
-    if client:
+    indexed = indexed_trend(skill)
+    if indexed:
+        return jsonify({"skill": skill, **indexed})
+    
+    if GEMINI_ENABLED:
         try:
-            prompt = f"Provide a skill trend analysis for '{skill}'. Is it growing, stable, or declining? Provide a score from 0-100. Return ONLY a JSON object: {{'trend': '...', 'score': 0-100, 'reason': '...'}}"
-            response = client.models.generate_content(
-                model=model_name,
-                contents=prompt
-            )
-            result_text = response.text.replace("```json", "").replace("```", "").strip()
-            return jsonify(json.loads(result_text))
+            name = normalize_skill(skill)
+            prompt = f"Provide a skill trend analysis for '{name}'. Is it growing, stable, or declining? Provide a score from 0-100. Return ONLY a JSON object: {{'trend': '...', 'score': 0-100, 'reason': '...'}}"
+            return jsonify(cached_skill_answer('predict-trend', name, lambda: _llm_json(prompt)))
         except Exception as e:
             print(f"Prediction Error: {e}")
             
@@ -163,54 +405,104 @@ def predict_trend():
         "warning": "AI Offline: Using fallback trend data."
     })
 
+# --- Resume Result Cache ---
+# Results are keyed on the uploaded bytes plus the parser that would handle them,
+# so re-uploads of the same PDF skip both extraction and the LLM call.
+# RESUME_CACHE_DIR enables the shared on-disk tier.
+RESUME_PARSER_VERSION = "1"
+resume_cache = cache_from_env("parse-resume", "RESUME")
+
+def resume_parser_version():
+    if GEMINI_ENABLED:
+        return f"{RESUME_PARSER_VERSION}:{extraction_settings()}:gemini:{model_name}"
+    # The taxonomy the spaCy pipeline will be (re)built from, not the one it may still hold.
+    return f"{RESUME_PARSER_VERSION}:{extraction_settings()}:spacy:{current_taxonomy()['version']}"
+
 @app.route('/parse-resume', methods=['POST'])
 def parse_resume():
     if 'file' not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
     
     file = request.files['file']
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-        file.save(temp_file.name)
-        temp_path = temp_file.name
+    data = file.read(PDF_MAX_BYTES + 1)
+    if len(data) > PDF_MAX_BYTES:
+        return jsonify({"error": f"File too large (limit {PDF_MAX_BYTES} bytes)"}), 413
+    key = cache_key(data, resume_parser_version())
+    cached = cache_get(resume_cache, key)
+    if cached is not None:
+        return jsonify(cached)
     
     try:
-        text = extract_text_from_pdf(temp_path)
+        try:
+            text, complete = extract_text(data), True
+        except IncompleteExtractionError as e:
+            print(f"PDF Extraction Error: {e}")
+            text, complete = e.text, False
         
         analysis = None
-        if client and text.strip():
+        if GEMINI_ENABLED and text.strip():
             analysis = parse_resume_with_gemini(text)
         
+        # Only complete, non-empty extractions are cached, and a spaCy fallback
+        # after a failed Gemini call is not, so the next upload retries both.
+        cacheable = complete and bool(text.strip()) and (bool(analysis) or not GEMINI_ENABLED)
         if not analysis:
             analysis = parse_resume_with_spacy(text)
+        if cacheable:
+            cache_put(resume_cache, key, analysis)
             
-        os.remove(temp_path)
         return jsonify(analysis)
         
     except Exception as e:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
         return jsonify({"error": str(e)}), 500
 
+# --- Related Skills Index ---
+# Skill co-occurrence across every posting, written by main.py. /semantic-skills
+# answers from it and asks the LLM only for skills it does not cover, or, with
+# {"enrich": true}, for extra suggestions alongside the indexed answer.
+cooccurrence_index = load_cooccurrence_index(os.getenv("COOCCURRENCE_INDEX_PATH", COOCCURRENCE_INDEX_PATH))
+
+def indexed_related_skills(skill, limit=5):
+    related = related_skills(cooccurrence_index, canonical_skill(skill), limit)
+    if not related:
+        return None
+    try:
+        names = current_taxonomy()['skills']
+    except Exception as e:
+        print(f"Taxonomy error: {e}")
+        names = {}
+    return {
+        "related_skills": [names.get(key, {}).get('name', key) for key, _, _ in related],
+        "scores": [{"skill": names.get(key, {}).get('name', key), "npmi": npmi, "shared_postings": shared}
+                   for key, npmi, shared in related],
+        "source": "cooccurrence",
+    }
+
+def _related_skills_prompt(name):
+    return f"List 5 highly related technical skills for someone who knows '{name}'. Return as a JSON array of strings: ['skill1', 'skill2', ...]"
+
 @app.route('/semantic-skills', methods=['POST'])
 def semantic_skills():
-    if not client:
-        return jsonify({"error": "Gemini not configured"}), 503
-        
     data = request.json
     skill = data.get('skill', '')
+    name = normalize_skill(skill)
+
+    indexed = indexed_related_skills(skill)
+    if indexed:
+        response = {"skill": skill, **indexed}
+        if data.get('enrich') and GEMINI_ENABLED:
+            try:
+                response["llm_related_skills"] = cached_skill_answer(
+                    'semantic-skills', name, lambda: _llm_json(_related_skills_prompt(name)))
+            except Exception as e:
+                print(f"AI Error (Semantic Skills enrichment): {e}")
+        return jsonify(response)
+
+    if not GEMINI_ENABLED:
+        return jsonify({"error": "Gemini not configured"}), 503
     
     try:
-        if not client:
-            raise Exception("Gemini not configured")
-            
-        prompt = f"List 5 highly related technical skills for someone who knows '{skill}'. Return as a JSON array of strings: ['skill1', 'skill2', ...]"
-        response = client.models.generate_content(
-            model=model_name,
-            contents=prompt
-        )
-        result_text = response.text.replace("```json", "").replace("```", "").strip()
-        related = json.loads(result_text)
+        related = cached_skill_answer('semantic-skills', name, lambda: _llm_json(_related_skills_prompt(name)))
         return jsonify({"skill": skill, "related_skills": related})
     except Exception as e:
         print(f"AI Error (Semantic Skills): {e}")
@@ -229,157 +521,288 @@ def semantic_skills():
             "warning": "AI Offline: Using cached data (API Key likely expired)"
         })
 
-# --- SerpApi Integration (Real-time Jobs) ---
-from serpapi import GoogleSearch
+# --- Real-time Jobs (SerpApi or fixture provider) ---
+job_search = create_job_search()
 
 @app.route('/jobs', methods=['GET'])
 def get_jobs():
     skill = request.args.get('skill', 'Software Engineer')
     location = request.args.get('location', 'Remote')
     
-    # Use provided key or env var
-    api_key = os.getenv("SERPAPI_KEY") or "bda925bb735d94acc0c642067a987a39955cbcc2eeb2864f50e33b86be70b251"
-    
     try:
-        params = {
-            "engine": "google_jobs",
-            "q": f"{skill} jobs in {location}",
-            "api_key": api_key,
-            "num": 10
-        }
-        
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        
-        jobs_results = results.get("jobs_results", [])
-        
-        # Simplify response
-        simplified_jobs = []
-        for job in jobs_results:
-            simplified_jobs.append({
-                "title": job.get("title"),
-                "company_name": job.get("company_name"),
-                "location": job.get("location"),
-                "description": job.get("description"),
-                "detected_extensions": job.get("detected_extensions", {}),
-                "thumbnail": job.get("thumbnail")
-            })
-            
-        return jsonify({"skill": skill, "count": len(simplified_jobs), "jobs": simplified_jobs})
+        simplified_jobs, stale = search_jobs(job_search, skill, location)
+        response = {"skill": skill, "count": len(simplified_jobs), "jobs": simplified_jobs}
+        if stale:
+            response["warning"] = "Showing cached listings; live job search is temporarily unavailable."
+        return jsonify(response)
         
+    except RateLimitedError as e:
+        retry_after = max(1, int(e.retry_after + 0.999))
+        return jsonify({"error": str(e)}), 429, {"Retry-After": str(retry_after)}
     except Exception as e:
         print(f"SerpApi Error: {e}")
         return jsonify({"error": f"Job fetch failed: {str(e)}"}), 500
 
-# --- Advanced Forecasting (Statsmodels) ---
-import pandas as pd
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
+# --- Advanced Forecasting (Holt-Winters) ---
+MAX_BATCH_FORECASTS = int(os.getenv("MAX_BATCH_FORECASTS", "500"))
 
-@app.route('/forecast', methods=['POST'])
-def forecast():
-    data = request.json
+def _forecast_input(data):
+    """(values, last_year, years) from a /forecast body; raises ValueError if unusable."""
     history = data.get('history', [])
-    years = data.get('years', 3) 
+    years = int(data.get('years', 3))
     
     if not history or len(history) < 2:
-        return jsonify({"error": "Not enough data for forecasting"}), 400
+        raise ValueError("Not enough data for forecasting")
         
+    # Handle dict list or simple list
+    last_year = 2024
+    if isinstance(history[0], dict):
+         values = [float(h.get('demand_score', 0)) for h in history]
+         if 'year' in history[-1]:
+             last_year = int(history[-1]['year'])
+    else:
+         values = [float(x) for x in history]
+    return values, last_year, years
+
+def _forecast_response(skill, last_year, forecast_values):
+    response = []
+    for i, val in enumerate(forecast_values):
+         response.append({"year": last_year + i + 1, "demand_score": round(val, 2)})
+    return {"skill": skill, "forecast": response}
+
+@app.route('/forecast', methods=['POST'])
+def forecast():
+    data = request.json
     try:
-        # Handle dict list or simple list
-        values = []
-        last_year = 2024
-        
-        if isinstance(history[0], dict):
-             values = [float(h.get('demand_score', 0)) for h in history]
-             if 'year' in history[-1]:
-                 last_year = int(history[-1]['year'])
-        else:
-             values = [float(x) for x in history]
-             
-        series = pd.Series(values)
-        
-        # Holt-Winters Exponential Smoothing
-        model = ExponentialSmoothing(series, trend='add', seasonal=None, damped_trend=True)
-        fit = model.fit()
-        pred = fit.forecast(years)
-        
-        forecast_values = pred.tolist()
-        
-        response = []
-        for i, val in enumerate(forecast_values):
-             response.append({"year": last_year + i + 1, "demand_score": round(val, 2)})
-             
-        return jsonify({"skill": data.get('skill', 'Unknown'), "forecast": response})
+        values, last_year, years = _forecast_input(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        forecast_values = forecast_many([(values, years)])[0]
+        return jsonify(_forecast_response(data.get('skill', 'Unknown'), last_year, forecast_values))
         
     except Exception as e:
         print(f"Forecast Error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/forecast/batch', methods=['POST'])
+def forecast_batch():
+    """Body: {"series": [{"skill", "history", "years"?}, ...]}; one /forecast result per series, in order."""
+    series = (request.get_json(silent=True) or {}).get('series')
+    if not isinstance(series, list) or not all(isinstance(item, dict) for item in series):
+        return jsonify({"error": "Expected a JSON body with a 'series' array of objects"}), 400
+    if len(series) > MAX_BATCH_FORECASTS:
+        return jsonify({"error": f"At most {MAX_BATCH_FORECASTS} series per batch"}), 413
+
+    results = [None] * len(series)
+    valid, inputs = [], []
+    for i, item in enumerate(series):
+        try:
+            inputs.append(_forecast_input(item))
+            valid.append(i)
+        except (TypeError, ValueError) as e:
+            results[i] = {"error": str(e)}
+
+    try:
+        forecasts = forecast_many([(values, years) for values, _, years in inputs])
+    except Exception:
+        # One series failed; forecast them one by one (finished ones come from the memo) to find it.
+        forecasts = []
+        for values, _, years in inputs:
+            try:
+                forecasts.append(forecast_many([(values, years)])[0])
+            except Exception as e:
+                print(f"Forecast Error: {e}")
+                forecasts.append(e)
+    for i, (_, last_year, _), forecast_values in zip(valid, inputs, forecasts):
+        if isinstance(forecast_values, Exception):
+            results[i] = {"error": str(forecast_values)}
+        else:
+            results[i] = _forecast_response(series[i].get('skill', 'Unknown'), last_year, forecast_values)
+    return jsonify({"count": len(results), "results": results})
+
 # --- Sentiment Analysis ---
-from textblob import TextBlob
 
-@app.route('/analyze-sentiment', methods=['POST'])
-def analyze_sentiment():
-    text = request.json.get('text', '')
-    if not text:
-        return jsonify({"error": "No text provided"}), 400
-        
-    blob = TextBlob(text)
-    sentiment_score = blob.sentiment.polarity
-    subjectivity_score = blob.sentiment.subjectivity
-    
+def _sentiment_result(sentiment_score, subjectivity_score):
     sentiment = "Neutral"
     if sentiment_score > 0.1:
         sentiment = "Positive"
     elif sentiment_score < -0.1:
         sentiment = "Negative"
-        
-    return jsonify({
+
+    return {
         "sentiment": sentiment,
         "score": sentiment_score,
         "subjectivity": subjectivity_score
-    })
+    }
+
+def analyze_sentiments(texts):
+    """Yield one sentiment result per text, in order.
+
+    Calls TextBlob's pattern lexicon scorer directly (the same function
+    TextBlob(text).sentiment ends up in) without building a blob and a fresh
+    namedtuple type per text, and scores repeated texts once.
+    """
+    from textblob.en import sentiment as pattern_sentiment
+
+    scores = {}
+    for text in texts:
+        if text not in scores:
+            scores[text] = pattern_sentiment(text)
+        yield _sentiment_result(*scores[text])
+
+@app.route('/analyze-sentiment', methods=['POST'])
+def analyze_sentiment():
+    text = request.json.get('text', '')
+    if not text:
+        return jsonify({"error": "No text provided"}), 400
+        
+    from textblob import TextBlob
+    blob = TextBlob(text)
+    return jsonify(_sentiment_result(blob.sentiment.polarity, blob.sentiment.subjectivity))
+
+@app.route('/analyze-sentiment/batch', methods=['POST'])
+def analyze_sentiment_batch():
+    texts, error = _batch_texts()
+    if error:
+        return error
+    return _batch_response(texts, analyze_sentiments)
 
 # --- Mentor Bot Chat Endpoint ---
+# The prompt carries a rolling window of the conversation: the most recent
+# CHAT_HISTORY_TURNS messages of `history`, CHAT_HISTORY_CHARS characters at most.
+CHAT_HISTORY_TURNS = int(os.getenv("CHAT_HISTORY_TURNS", "10"))
+CHAT_HISTORY_CHARS = int(os.getenv("CHAT_HISTORY_CHARS", "4000"))
+CHAT_SPEAKERS = {'user': 'User', 'bot': 'AI', 'assistant': 'AI', 'model': 'AI'}
+
+CHAT_SYSTEM_INSTRUCTION = """You are "Propel", an advanced AI Career Mentor and Skill Evolution Guide. 
+        Your goal is to help users navigate their career path, suggest skills, and provide actionable advice.
+        Tone: Professional, encouraging, futuristic, and concise.
+        Do not answer questions unrelated to technology, career, skills, or professional development.
+        If asked about the platform, explain that this is the "Predictive Skill Evolution Platform".
+        """
+
+OFFLINE_CHAT_REPLY = {
+    "response": "I see you're interested in career growth! 🚀 \n\n(Note: I am currently in Offline Demo Mode because my AI connection is unavailable. Please verify your Google API Key to unlock my full potential. In the meantime, try uploading a resume or checking the Dashboard!)",
+    "source": "System (Offline)"
+}
+
+def chat_history_window(history, max_turns=CHAT_HISTORY_TURNS, max_chars=CHAT_HISTORY_CHARS):
+    """Prompt lines for the latest turns of `history` that fit the window, oldest first.
+
+    Turns look like {"role": "user" | "bot" | "assistant", "content": "..."};
+    anything else is skipped. The oldest turn kept loses its beginning if it
+    does not fit whole.
+    """
+    if not isinstance(history, list):
+        return []
+    lines, budget = [], max_chars
+    for turn in reversed(history):
+        if len(lines) >= max_turns or budget <= 0:
+            break
+        if not isinstance(turn, dict) or not isinstance(turn.get('content'), str):
+            continue
+        speaker = CHAT_SPEAKERS.get(turn.get('role'))
+        content = turn['content'].strip()
+        if not speaker or not content:
+            continue
+        if len(content) > budget:
+            content = "..." + content[len(content) - budget + 3:]
+        lines.append(f"{speaker}: {content}")
+        budget -= len(content)
+    return lines[::-1]
+
+def chat_prompt(message, history):
+    conversation = chat_history_window(history) + [f"User: {message}", "AI:"]
+    return CHAT_SYSTEM_INSTRUCTION + "\n\n" + "\n".join(conversation)
+
+def _chat_stream_format():
+    """'sse' or 'ndjson' when the client asked for a streamed reply, else None."""
+    stream = request.args.get('stream')
+    if stream == 'sse' or request.accept_mimetypes.best == 'text/event-stream':
+        return 'sse'
+    if stream == 'ndjson' or _wants_stream():
+        return 'ndjson'
+    return None
+
+def _chat_events(prompt):
+    """Yield (event, payload): a "delta" per chunk of the reply, then "done" or "error"."""
+    if not GEMINI_ENABLED:
+        yield "delta", {"delta": OFFLINE_CHAT_REPLY["response"]}
+        yield "done", OFFLINE_CHAT_REPLY
+        return
+    parts = []
+    try:
+        for chunk in stream_text(prompt):
+            parts.append(chunk)
+            yield "delta", {"delta": chunk}
+    except (CircuitOpenError, TimeoutError) as e:
+        print(f"Chat Error: {e}")
+        if not parts:
+            yield "delta", {"delta": OFFLINE_CHAT_REPLY["response"]}
+            yield "done", OFFLINE_CHAT_REPLY
+            return
+        yield "error", {"error": "I lost my train of thought. Please try again.", "response": "".join(parts)}
+        return
+    except Exception as e:
+        print(f"Chat Error: {e}")
+        yield "error", {"error": "I lost my train of thought. Please try again.", "response": "".join(parts)}
+        return
+    yield "done", {"response": "".join(parts), "source": "Gemini"}
+
+def _chat_stream_response(prompt, stream_format):
+    """Forward the reply as it is generated, as server-sent events or NDJSON lines."""
+    if stream_format == 'sse':
+        frames = (("" if event == "delta" else f"event: {event}\n") + f"data: {json.dumps(payload)}\n\n"
+                  for event, payload in _chat_events(prompt))
+        mimetype = 'text/event-stream'
+    else:
+        frames = (json.dumps({"event": event, **payload}) + "\n" for event, payload in _chat_events(prompt))
+        mimetype = 'application/x-ndjson'
+    response = Response(stream_with_context(frames), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/chat', methods=['POST'])
 def chat():
+    """Mentor reply as JSON, or streamed with ?stream=sse / Accept: text/event-stream
+    (server-sent events) or ?stream=1 / Accept: application/x-ndjson (NDJSON).
+
+    A stream has one "delta" event ({"delta": text}) per chunk of the reply,
+    then a "done" event with the full response and its source, or an "error"
+    event.
+    """
     data = request.json
     message = data.get('message', '')
-    history = data.get('history', []) # Optional: specialized context
+    history = data.get('history', [])
     
     if not message:
         return jsonify({"error": "No message provided"}), 400
 
-    if not client:
-        return jsonify({
-            "response": "I see you're interested in career growth! 🚀 \n\n(Note: I am currently in Offline Demo Mode because my AI connection is unavailable. Please verify your Google API Key to unlock my full potential. In the meantime, try uploading a resume or checking the Dashboard!)",
-            "source": "System (Offline)"
-        })
+    prompt = chat_prompt(message, history)
+    stream_format = _chat_stream_format()
+    if stream_format:
+        return _chat_stream_response(prompt, stream_format)
+
+    if not GEMINI_ENABLED:
+        return jsonify(OFFLINE_CHAT_REPLY)
 
     try:
-        # Construct a persona-based prompt
-        system_instruction = """You are "Propel", an advanced AI Career Mentor and Skill Evolution Guide. 
-        Your goal is to help users navigate their career path, suggest skills, and provide actionable advice.
-        Tone: Professional, encouraging, futuristic, and concise.
-        Do not answer questions unrelated to technology, career, skills, or professional development.
-        If asked about the platform, explain that this is the "Predictive Skill Evolution Platform".
-        """
-        
-        prompt = f"{system_instruction}\n\nUser: {message}\nAI:"
-        
-        response = client.models.generate_content(
-            model=model_name,
-            contents=prompt
-        )
-        
         return jsonify({
-            "response": response.text,
+            "response": generate_text(prompt),
             "source": "Gemini"
         })
         
+    except (CircuitOpenError, TimeoutError) as e:
+        print(f"Chat Error: {e}")
+        return jsonify(OFFLINE_CHAT_REPLY)
     except Exception as e:
         print(f"Chat Error: {e}")
         return jsonify({"error": "I lost my train of thought. Please try again."}), 500
 
 if __name__ == '__main__':
+    # Development server. In production run: gunicorn -c gunicorn.conf.py server:app
+    warmup()
     app.run(host='0.0.0.0', port=5001)
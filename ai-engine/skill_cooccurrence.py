@@ -0,0 +1,164 @@
+"""Skill co-occurrence index, written by main.py and served by /semantic-skills.
+
+The batch job passes every posting's skill set through collect_skill_sets(),
+which keeps running co-occurrence counts C = X^T X of the posting x skill
+incidence matrix X: postings are buffered CHUNK_POSTINGS at a time and each
+chunk's sparse product is added to a skill x skill total (scipy.sparse), so
+memory is bounded by the vocabulary rather than the corpus. The diagonal of
+C holds every skill's posting count. build_cooccurrence_index() scores every
+pair of skills by normalized pointwise mutual information,
+
+    npmi(a, b) = log(p(a, b) / (p(a) p(b))) / -log(p(a, b)),
+
+which lies in [-1, 1] and, unlike raw PMI or lift, does not favour pairs of
+rare skills. Pairs that share fewer than MIN_PAIR_COUNT postings, or occur
+together no more often than chance (npmi <= 0), are dropped.
+Each skill keeps its NEIGHBORS best-scoring neighbours, stored as row
+numbers, in a NumPy structured array sorted by skill and saved as .npy; the
+service memory-maps it like the trend index.
+"""
+import os
+from array import array
+
+import numpy as np
+
+COOCCURRENCE_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'trends',
+                                       'cooccurrence_index.npy')
+NEIGHBORS = 10
+MIN_PAIR_COUNT = 3
+SKILL_WIDTH = 64
+CHUNK_POSTINGS = 10_000
+
+
+def index_dtype(neighbors=NEIGHBORS):
+    return np.dtype([
+        ('skill', f'U{SKILL_WIDTH}'),
+        ('postings', 'u4'),
+        ('neighbors', 'i4', (neighbors,)),
+        ('npmi', 'f4', (neighbors,)),
+        ('shared', 'u4', (neighbors,)),
+    ])
+
+
+# --- Collecting skill sets ---
+def create_cooccurrence(chunk_postings=CHUNK_POSTINGS):
+    """Running skill x skill counts plus the CSR chunk of X not yet added to them."""
+    return {'ids': {}, 'postings': 0, 'pairs': None, 'chunk_postings': chunk_postings,
+            'indices': array('i'), 'indptr': array('q', [0])}
+
+
+def add_posting(cooccurrence, skills):
+    ids = cooccurrence['ids']
+    cooccurrence['indices'].extend(ids.setdefault(skill, len(ids)) for skill in set(skills))
+    cooccurrence['indptr'].append(len(cooccurrence['indices']))
+    if len(cooccurrence['indptr']) > cooccurrence['chunk_postings']:
+        flush_postings(cooccurrence)
+
+
+def flush_postings(cooccurrence):
+    """Add the buffered chunk's X^T X to the running counts and empty the buffer."""
+    from scipy import sparse
+
+    chunk = len(cooccurrence['indptr']) - 1
+    if not chunk:
+        return
+    n_skills = len(cooccurrence['ids'])
+    indices = np.frombuffer(cooccurrence['indices'], dtype=np.int32)
+    indptr = np.frombuffer(cooccurrence['indptr'], dtype=np.int64)
+    x = sparse.csr_matrix((np.ones(len(indices), dtype=np.float64), indices, indptr), shape=(chunk, n_skills))
+    product = (x.T @ x).tocsr()
+    pairs = cooccurrence['pairs']
+    if pairs is not None:
+        # Skills first seen in this chunk extend the vocabulary.
+        pairs.resize((n_skills, n_skills))
+        product = pairs + product
+    cooccurrence['pairs'] = product
+    cooccurrence['postings'] += chunk
+    cooccurrence['indices'], cooccurrence['indptr'] = array('i'), array('q', [0])
+
+
+def collect_skill_sets(skill_records, cooccurrence):
+    """Pass (year, skills) pairs through, adding each posting's skills to `cooccurrence`."""
+    for year, skills in skill_records:
+        add_posting(cooccurrence, skills)
+        yield year, skills
+
+
+# --- Building the index ---
+def build_cooccurrence_index(cooccurrence, neighbors=NEIGHBORS, min_pair_count=MIN_PAIR_COUNT):
+    """Index rows for every skill with at least one related skill."""
+    flush_postings(cooccurrence)
+    skills = np.array(sorted(cooccurrence['ids'], key=cooccurrence['ids'].get), dtype=object)
+    postings = cooccurrence['postings']
+    if not len(skills) or not postings:
+        return np.zeros(0, dtype=index_dtype(neighbors))
+
+    counts = cooccurrence['pairs'].diagonal()
+    pairs = cooccurrence['pairs'].tocoo()
+    keep = (pairs.row != pairs.col) & (pairs.data >= min_pair_count)
+    rows, cols, shared = pairs.row[keep], pairs.col[keep], pairs.data[keep]
+
+    p_pair = shared / postings
+    pmi = np.log(p_pair / ((counts[rows] / postings) * (counts[cols] / postings)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        npmi = np.where(p_pair < 1, pmi / -np.log(p_pair), 1.0)
+    related = npmi > 0
+    rows, cols, shared, npmi = rows[related], cols[related], shared[related], npmi[related]
+
+    # Best neighbours first within each skill: sort by skill, then score descending, then shared count.
+    order = np.lexsort((-shared, -npmi, rows))
+    rows, cols, shared, npmi = rows[order], cols[order], shared[order], npmi[order]
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.zeros(0, dtype=int)
+    ends = np.r_[starts[1:], len(rows)]
+
+    # Every neighbour shares a qualifying pair with its skill, so it has a row of its own.
+    indexed = rows[starts]
+    names = np.array([str(skill)[:SKILL_WIDTH] for skill in skills[indexed]])
+    position = np.full(len(skills), -1, dtype=np.int32)
+    position[indexed[np.argsort(names, kind='stable')]] = np.arange(len(indexed))
+
+    index = np.zeros(len(indexed), dtype=index_dtype(neighbors))
+    index['neighbors'] = -1
+    for skill_id, name, start, end in zip(indexed, names, starts, ends):
+        row = index[position[skill_id]]
+        end = min(end, start + neighbors)
+        row['skill'] = name
+        row['postings'] = counts[skill_id]
+        row['neighbors'][:end - start] = position[cols[start:end]]
+        row['npmi'][:end - start] = npmi[start:end]
+        row['shared'][:end - start] = shared[start:end]
+    return index
+
+
+def save_cooccurrence_index(index, path=COOCCURRENCE_INDEX_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, index, allow_pickle=False)
+    os.replace(tmp_path, path)
+
+
+# --- Serving ---
+def load_cooccurrence_index(path=COOCCURRENCE_INDEX_PATH):
+    """Memory-map the index and build its skill -> row lookup; None if there is no index yet."""
+    try:
+        rows = np.load(path, mmap_mode='r', allow_pickle=False)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ No co-occurrence index at {path} ({e}). /semantic-skills will use the LLM.")
+        return None
+    skills = rows['skill'].tolist()
+    return {'rows': rows, 'skills': skills, 'lookup': {skill: i for i, skill in enumerate(skills)}}
+
+
+def related_skills(index, skill, limit=5):
+    """[(neighbour, npmi, shared postings)] for a canonical skill key, best first; None if not indexed."""
+    position = index['lookup'].get(skill) if index else None
+    if position is None:
+        return None
+    row = index['rows'][position]
+    related = []
+    for neighbor, score, shared in zip(row['neighbors'].tolist(), row['npmi'].tolist(), row['shared'].tolist()):
+        if neighbor < 0 or len(related) >= limit:
+            break
+        related.append((index['skills'][neighbor], round(score, 4), shared))
+    return related
@@ -0,0 +1,254 @@
+"""Vocabulary-index skill extractor for the batch pipeline.
+
+A lighter replacement for running spaCy's tokenizer plus a PhraseMatcher
+over every posting. Skill surface forms (names and synonyms) are compiled
+into a token-hash index (first token -> candidate token sequences ->
+canonical skill). Each posting is split on spaces and every distinct chunk
+is tokenized once, following spaCy's English prefix, suffix and infix
+rules, and cached with the skills it contains; after warm-up a posting
+costs one split plus a few C-level set operations, independent of the
+vocabulary size.
+"""
+import re
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+# spaCy has special cases for single-letter abbreviations ("r." is one token).
+_SPECIAL_RE = re.compile(r"^[a-zäöü]\.$")
+_FRAGMENT_RE = re.compile(r"[^\W_]+")
+
+_rules = None
+
+
+def _affix_rules():
+    """spaCy's English prefix, suffix and infix searches and URL match, built on first use.
+
+    They come from spaCy itself so that its Unicode letter classes and its
+    symbol class (®, ™, °, ...) apply here exactly as in the tokenizer. The
+    import is deferred: loading a compiled taxonomy does not need spaCy.
+    """
+    global _rules
+    if _rules is None:
+        from spacy.lang.en.punctuation import TOKENIZER_INFIXES
+        from spacy.lang.punctuation import TOKENIZER_PREFIXES, TOKENIZER_SUFFIXES
+        from spacy.lang.tokenizer_exceptions import URL_MATCH
+        from spacy.util import compile_infix_regex, compile_prefix_regex, compile_suffix_regex
+
+        _rules = (compile_prefix_regex(TOKENIZER_PREFIXES).search, compile_suffix_regex(TOKENIZER_SUFFIXES).search,
+                  compile_infix_regex(TOKENIZER_INFIXES).finditer, URL_MATCH)
+    return _rules
+
+
+def tokenize_chunk(chunk):
+    """Split one whitespace-free chunk into tokens using spaCy-style affix rules."""
+    if chunk.isalnum():
+        return [chunk]
+
+    prefix_search, suffix_search, infix_finditer, url_match = _affix_rules()
+    prefixes, suffixes = [], []
+    while chunk and not _SPECIAL_RE.match(chunk):
+        match = prefix_search(chunk)
+        if match and match.end() < len(chunk):
+            prefixes.append(chunk[:match.end()])
+            chunk = chunk[match.end():]
+            continue
+        match = suffix_search(chunk)
+        if match and match.start() > 0:
+            suffixes.append(chunk[match.start():])
+            chunk = chunk[:match.start()]
+            continue
+        break
+
+    tokens = prefixes
+    if chunk and (_SPECIAL_RE.match(chunk) or url_match(chunk)):
+        tokens.append(chunk)
+    elif chunk:
+        start = 0
+        for match in infix_finditer(chunk):
+            if match.start() == 0:
+                continue
+            if match.start() != start:
+                tokens.append(chunk[start:match.start()])
+            tokens.append(match.group())
+            start = match.end()
+        if start < len(chunk):
+            tokens.append(chunk[start:])
+    tokens.extend(reversed(suffixes))
+    return _merge_specials(tokens) if '.' in tokens else tokens
+
+
+def _merge_specials(tokens):
+    """Rejoin abbreviations split out of a longer chunk, as spaCy does ("java/r." -> "java", "/", "r.")."""
+    merged = []
+    for token in tokens:
+        if token == '.' and merged and _SPECIAL_RE.match(merged[-1] + token):
+            merged[-1] += token
+        else:
+            merged.append(token)
+    return merged
+
+
+def _chunk_tokens(chunk):
+    """Tokens of one space-delimited chunk; an empty chunk is the extra-space token spaCy emits."""
+    return tokenize_chunk(chunk) if chunk else [' ']
+
+
+def compile_phrases(terms):
+    """Tokenize (surface form, canonical skill) pairs into {first token: [(tokens, skill), ...]}.
+
+    Candidates under each first token are ordered longest first. This is the
+    expensive part of building an index, so the taxonomy stores its result.
+    """
+    phrases = {}
+    for surface, skill in terms:
+        tokens = tuple(token for chunk in surface.lower().split() for token in tokenize_chunk(chunk))
+        if tokens:
+            phrases.setdefault(tokens[0], set()).add((tokens, skill))
+    return {first: sorted(found, key=lambda item: (-len(item[0]), item[1])) for first, found in phrases.items()}
+
+
+def build_skill_index(phrases, cache_size=1_000_000):
+    """Wrap compiled phrases with a per-chunk result cache.
+
+    `heads` holds first tokens of multi-token phrases. The cache remembers, for
+    every distinct whitespace chunk seen so far, which skills lie entirely inside
+    it (`hits`) and, when a phrase may continue into the next chunk, which first
+    tokens of that next chunk would continue it (`open`).
+    It is cleared once it holds `cache_size` chunks, which bounds memory.
+    """
+    return {
+        'phrases': phrases,
+        'heads': frozenset(first for first, found in phrases.items() if len(found[0][0]) > 1),
+        'max_len': max((len(tokens) for found in phrases.values() for tokens, _ in found), default=0),
+        'cache_size': cache_size,
+        'seen': set(),
+        'hits': {},
+        'open': {},
+    }
+
+
+def _find_phrases(tokens, phrases, stop=None):
+    """Canonical skills of the phrases that begin at tokens[:stop] and fit within `tokens`."""
+    found = set()
+    for i in range(len(tokens) if stop is None else stop):
+        for phrase, skill in phrases.get(tokens[i], ()):
+            if tuple(tokens[i:i + len(phrase)]) == phrase:
+                found.add(skill)
+    return found
+
+
+def _continuations(tokens, phrases):
+    """Tokens that, starting the next chunk, would extend a phrase begun in `tokens`."""
+    needed = set()
+    for i, token in enumerate(tokens):
+        tail = tuple(tokens[i:])
+        for phrase, _ in phrases.get(token, ()):
+            if len(phrase) > len(tail) and phrase[:len(tail)] == tail:
+                needed.add(phrase[len(tail)])
+    return needed
+
+
+def _classify_chunks(chunks, index):
+    """Add the posting's unseen chunks to the cache.
+
+    When they do not fit, the cache is cleared first and every chunk of the
+    posting is classified again, so the hits of its already-cached chunks are
+    not lost with the rest.
+    """
+    phrases, heads = index['phrases'], index['heads']
+    chunks = set(chunks)
+    unseen = chunks.difference(index['seen'])
+    if len(index['seen']) + len(unseen) > index['cache_size']:
+        index['seen'].clear()
+        index['hits'].clear()
+        index['open'].clear()
+        unseen = chunks
+    for chunk in unseen:
+        tokens = _chunk_tokens(chunk)
+        found = _find_phrases(tokens, phrases)
+        if found:
+            index['hits'][chunk] = found
+        if not heads.isdisjoint(tokens):
+            needed = _continuations(tokens, phrases)
+            if needed:
+                index['open'][chunk] = frozenset(needed)
+    index['seen'].update(unseen)
+
+
+def match_skills(text, index):
+    """Return the set of canonical skills whose surface forms occur in `text`."""
+    chunks = text.lower().split(' ')
+    if not index['seen'].issuperset(chunks):
+        _classify_chunks(chunks, index)
+
+    hits = index['hits']
+    found = set()
+    for chunk in hits.keys() & chunks:
+        found |= hits[chunk]
+
+    # Phrases that may run across chunk boundaries are checked where they occur,
+    # and only when the next chunk starts with a token that could continue them.
+    open_chunks = index['open']
+    if open_chunks.keys().isdisjoint(chunks):
+        return found
+    last = len(chunks) - 1
+    for chunk in open_chunks.keys() & chunks:
+        needed = open_chunks[chunk]
+        position = -1
+        while True:
+            try:
+                position = chunks.index(chunk, position + 1)
+            except ValueError:
+                break
+            if position == last:
+                break
+            following = chunks[position + 1]
+            if (following if following.isalnum() else _chunk_tokens(following)[0]) not in needed:
+                continue
+            tokens = _chunk_tokens(chunk)
+            head_count = len(tokens)
+            following = position + 1
+            while len(tokens) < head_count + index['max_len'] and following < len(chunks):
+                tokens.extend(_chunk_tokens(chunks[following]))
+                following += 1
+            found |= _find_phrases(tokens, index['phrases'], stop=head_count)
+    return found
+
+
+_worker_index = None
+
+
+def _init_worker(index):
+    global _worker_index
+    _worker_index = index
+
+
+def _match_batch(batch):
+    return [(context, match_skills(text, _worker_index)) for text, context in batch]
+
+
+def iter_matches(records, index, n_process=1, chunksize=2048):
+    """Yield (context, skills) for each (text, context) record, optionally across processes.
+
+    Workers receive the compiled index once at start-up instead of a full NLP model.
+    Records are pulled on the calling thread, in batches of `chunksize` with at most
+    two per worker in flight, so whatever produces them (loading, cleaning, dedup)
+    keeps running, and being timed, where the caller expects it.
+    """
+    if n_process <= 1:
+        for text, context in records:
+            yield context, match_skills(text, index)
+        return
+
+    records = iter(records)
+    with Pool(n_process, initializer=_init_worker, initargs=(index,)) as pool:
+        pending = deque()
+        while True:
+            batch = list(islice(records, chunksize))
+            if batch:
+                pending.append(pool.apply_async(_match_batch, (batch,)))
+            while pending and (not batch or len(pending) > 2 * n_process):
+                yield from pending.popleft().get()
+            if not batch:
+                return
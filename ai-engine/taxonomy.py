@@ -0,0 +1,150 @@
+"""Shared skill taxonomy: canonical skills, synonyms and categories.
+
+data/taxonomy/skills.json is the single source of truth for both the batch
+pipeline (main.py) and the Flask service (server.py). It is compiled once
+into a pickle next to the source holding the alias table and pre-tokenized
+extractor phrases, so building a matcher does not re-tokenize tens of
+thousands of terms. The compiled file records a hash of the source and is
+rebuilt whenever that no longer matches, whatever the file times say.
+
+current_taxonomy() re-checks the source at most every
+TAXONOMY_RELOAD_INTERVAL seconds, so long-running workers pick up edits
+without a restart.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+
+from skill_extractor import compile_phrases
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'taxonomy', 'skills.json')
+COMPILED_SUFFIX = '.compiled.pickle'
+# Bump when the compiled layout or compile_phrases() tokenization changes; older artifacts are rebuilt.
+FORMAT_VERSION = 2
+RELOAD_INTERVAL = float(os.getenv("TAXONOMY_RELOAD_INTERVAL", "5"))
+
+
+def _normalize(term):
+    return ' '.join(term.lower().split())
+
+
+def _source_version(raw):
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+def compile_taxonomy(source_path=TAXONOMY_PATH):
+    """Compile the JSON source and write the compiled artifact next to it.
+
+    Each entry has a display `name`, a `category` and optional `synonyms`.
+    The canonical key is the lowercase name; entries marked `aliases_only`
+    (e.g. "Go") are matched through their synonyms only, because the bare
+    name is too ambiguous in running text.
+    """
+    with open(source_path, 'rb') as f:
+        raw = f.read()
+    spec = json.loads(raw)
+
+    skills, aliases = {}, {}
+    for entry in spec['skills']:
+        key = _normalize(entry['name'])
+        skills[key] = {'name': entry['name'], 'category': entry.get('category', 'other')}
+        surfaces = [] if entry.get('aliases_only') else [key]
+        surfaces += [_normalize(synonym) for synonym in entry.get('synonyms', [])]
+        for surface in surfaces:
+            if aliases.setdefault(surface, key) != key:
+                print(f"⚠️ Taxonomy alias '{surface}' already maps to '{aliases[surface]}', ignoring it for '{key}'.")
+
+    taxonomy = {
+        'format': FORMAT_VERSION,
+        'version': _source_version(raw),
+        'skills': skills,
+        'aliases': aliases,
+        'phrases': compile_phrases(aliases.items()),
+    }
+
+    compiled_path = source_path + COMPILED_SUFFIX
+    # Workers and the service may compile at the same time; each writes its own file.
+    tmp_path = f"{compiled_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(taxonomy, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, compiled_path)
+    except OSError as e:
+        print(f"⚠️ Could not write compiled taxonomy {compiled_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return taxonomy
+
+
+def load_taxonomy(source_path=TAXONOMY_PATH):
+    """Load the compiled taxonomy, recompiling it if it is missing or was built from other source bytes.
+
+    The source is hashed rather than compared by mtime: a checkout, copy or
+    restore can leave the compiled file newer than a source it does not match.
+    """
+    compiled_path = source_path + COMPILED_SUFFIX
+    try:
+        with open(source_path, 'rb') as f:
+            version = _source_version(f.read())
+        with open(compiled_path, 'rb') as f:
+            taxonomy = pickle.load(f)
+        if taxonomy.get('format') == FORMAT_VERSION and taxonomy.get('version') == version:
+            return taxonomy
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+        pass
+    return compile_taxonomy(source_path)
+
+
+_lock = threading.Lock()
+_state = {'path': None, 'taxonomy': None, 'mtime': None, 'checked_at': 0.0}
+
+
+def current_taxonomy(source_path=TAXONOMY_PATH):
+    """Return the loaded taxonomy, reloading it if the source file changed."""
+    now = time.monotonic()
+    if (_state['taxonomy'] is not None and _state['path'] == source_path
+            and now - _state['checked_at'] < RELOAD_INTERVAL):
+        return _state['taxonomy']
+
+    with _lock:
+        mtime = os.stat(source_path).st_mtime_ns
+        if _state['taxonomy'] is None or _state['path'] != source_path or mtime != _state['mtime']:
+            reloading = _state['taxonomy'] is not None
+            _state['taxonomy'] = load_taxonomy(source_path)
+            _state['path'] = source_path
+            _state['mtime'] = mtime
+            if reloading:
+                print(f"🔄 Reloaded skill taxonomy (version {_state['taxonomy']['version']}).")
+        _state['checked_at'] = now
+        return _state['taxonomy']
+
+
+def surface_terms(taxonomy, exclude_categories=()):
+    """(surface form, canonical skill) pairs, optionally without some categories."""
+    skills = taxonomy['skills']
+    return [(surface, key) for surface, key in taxonomy['aliases'].items()
+            if skills[key]['category'] not in exclude_categories]
+
+
+def extractor_phrases(taxonomy, exclude_categories=()):
+    """The compiled extractor phrases, optionally without some categories."""
+    if not exclude_categories:
+        return taxonomy['phrases']
+    skills = taxonomy['skills']
+    phrases = {}
+    for first, found in taxonomy['phrases'].items():
+        kept = [(tokens, key) for tokens, key in found if skills[key]['category'] not in exclude_categories]
+        if kept:
+            phrases[first] = kept
+    return phrases
+
+
+if __name__ == '__main__':
+    compiled = compile_taxonomy()
+    print(f"✅ Compiled {len(compiled['skills'])} skills / {len(compiled['aliases'])} aliases "
+          f"(version {compiled['version']}).")
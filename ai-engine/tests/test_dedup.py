@@ -0,0 +1,49 @@
+import random
+
+import pandas as pd
+import pytest
+
+import main as pipeline
+from dedup import create_dedup
+
+LANGUAGES = ['Python', 'JavaScript', 'SQL', 'Java', 'C#', 'Go']
+
+
+@pytest.fixture
+def historical(tmp_path):
+    rng = random.Random(0)
+    # Survey rows: thousands of respondents, a handful of distinct answers.
+    pd.DataFrame({
+        'LanguageWorkedWith': [';'.join(rng.sample(LANGUAGES, 2)) for _ in range(2000)],
+        'DatabaseWorkedWith': [rng.choice(['MySQL', 'MongoDB']) for _ in range(2000)],
+    }).to_csv(tmp_path / 'survey_2021.csv', index=False)
+    pd.DataFrame({
+        'job_skills': [', '.join(rng.sample(LANGUAGES, 3)) for _ in range(1000)],
+    }).to_csv(tmp_path / 'skills_2022.csv', index=False)
+    base = [' '.join(rng.choices(['build', 'ship', 'python', 'sql', 'docker', 'team', 'data'], k=80))
+            for _ in range(300)]
+    postings = base + base[:100] + [text + ' apply now' for text in base[100:200]]
+    pd.DataFrame({'Job Description': postings}).to_csv(tmp_path / 'jobs_2023.csv', index=False)
+    return tmp_path
+
+
+@pytest.mark.parametrize('mode, kept_postings', [('exact', 400), ('minhash', 300)])
+def test_only_free_text_postings_are_deduplicated(historical, mode, kept_postings):
+    records = list(pipeline.iter_historical_records(str(historical), dedup=create_dedup(mode)))
+    years = pd.Series([year for _, year in records]).value_counts()
+    assert years[2021] == 2000
+    assert years[2022] == 1000
+    # 300 distinct postings, 100 exact copies and 100 near copies.
+    assert years[2023] == kept_postings
+
+
+@pytest.mark.parametrize('mode', ['exact', 'minhash'])
+def test_in_memory_mode_drops_the_same_rows_as_streaming(historical, mode):
+    dedup = create_dedup(mode)
+    df = pipeline.load_historical_frames(str(historical))
+    df = df.dropna(subset=['Job Description'])
+    df['Job Description'] = pipeline.clean_descriptions(df['Job Description'])
+    kept = pipeline.drop_duplicate_rows(df, str(historical), dedup)
+
+    streamed = [text for text, _ in pipeline.iter_historical_records(str(historical), dedup=dedup)]
+    assert kept['Job Description'].tolist() == streamed
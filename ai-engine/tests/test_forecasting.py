@@ -0,0 +1,69 @@
+"""Forecast fast path vs statsmodels' Holt-Winters, and per-series errors in /forecast/batch."""
+import os
+import warnings
+
+import numpy as np
+import pytest
+
+os.environ['GEMINI_API_KEY'] = ''
+
+import forecasting
+from forecasting import FAST_PATH_MAX_POINTS, forecast_many
+
+YEARS = 5
+
+
+def holt_winters(values, years):
+    from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = ExponentialSmoothing(np.asarray(values), trend='add', seasonal=None, damped_trend=True)
+        return model.fit().forecast(years)
+
+
+def test_fast_path_tracks_holt_winters_on_two_points():
+    assert FAST_PATH_MAX_POINTS == 2
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        values = np.round(rng.uniform(0, 300, 2), 1).tolist()
+        fast = np.array(forecast_many([(values, YEARS)])[0])
+        expected = holt_winters(values, YEARS)
+        assert abs(fast[0] - expected[0]) <= 0.1 * abs(values[1] - values[0]) + 1e-6, values
+        # Holt-Winters picks its own damping here; the gap grows by at most a quarter step per year.
+        step = abs(values[1] - values[0]) * np.arange(1, YEARS + 1)
+        assert np.all(np.abs(fast - expected) <= 0.25 * step + 1e-6), values
+
+
+@pytest.mark.parametrize('values', [[100, 120, 150, 200, 260], [5, 50, 20, 80, 60], [10, 40, 20]])
+def test_longer_series_use_holt_winters(values):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        forecast = forecast_many([([float(v) for v in values], 3)])[0]
+    assert np.allclose(forecast, holt_winters(values, 3))
+
+
+def test_batch_reports_a_failing_series_on_its_own(monkeypatch):
+    import server
+
+    fit = forecasting._holt_winters
+
+    def failing_on_zeros(values, years):
+        if not any(values):
+            raise np.linalg.LinAlgError("SVD did not converge")
+        return fit(values, years)
+
+    monkeypatch.setattr(forecasting, '_holt_winters', failing_on_zeros)
+    body = {'series': [{'skill': 'python', 'history': [1, 2, 4, 7]},
+                       {'skill': 'broken', 'history': [0, 0, 0, 0]},
+                       {'skill': 'short', 'history': [5]},
+                       {'skill': 'sql', 'history': [3, 6]}]}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        response = server.app.test_client().post('/forecast/batch', json=body)
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result.get('skill') for result in results] == ['python', None, None, 'sql']
+    assert results[1] == {'error': "SVD did not converge"}
+    assert 'error' in results[2]
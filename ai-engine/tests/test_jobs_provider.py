@@ -0,0 +1,82 @@
+"""Upstream failures and timeouts of the job search fall back to the stale listing."""
+import threading
+import time
+
+import pytest
+
+import jobs_provider
+from jobs_provider import JobSearchError, create_job_search, search_jobs
+from result_cache import cache_key, cache_lookup, create_cache
+
+LISTING = {"jobs_results": [{"title": "Data Engineer", "company_name": "Acme"}]}
+
+
+def job_search(search, timeout=1.0):
+    service = create_job_search('fixture', timeout=timeout)
+    service['search'] = search
+    # ttl=0: every lookup after the first goes upstream again, with the listing kept as a stale copy.
+    service['cache'] = create_cache('jobs', ttl=0, max_stale=3600)
+    return service
+
+
+def test_error_payload_serves_the_stale_listing():
+    answers = [LISTING, {"error": "Your account has run out of searches."}]
+    service = job_search(lambda skill, location: answers.pop(0))
+    jobs, stale = search_jobs(service, 'python', 'Paris')
+    assert not stale and jobs[0]['title'] == 'Data Engineer'
+
+    assert search_jobs(service, 'python', 'Paris') == (jobs, True)
+    assert service['stats']['errors'] == 1
+    # The listing was not overwritten by an empty one.
+    assert cache_lookup(service['cache'], cache_key('fixture', 'python', 'paris')) == (jobs, False)
+
+
+def test_error_payload_without_a_stale_copy_raises():
+    service = job_search(lambda skill, location: {"error": "Invalid API key."})
+    with pytest.raises(JobSearchError):
+        search_jobs(service, 'python', 'Paris')
+
+
+def test_no_results_is_an_empty_listing():
+    service = job_search(lambda skill, location: {"error": "Google hasn't returned any results for this query."})
+    assert search_jobs(service, 'cobol', 'Nowhere') == ([], False)
+
+
+def test_waiting_on_a_hung_search_times_out():
+    release = threading.Event()
+
+    def hung(skill, location):
+        release.wait(10)
+        return LISTING
+
+    service = job_search(hung, timeout=0.2)
+    owner = threading.Thread(target=search_jobs, args=(service, 'python', 'Paris'))
+    owner.start()
+    while not service['inflight']:
+        time.sleep(0.01)
+    started = time.monotonic()
+    try:
+        with pytest.raises(TimeoutError):
+            search_jobs(service, 'python', 'Paris')
+        assert time.monotonic() - started < 2
+        assert service['stats']['timeouts'] == 1
+    finally:
+        release.set()
+        owner.join()
+
+
+def test_serpapi_requests_carry_the_timeout(monkeypatch):
+    serpapi = pytest.importorskip('serpapi')
+    created = []
+
+    class FakeSearch:
+        def __init__(self, params):
+            self.timeout = 60000
+            created.append(self)
+
+        def get_dict(self):
+            return LISTING
+
+    monkeypatch.setattr(serpapi, 'GoogleSearch', FakeSearch)
+    assert jobs_provider.serpapi_search('python', 'Paris') == LISTING
+    assert created[0].timeout == jobs_provider.TIMEOUT
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from llm_gateway import CircuitOpenError, create_gateway, gateway_stats, generate, generate_stream
+
+
+def failing_client(error=ConnectionRefusedError("connection refused")):
+    """A client whose upstream call fails at once, like a refused connection or a bad key."""
+    async def generate_content(model, contents):
+        raise error
+
+    return SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+
+
+def call_with_deadline(gateway, prompt, seconds=5):
+    """generate() on another thread; fails the test instead of hanging if that thread deadlocks."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = generate(gateway, prompt)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "generate() deadlocked"
+    return outcome
+
+
+def test_fast_failing_upstream_opens_circuit_without_deadlock():
+    gateway = create_gateway(failing_client(), 'fake-model', breaker_failures=3, breaker_cooldown=60)
+    for i in range(50):
+        outcome = call_with_deadline(gateway, f"prompt {i}")
+        assert isinstance(outcome['error'], (ConnectionRefusedError, CircuitOpenError))
+
+    assert isinstance(call_with_deadline(gateway, "after")['error'], CircuitOpenError)
+    stats = gateway_stats(gateway)
+    assert stats['circuit'] == 'open'
+    assert stats['failures'] == 3
+    assert stats['inflight'] == 0
+
+
+def test_lock_is_free_after_failures():
+    gateway = create_gateway(failing_client(ValueError("400 bad request")), 'fake-model', breaker_failures=100)
+    for i in range(20):
+        assert isinstance(call_with_deadline(gateway, f"prompt {i}")['error'], ValueError)
+    assert gateway['lock'].acquire(timeout=1)
+    gateway['lock'].release()
+
+
+def streaming_client(stall_after=1):
+    """A client that replies "ok" and whose streams send `stall_after` chunks, then hang."""
+    async def generate_content(model, contents):
+        return SimpleNamespace(text="ok")
+
+    async def chunks():
+        for i in range(stall_after):
+            yield SimpleNamespace(text=f"chunk {i}")
+        await asyncio.sleep(3600)
+
+    async def generate_content_stream(model, contents):
+        return chunks()
+
+    models = SimpleNamespace(generate_content=generate_content, generate_content_stream=generate_content_stream)
+    return SimpleNamespace(aio=SimpleNamespace(models=models))
+
+
+def half_open_gateway(cooldown=0.2):
+    """A gateway whose circuit opened long enough ago that the next call is the half-open trial."""
+    gateway = create_gateway(streaming_client(), 'fake-model', timeout=0.2, breaker_cooldown=cooldown)
+    gateway['breaker'].update(state='open', failures=5, opened_at=time.monotonic() - cooldown)
+    return gateway
+
+
+def test_stalled_trial_stream_reopens_the_circuit():
+    gateway = half_open_gateway()
+    with pytest.raises(TimeoutError):
+        list(generate_stream(gateway, "trial"))
+    assert gateway_stats(gateway)['circuit'] == 'open'
+
+    time.sleep(0.25)
+    assert call_with_deadline(gateway, "after cooldown") == {'result': "ok"}
+    assert gateway_stats(gateway)['circuit'] == 'closed'
+
+
+def test_abandoned_trial_stream_reopens_the_circuit():
+    gateway = half_open_gateway()
+    stream = generate_stream(gateway, "trial")
+    assert next(stream) == "chunk 0"
+    stream.close()  # the client disconnected
+    assert gateway_stats(gateway)['circuit'] == 'open'
+    with pytest.raises(CircuitOpenError):
+        generate(gateway, "during cooldown")
+
+    time.sleep(0.25)
+    assert call_with_deadline(gateway, "after cooldown") == {'result': "ok"}
+
+
+def slow_client(seconds=0.5):
+    """A client whose calls take `seconds`; `calls` records which reached it and which were cancelled."""
+    calls = {'started': 0, 'finished': 0, 'cancelled': 0}
+
+    async def generate_content(model, contents):
+        calls['started'] += 1
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            calls['cancelled'] += 1
+            raise
+        calls['finished'] += 1
+        return SimpleNamespace(text="ok")
+
+    return SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))), calls
+
+
+def test_call_is_cancelled_when_its_last_caller_times_out():
+    client, calls = slow_client()
+    gateway = create_gateway(client, 'fake-model', max_concurrency=1, timeout=5)
+    busy = threading.Thread(target=generate, args=(gateway, "first"))
+    busy.start()
+    # "queued" waits for the only slot; its callers give up before it frees.
+    with pytest.raises(TimeoutError):
+        generate(gateway, "queued", timeout=0.1)
+    busy.join()
+    time.sleep(0.1)
+    assert calls == {'started': 1, 'finished': 1, 'cancelled': 0}
+
+    with pytest.raises(TimeoutError):
+        generate(gateway, "upstream", timeout=0.1)
+    time.sleep(0.1)
+    assert calls['cancelled'] == 1
+    stats = gateway_stats(gateway)
+    assert (stats['abandoned'], stats['inflight'], stats['circuit']) == (2, 0, 'closed')
+    assert not gateway['waiters']
+
+
+def test_call_survives_while_another_caller_waits():
+    client, calls = slow_client(0.3)
+    gateway = create_gateway(client, 'fake-model', timeout=5)
+    patient = {}
+    thread = threading.Thread(target=lambda: patient.update(result=generate(gateway, "shared")))
+    thread.start()
+    while not gateway['inflight']:
+        time.sleep(0.01)
+    with pytest.raises(TimeoutError):
+        generate(gateway, "shared", timeout=0.05)
+    thread.join()
+    assert patient['result'] == "ok"
+    assert calls == {'started': 1, 'finished': 1, 'cancelled': 0}
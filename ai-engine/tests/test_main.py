@@ -0,0 +1,80 @@
+"""Batch-pipeline helpers in main.py."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+
+    def drop(self):
+        self.db.collections.pop(self.name, None)
+
+    def create_index(self, field, unique=False):
+        self.db.collections.setdefault(self.name, {})
+
+    def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            self.db.collections.setdefault(self.name, {})[op._filter['skill']] = op._doc['$set']
+
+    def rename(self, new_name, dropTarget=False):
+        self.db.collections[new_name] = self.db.collections.pop(self.name)
+
+
+class FakeDatabase:
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def __getitem__(self, name):
+        return FakeCollection(self, name)
+
+
+def test_save_per_skill_swaps_in_the_new_set():
+    db = FakeDatabase(skill_trends={'old': {}}, skill_trends_staging={'left over': {}})
+    main.save_per_skill(db, 'skill_trends', 'history', [{'skill': 'python', 'history': [1, 2]}])
+    assert set(db.collections) == {'skill_trends'}
+    assert db.collections['skill_trends']['python']['history'] == [1, 2]
+
+
+def test_empty_run_keeps_the_live_set_and_drops_staging():
+    db = FakeDatabase(skill_trends={'python': {}}, skill_trends_staging={'left over': {}})
+    main.save_per_skill(db, 'skill_trends', 'history', [])
+    assert db.collections == {'skill_trends': {'python': {}}}
+
+
+def yearly_counts(n_skills, seed=0, years=range(2010, 2025)):
+    """Random demand per skill over a random subset of `years`; some skills have one year or flat demand."""
+    rng = np.random.default_rng(seed)
+    years = list(years)
+    rows = []
+    for i in range(n_skills):
+        size = 1 if i % 7 == 0 else rng.integers(1, len(years) + 1)
+        flat = i % 5 == 0
+        for year in rng.choice(years, size=size, replace=False):
+            rows.append({'skills': f"skill-{i}", 'year': int(year),
+                         'demand_score': 3.0 if flat else float(rng.integers(0, 500))})
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize('years', [range(2010, 2025), [2020]], ids=['spread', 'one-year'])
+def test_trend_lines_match_linear_regression(years):
+    LinearRegression = pytest.importorskip('sklearn.linear_model').LinearRegression
+    counts = yearly_counts(300, years=years)
+    fit = main.fit_trend_lines(counts)
+
+    for row, skill in enumerate(fit['skills']):
+        series = counts[counts['skills'] == skill]
+        x, y = series[['year']].to_numpy(dtype=float), series['demand_score'].to_numpy()
+        model = LinearRegression().fit(x, y)
+        assert fit['fitted'][row] == (len(series) > 1)
+        if fit['fitted'][row]:
+            assert fit['slope'][row] == pytest.approx(model.coef_[0], rel=1e-9, abs=1e-9)
+            # fit_trend_lines centres the years on fit['offset'].
+            intercept = fit['intercept'][row] - fit['slope'][row] * fit['offset']
+            assert intercept == pytest.approx(model.intercept_, rel=1e-9, abs=1e-6)
+        else:
+            # One year: LinearRegression draws a flat line through it; the trend is not fitted.
+            assert model.coef_[0] == 0 and fit['mean_demand'][row] == pytest.approx(model.intercept_)
@@ -0,0 +1,54 @@
+"""Failed PDF extractions are reported, never cached, and do not poison the worker pool."""
+import io
+import os
+
+import pytest
+
+os.environ['GEMINI_API_KEY'] = ''
+
+import pdf_text
+from benchmarks.synthetic import generate_resume_pdfs
+from pdf_text import IncompleteExtractionError, extract_text
+
+
+def crash(data, page_numbers):
+    os._exit(1)  # a worker killed mid-task, e.g. by the OOM killer
+
+
+@pytest.fixture(scope='module')
+def resume():
+    return generate_resume_pdfs(1, pages=12)[0]
+
+
+def test_dead_worker_drops_the_pool(resume, monkeypatch):
+    pdf_text.reset_pool()
+    with monkeypatch.context() as patch:
+        patch.setattr(pdf_text, '_extract_pages', crash)
+        with pytest.raises(IncompleteExtractionError):
+            extract_text(resume, workers=2)
+    assert pdf_text._pool is None
+
+    assert extract_text(resume, workers=2) == extract_text(resume, workers=1)
+    pdf_text.reset_pool()
+
+
+def test_unreadable_pdf_raises():
+    with pytest.raises(IncompleteExtractionError):
+        extract_text(b"%PDF-1.4 truncated")
+
+
+def test_incomplete_extraction_is_not_cached(monkeypatch):
+    import server
+
+    def partial(data):
+        raise IncompleteExtractionError("PDF worker pool broke", "python and sql developer")
+
+    monkeypatch.setattr(server, 'extract_text', partial)
+    client = server.app.test_client()
+    for _ in range(2):
+        response = client.post('/parse-resume', data={'file': (io.BytesIO(b"%PDF-partial"), 'cv.pdf')},
+                               content_type='multipart/form-data')
+        assert response.status_code == 200
+    stats = server.cache_stats(server.resume_cache)
+    assert stats['memory_entries'] == 0
+    assert stats['misses'] >= 2
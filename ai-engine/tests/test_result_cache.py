@@ -0,0 +1,99 @@
+"""Freshness, stale window, disk tier and disk size accounting of result_cache."""
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import result_cache
+from result_cache import cache_get, cache_key, cache_lookup, cache_put, cache_stats, create_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """result_cache's time.time(), advanced by hand; disk files are aged to match with os.utime."""
+    now = {'t': time.time()}
+    monkeypatch.setattr(result_cache, 'time', SimpleNamespace(time=lambda: now['t']))
+    return now
+
+
+def age_files(directory, seconds):
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        mtime = os.stat(path).st_mtime - seconds
+        os.utime(path, (mtime, mtime))
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = create_cache('test', ttl=10)
+    cache_put(cache, 'k', {'v': 1})
+    clock['t'] += 9
+    assert cache_get(cache, 'k') == {'v': 1}
+    clock['t'] += 2
+    assert cache_get(cache, 'k') is None
+    assert cache_stats(cache)['misses'] == 1
+    assert cache_stats(cache)['memory_entries'] == 0
+
+
+def test_stale_window(clock):
+    cache = create_cache('test', ttl=10, max_stale=100)
+    cache_put(cache, 'k', 'answer')
+    clock['t'] += 50
+    assert cache_lookup(cache, 'k') == ('answer', False)
+    assert cache_get(cache, 'k') is None
+    clock['t'] += 100
+    assert cache_lookup(cache, 'k') == (None, False)
+    stats = cache_stats(cache)
+    assert (stats['stale_hits'], stats['misses']) == (2, 1)
+
+
+def test_lru_keeps_max_entries():
+    cache = create_cache('test', max_entries=2)
+    for key in 'abc':
+        cache_put(cache, key, key)
+    assert cache_get(cache, 'a') is None
+    assert [cache_get(cache, key) for key in 'bc'] == ['b', 'c']
+
+
+def test_disk_tier_is_shared_and_ages_out(tmp_path, clock):
+    writer = create_cache('test', ttl=10, disk_dir=str(tmp_path))
+    cache_put(writer, cache_key('k'), [1, 2])
+    reader = create_cache('test', ttl=10, disk_dir=str(tmp_path))
+    assert cache_get(reader, cache_key('k')) == [1, 2]
+    assert cache_stats(reader)['disk_hits'] == 1
+
+    age_files(tmp_path, 20)
+    fresh_reader = create_cache('test', ttl=10, disk_dir=str(tmp_path))
+    assert cache_get(fresh_reader, cache_key('k')) is None
+
+
+def test_disk_is_pruned_oldest_first(tmp_path):
+    cache = create_cache('test', disk_dir=str(tmp_path), max_disk_bytes=1000)
+    value = 'x' * 200
+    for i in range(10):
+        cache_put(cache, f"k{i}", value)
+        age_files(tmp_path, 1)  # every earlier file is older than the next one
+    assert cache['disk_bytes'] <= 1000
+    left = sorted(name for name in os.listdir(tmp_path))
+    assert left and 'k9.json' in left and 'k0.json' not in left
+    assert cache['disk_bytes'] == sum(os.path.getsize(tmp_path / name) for name in left)
+
+
+def test_overwriting_a_key_counts_its_bytes_once(tmp_path):
+    cache = create_cache('test', disk_dir=str(tmp_path))
+    for i in range(20):
+        cache_put(cache, 'k', 'x' * (100 + i))
+    assert cache['disk_bytes'] == os.path.getsize(tmp_path / 'k.json')
+    assert create_cache('test', disk_dir=str(tmp_path))['disk_bytes'] == cache['disk_bytes']
+
+
+def test_resume_cache_key_follows_the_current_taxonomy(monkeypatch):
+    monkeypatch.setenv('GEMINI_API_KEY', '')
+    import server
+    from taxonomy import current_taxonomy
+
+    monkeypatch.setattr(server, 'GEMINI_ENABLED', False)
+    monkeypatch.setattr(server, 'skill_pipeline', None)  # not built yet
+    assert server.resume_parser_version().endswith(f":spacy:{current_taxonomy()['version']}")
+    monkeypatch.setattr(server, 'skill_pipeline', {'version': 'before-reload'})
+    assert 'before-reload' not in server.resume_parser_version()
@@ -0,0 +1,34 @@
+"""Stage attribution when extraction runs in worker processes."""
+import time
+
+import main
+from run_report import finish_run, stage, start_run
+
+POSTINGS = 200
+LOAD_SECONDS = 0.002
+
+
+def slow_records():
+    """Records that open their stage while being pulled, as main.iter_cleaned_records() does."""
+    for i in range(POSTINGS):
+        with stage('load') as s:
+            time.sleep(LOAD_SECONDS)
+            s['rows'] += 1
+        yield 'python, sql and docker', i
+
+
+def test_records_feeding_worker_processes_are_charged_to_their_own_stage():
+    extractor = main.build_extractor('vocab', n_process=2)
+    report = start_run()
+    try:
+        results = list(main.iter_skill_records(slow_records(), extractor))
+    finally:
+        summary = finish_run(report)
+
+    assert [context for context, _ in results] == list(range(POSTINGS))
+    assert all(skills == {'python', 'sql', 'docker'} for _, skills in results)
+    stages = {entry['stage']: entry for entry in summary['stages']}
+    assert stages['load']['rows'] == POSTINGS
+    assert stages['load']['seconds'] >= POSTINGS * LOAD_SECONDS
+    assert stages['extract']['rows'] == POSTINGS
+    assert stages['extract']['seconds'] < stages['load']['seconds']
@@ -0,0 +1,43 @@
+"""Running co-occurrence counts must give the index a single X^T X would."""
+import random
+
+import numpy as np
+
+from skill_cooccurrence import add_posting, build_cooccurrence_index, create_cooccurrence, flush_postings
+
+SKILLS = [f"skill-{i}" for i in range(40)]
+
+
+def postings(n, seed=0):
+    rng = random.Random(seed)
+    # Later postings draw from a larger vocabulary, so chunks keep adding skills.
+    return [rng.sample(SKILLS[:10 + 30 * i // n], rng.randint(0, 6)) for i in range(n)]
+
+
+def build(skill_sets, chunk_postings):
+    cooccurrence = create_cooccurrence(chunk_postings)
+    for skills in skill_sets:
+        add_posting(cooccurrence, skills)
+        assert len(cooccurrence['indptr']) - 1 < chunk_postings
+    return build_cooccurrence_index(cooccurrence)
+
+
+def test_chunked_counts_match_a_single_chunk():
+    skill_sets = postings(3000)
+    expected = build(skill_sets, chunk_postings=len(skill_sets) + 1)
+    for chunk_postings in (1, 7, 500):
+        index = build(skill_sets, chunk_postings)
+        assert len(index) == len(expected)
+        for field in ('skill', 'postings', 'neighbors', 'shared'):
+            assert np.array_equal(index[field], expected[field]), field
+        assert np.allclose(index['npmi'], expected['npmi'])
+
+
+def test_posting_counts_come_from_the_diagonal():
+    cooccurrence = create_cooccurrence(chunk_postings=4)
+    for skills in [['a', 'b']] * 5 + [['a', 'c']] * 3 + [['b']] * 2:
+        add_posting(cooccurrence, skills)
+    flush_postings(cooccurrence)
+    counts = dict(zip(cooccurrence['ids'], cooccurrence['pairs'].diagonal().tolist()))
+    assert counts == {'a': 8, 'b': 7, 'c': 3}
+    assert cooccurrence['postings'] == 10
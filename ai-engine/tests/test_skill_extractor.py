@@ -0,0 +1,79 @@
+"""The vocabulary-index extractor must find exactly what build_matcher() finds."""
+import random
+
+import pandas as pd
+import pytest
+
+from main import EXCLUDED_CATEGORIES, build_extractor, clean_descriptions
+from skill_extractor import build_skill_index, match_skills
+from taxonomy import current_taxonomy, extractor_phrases, surface_terms
+
+EDGE_CASES = [
+    "Microsoft Excel® and Tableau™ required",
+    "excel®",
+    "tableau™",
+    "java®, c++® and kubernetes°",
+    "kubernetes°",
+    "sql/énergie",
+    "python/données, sql—énergie",
+    "expert en café-python et écoles:java",
+    "aws™/gcp® and ©docker",
+    "java°c and ✓react ★node.js",
+    "postgresql…mysql, ci/cd, r. and c#",
+    "façade,python straße-sql",
+    "données.SQL and café.Python",
+    "ÉNERGIE-JAVA, Über/Docker",
+    "10°c, 5€python, 3+java",
+    "«python» „sql“ ‹java›",
+    "machine learning® and data-science™",
+]
+
+SEPARATORS = ['', '', ' ', ' ', ' ', '/', '-', ',', '.', ':', '—', '…', '(', ')', '"', "'s"]
+SYMBOLS = ['®', '™', '°', '©', '✓', '•', '★', '§', '€', '+', '#', '²', '¿', '«', '»']
+WORDS = ['énergie', 'données', 'café', 'straße', 'über', 'москва', '数据', 'naïve', 'ÉCOLE', 'Ñandú',
+         'experience', 'with', 'and', '2024', 'e.g.', 'r.', 'x', 'US']
+
+
+def skill_sets(backend, texts):
+    extractor = build_extractor(backend, n_process=1)
+    return [skills for _, skills in extractor((text, None) for text in texts)]
+
+
+def assert_same_skills(texts):
+    texts = clean_descriptions(pd.Series(texts)).tolist()
+    for text, expected, found in zip(texts, skill_sets('spacy', texts), skill_sets('vocab', texts)):
+        assert found == expected, f"{text!r}: spacy-only={sorted(expected - found)} vocab-only={sorted(found - expected)}"
+
+
+def fuzz_texts(n, seed=0):
+    rng = random.Random(seed)
+    terms = [surface for surface, _ in surface_terms(current_taxonomy(), exclude_categories=EXCLUDED_CATEGORIES)]
+    texts = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(1, 8)):
+            roll = rng.random()
+            part = rng.choice(terms) if roll < 0.5 else rng.choice(WORDS) if roll < 0.8 else rng.choice(SYMBOLS)
+            if rng.random() < 0.2:
+                part = part.upper() if rng.random() < 0.5 else part.title()
+            parts.append(part + rng.choice(SEPARATORS))
+        texts.append(''.join(parts))
+    return texts
+
+
+@pytest.mark.parametrize('text', EDGE_CASES)
+def test_edge_cases_match_spacy(text):
+    assert_same_skills([text])
+
+
+def test_fuzzed_postings_match_spacy():
+    assert_same_skills(fuzz_texts(5000))
+
+
+def test_full_chunk_cache_keeps_the_postings_cached_hits():
+    index = build_skill_index(extractor_phrases(current_taxonomy(), EXCLUDED_CATEGORIES), cache_size=4)
+    assert match_skills('python', index) == {'python'}
+    # 'python' is cached; the four new chunks overflow the cache and clear it.
+    assert match_skills('python x y z aws', index) == {'python', 'aws'}
+    for text in ['aws and docker', 'python x y z aws', 'a b c d e f python', 'machine learning on aws']:
+        assert match_skills(text, index) == skill_sets('spacy', [text])[0], text
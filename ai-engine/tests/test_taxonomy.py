@@ -0,0 +1,76 @@
+"""Compiling and reloading the skill taxonomy, and rebuilding what depends on it."""
+import json
+import os
+import shutil
+import threading
+
+from taxonomy import COMPILED_SUFFIX, TAXONOMY_PATH, compile_taxonomy, load_taxonomy
+
+THREADS = 8
+
+
+def test_concurrent_compiles_all_succeed(tmp_path):
+    source = str(tmp_path / 'skills.json')
+    shutil.copy(TAXONOMY_PATH, source)
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def compile_once():
+        barrier.wait()
+        try:
+            for _ in range(5):
+                compile_taxonomy(source)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=compile_once) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(os.listdir(tmp_path)) == ['skills.json', 'skills.json' + COMPILED_SUFFIX]
+    assert load_taxonomy(source)['aliases'] == compile_taxonomy(source)['aliases']
+
+
+def test_compiled_file_newer_than_a_changed_source_is_rebuilt(tmp_path):
+    source = str(tmp_path / 'skills.json')
+    with open(source, 'w') as f:
+        json.dump({'skills': [{'name': 'Python', 'category': 'language'}]}, f)
+    compile_taxonomy(source)
+    with open(source, 'w') as f:
+        json.dump({'skills': [{'name': 'Rust', 'category': 'language'}]}, f)
+    # The source is restored with an old mtime, as a checkout or copy can leave it.
+    compiled = os.stat(source + COMPILED_SUFFIX).st_mtime_ns
+    os.utime(source, ns=(compiled - 10**9, compiled - 10**9))
+
+    assert set(load_taxonomy(source)['skills']) == {'rust'}
+
+
+def test_requests_keep_the_old_pipeline_during_a_rebuild(monkeypatch):
+    monkeypatch.setenv('GEMINI_API_KEY', '')
+    import server
+
+    building, release = threading.Event(), threading.Event()
+
+    def slow_build(taxonomy):
+        building.set()
+        release.wait(10)
+        return {'version': taxonomy['version']}
+
+    old = {'version': 'old'}
+    monkeypatch.setattr(server, 'current_taxonomy', lambda: {'version': 'new'})
+    monkeypatch.setattr(server, 'build_skill_pipeline', slow_build)
+    monkeypatch.setattr(server, 'skill_pipeline', old)
+    rebuilt = []
+    rebuild = threading.Thread(target=lambda: rebuilt.append(server.current_skill_pipeline()))
+    rebuild.start()
+    try:
+        assert building.wait(5)
+        assert server.current_skill_pipeline() is old
+    finally:
+        release.set()
+        rebuild.join()
+    assert rebuilt == [{'version': 'new'}]
+    assert server.current_skill_pipeline() == {'version': 'new'}
@@ -0,0 +1,102 @@
+"""Precomputed per-skill trend index, written by main.py and served by server.py.
+
+The batch job fits a linear trend to every skill's yearly demand. For each
+skill seen in at least two years it stores the relative annual growth rate,
+a 0-100 trend score and a trend class in a NumPy structured array, sorted by
+skill and saved as .npy. The service memory-maps the file and answers
+/predict-trend with a dictionary lookup instead of an LLM call.
+
+The score is the mean of the skill's growth-rate percentile and its
+latest-demand percentile across all indexed skills, so a fast-growing but
+tiny skill and a huge but flat one both land mid-range.
+"""
+import os
+
+import numpy as np
+
+TREND_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'trends', 'trend_index.npy')
+TREND_CLASSES = ('Declining', 'Stable', 'Growing')
+STABLE_BAND = 0.05
+SKILL_WIDTH = 64
+
+INDEX_DTYPE = np.dtype([
+    ('skill', f'U{SKILL_WIDTH}'),
+    ('growth_rate', 'f4'),
+    ('score', 'u1'),
+    ('trend', 'u1'),
+    ('first_year', 'i2'),
+    ('latest_year', 'i2'),
+    ('latest_demand', 'f4'),
+    ('next_demand', 'f4'),
+])
+
+
+def _percentiles(values):
+    """Rank of each value in [0, 1] (ties share the average rank)."""
+    if len(values) < 2:
+        return np.ones(len(values))
+    order = values.argsort(kind='stable')
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(len(values))
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    sums = np.bincount(inverse, weights=ranks)
+    return (sums / counts)[inverse] / (len(values) - 1)
+
+
+def build_trend_index(skills, slope, intercept, mean_demand, first_year, latest_year, latest_demand, offset):
+    """Index rows for skills with a fitted trend; all arguments are aligned arrays except `offset`.
+
+    `intercept` is the fitted demand at year `offset`.
+    """
+    growth = np.divide(slope, mean_demand, out=np.zeros(len(slope)), where=mean_demand > 0)
+    next_demand = np.maximum(intercept + slope * (latest_year + 1 - offset), 0)
+    score = np.rint(100 * (_percentiles(growth) + _percentiles(latest_demand)) / 2)
+    trend = np.where(growth > STABLE_BAND, 2, np.where(growth < -STABLE_BAND, 0, 1))
+
+    index = np.zeros(len(skills), dtype=INDEX_DTYPE)
+    index['skill'] = [str(skill)[:SKILL_WIDTH] for skill in skills]
+    index['growth_rate'] = growth
+    index['score'] = score
+    index['trend'] = trend
+    index['first_year'] = first_year
+    index['latest_year'] = latest_year
+    index['latest_demand'] = latest_demand
+    index['next_demand'] = next_demand
+    index.sort(order='skill')
+    return index
+
+
+def save_trend_index(index, path=TREND_INDEX_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, index, allow_pickle=False)
+    os.replace(tmp_path, path)
+
+
+def load_trend_index(path=TREND_INDEX_PATH):
+    """Memory-map the index and build its skill -> row lookup; None if there is no index yet."""
+    try:
+        rows = np.load(path, mmap_mode='r', allow_pickle=False)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ No trend index at {path} ({e}). /predict-trend will use the LLM.")
+        return None
+    return {'rows': rows, 'lookup': {skill: i for i, skill in enumerate(rows['skill'].tolist())}}
+
+
+def lookup_trend(index, skill):
+    """The /predict-trend answer for a canonical skill key, or None if it is not indexed."""
+    position = index['lookup'].get(skill) if index else None
+    if position is None:
+        return None
+    row = index['rows'][position]
+    growth = float(row['growth_rate'])
+    return {
+        "trend": TREND_CLASSES[int(row['trend'])],
+        "score": int(row['score']),
+        "growth_rate": round(growth, 4),
+        "reason": (f"Demand changed {growth:+.0%} per year from {int(row['first_year'])} to "
+                   f"{int(row['latest_year'])}; about {float(row['next_demand']):.0f} postings projected for "
+                   f"{int(row['latest_year']) + 1}."),
+        "source": "batch-forecast",
+    }
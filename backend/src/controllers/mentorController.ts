@@ -1,5 +1,5 @@
 import { Request, Response } from 'express';
-import { getMentorChatResponse } from '../services/aiService';
+import { getMentorChatResponse, streamMentorChatResponse } from '../services/aiService';
 
 export const getChatResponse = async (req: Request, res: Response) => {
   try {
@@ -9,6 +9,19 @@ export const getChatResponse = async (req: Request, res: Response) => {
       return res.status(400).json({ msg: 'Message is required' });
     }
 
+    const format = req.query.stream === 'sse' || req.accepts(['json', 'text/event-stream']) === 'text/event-stream'
+      ? 'sse'
+      : req.query.stream === 'ndjson' ? 'ndjson' : null;
+    if (format) {
+      const stream = await streamMentorChatResponse(message, history || [], format);
+      res.setHeader('Content-Type', format === 'sse' ? 'text/event-stream' : 'application/x-ndjson');
+      res.setHeader('Cache-Control', 'no-cache');
+      res.flushHeaders();
+      res.on('close', () => stream.destroy());
+      stream.pipe(res);
+      return;
+    }
+
     const data = await getMentorChatResponse(message, history || []);
     res.json(data);
   } catch (err: any) {
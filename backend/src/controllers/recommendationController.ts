@@ -1,6 +1,6 @@
 import { Request, Response } from 'express';
 import User, { ISkill, IUser } from '../models/user';
-import Trend from '../models/Trend';
+import { findSkillTrends } from '../models/Trend';
 import resourceMap from '../data/resourceMap';
 import careerPaths from '../data/careerPaths';
 import SKILL_PREREQUISITES from '../data/skillPrerequisites';
@@ -35,9 +35,9 @@ export const getMarketRecommendations = async (req: Request, res: Response) => {
     const requiredSkills = careerPaths[careerInterest];
     if (!requiredSkills) return res.status(404).json({ msg: 'Career path not found.' });
 
-    const trendsData = await Trend.findById('skill_historical_trends') || { trends: [] };
+    const trends = await findSkillTrends([...requiredSkills, ...userSkills.map(s => s.skillName)]);
 
-    const trendsMap = new Map(trendsData.trends.map((s: any) => [s.skill.toLowerCase(), s]));
+    const trendsMap = new Map(trends.map((s: any) => [s.skill.toLowerCase(), s]));
     const recommendationsMap = new Map<string, any>();
 
     // --- New / Prerequisite Recommendations ---
@@ -29,4 +29,32 @@ const ForecastSchema: Schema = new Schema({
 });
 
 const Forecast: Model<IForecast> = mongoose.models.Forecast || mongoose.model<IForecast>('Forecast', ForecastSchema);
-export default Forecast;
\ No newline at end of file
+export default Forecast;
+
+// One document per skill, written by the AI engine's per-skill storage mode.
+export interface ISkillForecastDoc extends Document {
+    skill: string;
+    forecast: IPoint[];
+    last_updated: Date;
+}
+
+const SkillForecastDocSchema: Schema = new Schema({
+    skill: { type: String, required: true, unique: true },
+    forecast: [PointSchema],
+    last_updated: { type: Date, default: Date.now }
+}, { collection: 'skill_forecasts' });
+
+export const SkillForecast: Model<ISkillForecastDoc> = mongoose.models.SkillForecast || mongoose.model<ISkillForecastDoc>('SkillForecast', SkillForecastDocSchema);
+
+// Same lookup as findSkillTrends(), for forecasts.
+export const findSkillForecasts = async (skills?: string[]): Promise<ISkillForecast[]> => {
+    const wanted = skills ? skills.map(s => s.toLowerCase()) : undefined;
+    const perSkill = await SkillForecast.find(wanted ? { skill: { $in: wanted } } : {}).lean();
+    if (perSkill.length || await SkillForecast.estimatedDocumentCount()) {
+        return perSkill.map(doc => ({ skill: doc.skill, forecast: doc.forecast }));
+    }
+
+    const legacy = await Forecast.findById('skill_forecasts').lean();
+    const forecasts = legacy ? legacy.forecasts : [];
+    return wanted ? forecasts.filter(f => wanted.includes(f.skill.toLowerCase())) : forecasts;
+};
@@ -33,4 +33,33 @@ const TrendSchema: Schema = new Schema({
 });
 
 const Trend: Model<ITrend> = mongoose.models.Trend || mongoose.model<ITrend>('Trend', TrendSchema);
-export default Trend;
\ No newline at end of file
+export default Trend;
+
+// One document per skill, written by the AI engine's per-skill storage mode.
+export interface ISkillTrendDoc extends Document {
+    skill: string;
+    history: IPoint[];
+    last_updated: Date;
+}
+
+const SkillTrendDocSchema: Schema = new Schema({
+    skill: { type: String, required: true, unique: true },
+    history: [PointSchema],
+    last_updated: { type: Date, default: Date.now }
+}, { collection: 'skill_trends' });
+
+export const SkillTrend: Model<ISkillTrendDoc> = mongoose.models.SkillTrend || mongoose.model<ISkillTrendDoc>('SkillTrend', SkillTrendDocSchema);
+
+// Fetch trends for the given skills (or all), preferring the per-skill collection
+// and falling back to the legacy single document when it has not been populated.
+export const findSkillTrends = async (skills?: string[]): Promise<ISkillTrend[]> => {
+    const wanted = skills ? skills.map(s => s.toLowerCase()) : undefined;
+    const perSkill = await SkillTrend.find(wanted ? { skill: { $in: wanted } } : {}).lean();
+    if (perSkill.length || await SkillTrend.estimatedDocumentCount()) {
+        return perSkill.map(doc => ({ skill: doc.skill, history: doc.history }));
+    }
+
+    const legacy = await Trend.findById('skill_historical_trends').lean();
+    const trends = legacy ? legacy.trends : [];
+    return wanted ? trends.filter(t => wanted.includes(t.skill.toLowerCase())) : trends;
+};
@@ -1,29 +1,24 @@
 import express, { Router, Request, Response } from 'express';
 import auth from '../middleware/authMiddleware';
-import Trend from '../models/Trend';
-import Forecast from '../models/Forecast';
+import { findSkillTrends } from '../models/Trend';
+import { findSkillForecasts } from '../models/Forecast';
 
 const router: Router = express.Router();
 
 router.get('/trends', auth, async (req: Request, res: Response) => {
   try {
-    const [trendsData, forecastsData] = await Promise.all([
-      Trend.findById('skill_historical_trends'),
-      Forecast.findById('skill_forecasts')
-    ]);
+    const [trends, forecasts] = await Promise.all([findSkillTrends(), findSkillForecasts()]);
 
-    if (!trendsData || !forecastsData) {
+    if (!trends.length || !forecasts.length) {
       return res.json([]); // Return empty list instead of 404
     }
 
-    const combinedData = trendsData.trends.map((trend: any) => {
-      const forecast = forecastsData.forecasts.find((f: any) => f.skill === trend.skill);
-      return {
-        skill: trend.skill,
-        history: trend.history,
-        forecast: forecast ? forecast.forecast : []
-      };
-    });
+    const forecastMap = new Map(forecasts.map(f => [f.skill, f.forecast]));
+    const combinedData = trends.map(trend => ({
+      skill: trend.skill,
+      history: trend.history,
+      forecast: forecastMap.get(trend.skill) || []
+    }));
 
     res.json(combinedData);
   } catch (err: any) {
@@ -32,4 +27,24 @@ router.get('/trends', auth, async (req: Request, res: Response) => {
   }
 });
 
+router.get('/trends/:skill', auth, async (req: Request, res: Response) => {
+  try {
+    const skill = String(req.params.skill);
+    const [trends, forecasts] = await Promise.all([findSkillTrends([skill]), findSkillForecasts([skill])]);
+
+    if (!trends.length) {
+      return res.status(404).json({ msg: 'Skill not found' });
+    }
+
+    res.json({
+      skill: trends[0].skill,
+      history: trends[0].history,
+      forecast: forecasts.length ? forecasts[0].forecast : []
+    });
+  } catch (err: any) {
+    console.error(err.message);
+    res.status(500).send('Server Error');
+  }
+});
+
 export default router;
\ No newline at end of file
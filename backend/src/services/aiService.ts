@@ -71,4 +71,18 @@ export const getMentorChatResponse = async (message: string, history: any[]) =>
     console.error("Mentor Chat Error:", error);
     throw new Error("AI Mentor Unreachable");
   }
+};
+
+// Streamed mentor reply ('sse' or 'ndjson'), returned as the raw response stream.
+export const streamMentorChatResponse = async (message: string, history: any[], format: 'sse' | 'ndjson') => {
+  try {
+    const response = await axios.post(`${AI_SERVICE_URL}/chat`, { message, history }, {
+      params: { stream: format },
+      responseType: 'stream',
+    });
+    return response.data;
+  } catch (error: any) {
+    console.error("Mentor Chat Stream Error:", error);
+    throw new Error("AI Mentor Unreachable");
+  }
 };
\ No newline at end of file